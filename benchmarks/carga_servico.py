@@ -0,0 +1,217 @@
+"""
+Teste de carga do serviço de cotações (servico.py).
+
+Abre várias conexões persistentes, envia cotações sem parar durante um
+tempo fixo (ou até um número de requisições) e informa vazão e latências
+(p50/p90/p99). Com --variedade pequena, muitas requisições são idênticas e
+o agrupamento de requisições em andamento do serviço entra em ação.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.carga_servico --iniciar                 # sobe o serviço e testa
+    python -m benchmarks.carga_servico --url http://127.0.0.1:8765 --conexoes 200 --duracao 30
+    python -m benchmarks.carga_servico --iniciar --rota impressao/lote --lote 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROTAS = ("impressao", "impressao/lote", "venda", "venda/lote")
+
+
+def gerar_corpos(rota: str, filamentos: List[str], variedade: int, lote: int, semente: int = 42) -> List[bytes]:
+    """`variedade` corpos JSON distintos para a rota."""
+    rng = random.Random(semente)
+
+    def trabalho():
+        return {"filamento": rng.choice(filamentos), "metros_usados": round(rng.uniform(1, 200), 2),
+                "tempo_impressao": round(rng.uniform(10, 1200), 1)}
+
+    def produto():
+        return {"preco_custo": round(rng.uniform(5, 300), 2), "comissao": rng.choice((11.0, 12.0, 16.0, 18.0)),
+                "taxa_fixa": rng.choice((0.0, 5.0, 6.0)), "embalagem": round(rng.uniform(0, 5), 2)}
+
+    custos = {"custo_energia_hora": 0.5, "custo_manutencao_hora": 2.0, "margem_lucro": 100.0, "custo_falha": 5.0}
+    venda = {"nota_fiscal": 6.0, "margem_lucro": 30.0}
+    corpos = []
+    for _ in range(variedade):
+        if rota == "impressao":
+            dados = {**trabalho(), **custos}
+        elif rota == "impressao/lote":
+            dados = {"trabalhos": [trabalho() for _ in range(lote)], **custos}
+        elif rota == "venda":
+            dados = {**produto(), **venda}
+        else:
+            dados = {"produtos": [produto() for _ in range(lote)], **venda}
+        corpos.append(json.dumps(dados).encode("utf-8"))
+    return corpos
+
+
+class Conexao:
+    """Conexão HTTP/1.1 persistente, com uma requisição por vez."""
+
+    def __init__(self, host: str, porta: int):
+        self.host, self.porta = host, porta
+        self.leitor: Optional[asyncio.StreamReader] = None
+        self.escritor: Optional[asyncio.StreamWriter] = None
+
+    async def requisitar(self, metodo: str, caminho: str, corpo: bytes = b"") -> Tuple[int, bytes]:
+        if self.escritor is None:
+            self.leitor, self.escritor = await asyncio.open_connection(self.host, self.porta, limit=2 ** 26)
+        self.escritor.write(
+            f"{metodo} {caminho} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n\r\n".encode("latin-1") + corpo)
+        await self.escritor.drain()
+        cabecalho = (await self.leitor.readuntil(b"\r\n\r\n")).decode("latin-1").split("\r\n")
+        status = int(cabecalho[0].split(" ", 2)[1])
+        cabecalhos = {n.strip().lower(): v.strip() for n, v in (l.split(":", 1) for l in cabecalho[1:] if l)}
+        resposta = await self.leitor.readexactly(int(cabecalhos.get("content-length", 0)))
+        if cabecalhos.get("connection", "").lower() == "close":
+            self.fechar()
+        return status, resposta
+
+    def fechar(self) -> None:
+        if self.escritor is not None:
+            self.escritor.close()
+            self.escritor = None
+
+
+async def _cliente(conexao: Conexao, caminho: str, corpos: List[bytes], fim: float,
+                   restantes: List[int], latencias: List[float], erros: Dict[str, int], rng: random.Random) -> None:
+    while time.perf_counter() < fim and restantes[0] > 0:
+        restantes[0] -= 1
+        inicio = time.perf_counter()
+        try:
+            status, _ = await conexao.requisitar("POST", caminho, rng.choice(corpos))
+        except (OSError, asyncio.IncompleteReadError) as erro:
+            erros[type(erro).__name__] = erros.get(type(erro).__name__, 0) + 1
+            conexao.fechar()
+            continue
+        latencias.append(time.perf_counter() - inicio)
+        if status != 200:
+            erros[str(status)] = erros.get(str(status), 0) + 1
+
+
+async def executar_carga(url: str, rota: str, conexoes: int, duracao: float, requisicoes: Optional[int],
+                         variedade: int, lote: int) -> Dict:
+    """Executa o teste de carga e devolve as métricas."""
+    partes = urlsplit(url)
+    host, porta = partes.hostname, partes.port or 80
+    controle = Conexao(host, porta)
+    _, resposta = await controle.requisitar("GET", "/filamentos")
+    filamentos = [f["nome"] for f in json.loads(resposta)["filamentos"]]
+    _, resposta = await controle.requisitar("GET", "/saude")
+    antes = json.loads(resposta)
+
+    corpos = gerar_corpos(rota, filamentos, variedade, lote)
+    caminho = f"/cotacao/{rota}"
+    latencias: List[float] = []
+    erros: Dict[str, int] = {}
+    restantes = [requisicoes if requisicoes else float("inf")]
+    clientes = [Conexao(host, porta) for _ in range(conexoes)]
+    inicio = time.perf_counter()
+    fim = inicio + (duracao if not requisicoes else float("inf"))
+    await asyncio.gather(*(
+        _cliente(c, caminho, corpos, fim, restantes, latencias, erros, random.Random(i))
+        for i, c in enumerate(clientes)
+    ))
+    decorrido = time.perf_counter() - inicio
+    for c in clientes:
+        c.fechar()
+
+    _, resposta = await controle.requisitar("GET", "/saude")
+    depois = json.loads(resposta)
+    controle.fechar()
+
+    ms = np.asarray(latencias) * 1000
+    percentis = np.percentile(ms, (50, 90, 99)) if len(ms) else (np.nan,) * 3
+    return {
+        "rota": caminho,
+        "conexoes": conexoes,
+        "requisicoes": len(latencias),
+        "itens_por_requisicao": lote if rota.endswith("lote") else 1,
+        "segundos": decorrido,
+        "req_s": len(latencias) / decorrido if decorrido else 0.0,
+        "p50_ms": float(percentis[0]),
+        "p90_ms": float(percentis[1]),
+        "p99_ms": float(percentis[2]),
+        "max_ms": float(ms.max()) if len(ms) else float("nan"),
+        "erros": erros,
+        "agrupadas": depois["agrupadas"] - antes["agrupadas"],
+        "calculos": depois["calculos"] - antes["calculos"],
+    }
+
+
+async def _aguardar_servico(url: str, processo: subprocess.Popen, tempo_limite: float = 30.0) -> None:
+    partes = urlsplit(url)
+    limite = time.perf_counter() + tempo_limite
+    while time.perf_counter() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"O serviço terminou com código {processo.returncode}")
+        try:
+            conexao = Conexao(partes.hostname, partes.port or 80)
+            status, _ = await conexao.requisitar("GET", "/saude")
+            conexao.fechar()
+            if status == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("O serviço não respondeu a tempo")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="Endereço do serviço")
+    parser.add_argument("--iniciar", action="store_true", help="Inicia o serviço (python -m cli servir) para o teste")
+    parser.add_argument("--catalogo", default="catalogo_filamentos.json", help="Catálogo usado com --iniciar")
+    parser.add_argument("--rota", choices=ROTAS, default="impressao")
+    parser.add_argument("--conexoes", type=int, default=50, help="Clientes simultâneos")
+    parser.add_argument("--duracao", type=float, default=10.0, help="Segundos de teste")
+    parser.add_argument("--requisicoes", type=int, help="Número total de requisições (em vez de --duracao)")
+    parser.add_argument("--variedade", type=int, default=1_000, help="Corpos distintos enviados")
+    parser.add_argument("--lote", type=int, default=100, help="Itens por requisição nas rotas de lote")
+    parser.add_argument("--json", action="store_true", help="Imprime as métricas em JSON")
+    args = parser.parse_args(argv)
+
+    processo = None
+    if args.iniciar:
+        partes = urlsplit(args.url)
+        processo = subprocess.Popen(
+            [sys.executable, "-m", "cli", "servir", "--host", partes.hostname,
+             "--porta", str(partes.port or 80), "--catalogo", args.catalogo],
+            cwd=RAIZ)
+    try:
+        if processo is not None:
+            asyncio.run(_aguardar_servico(args.url, processo))
+        metricas = asyncio.run(executar_carga(args.url, args.rota, args.conexoes, args.duracao,
+                                              args.requisicoes, args.variedade, args.lote))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    if args.json:
+        print(json.dumps(metricas, indent=2))
+    else:
+        print(f"{metricas['rota']}: {metricas['requisicoes']:,} requisições em {metricas['segundos']:.1f} s "
+              f"com {metricas['conexoes']} conexões ({metricas['itens_por_requisicao']} item(ns) cada)")
+        print(f"  vazão: {metricas['req_s']:,.0f} req/s")
+        print(f"  latência: p50 {metricas['p50_ms']:.2f} ms | p90 {metricas['p90_ms']:.2f} ms | "
+              f"p99 {metricas['p99_ms']:.2f} ms | máx {metricas['max_ms']:.2f} ms")
+        print(f"  cálculos: {metricas['calculos']:,} | agrupadas: {metricas['agrupadas']:,}")
+        print(f"  erros: {metricas['erros'] or 'nenhum'}")
+    return 1 if metricas["erros"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
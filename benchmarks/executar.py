@@ -0,0 +1,289 @@
+"""
+Benchmarks dos caminhos de precificação e persistência.
+
+Mede calcular_preco_impressao / calcular_preco_venda, salvar/carregar
+catálogo e salvar/carregar histórico em várias escalas, grava os resultados
+em JSON e compara com uma linha de base para detectar regressões.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.executar                       # escala rápida
+    python -m benchmarks.executar --escala completa     # até 1M jobs / 10M orçamentos
+    python -m benchmarks.executar --salvar-baseline     # atualiza a linha de base
+    python -m benchmarks.executar --filtro catalogo     # só casos que contêm "catalogo"
+
+Sai com código 1 se algum caso ficar mais lento que a linha de base além
+da tolerância.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from benchmarks.geradores import gerar_catalogo, gerar_gcode, gerar_historico, gerar_produtos, gerar_trabalhos
+from cinematica import estimar_tempo
+from nucleo.historico import carregar_historico, consultar_historico, consultar_resumo, salvar_orcamento
+from nucleo.marketplace import DEFAULT_MARKETPLACES, calcular_preco_venda, varrer_marketplaces
+from nucleo.precificacao import (
+    CatalogoColunar,
+    calcular_preco_impressao,
+    calcular_precos_lote,
+    carregar_catalogo,
+    salvar_catalogo,
+)
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+ARQUIVO_BASELINE = os.path.join(DIRETORIO, "baseline.json")
+ARQUIVO_RESULTADOS = os.path.join(DIRETORIO, "resultados.json")
+
+ESCALAS = {
+    "rapida": {
+        "precos": (1, 1_000, 100_000),
+        "catalogo": (10, 1_000, 10_000),
+        "historico": (1_000, 100_000),
+        "gcode": (10_000, 200_000),
+        "inicializacao": (1,),
+    },
+    "completa": {
+        "precos": (1, 1_000, 1_000_000),
+        "catalogo": (10, 1_000, 100_000),
+        "historico": (1_000, 1_000_000, 10_000_000),
+        "gcode": (10_000, 2_000_000),
+        "inicializacao": (1,),
+    },
+}
+
+# Cada caso recebe n e devolve (preparar, executar): preparar roda fora da medição
+Caso = Callable[[int, str], Tuple[Callable[[], object], Callable[[object], object]]]
+
+
+def _preco_impressao_escalar(n: int, _diretorio: str):
+    def preparar():
+        catalogo = gerar_catalogo(50)
+        return catalogo, gerar_trabalhos(n, catalogo.keys())
+
+    def executar(dados):
+        catalogo, t = dados
+        for i in range(n):
+            calcular_preco_impressao(
+                catalogo[t["filamentos"][i]], t["metros_usados"][i], t["tempo_impressao"][i],
+                t["custo_energia_hora"][i], t["custo_manutencao_hora"][i],
+                t["margem_lucro"][i], t["custo_falha"][i]
+            )
+    return preparar, executar
+
+
+def _preco_impressao_lote(n: int, _diretorio: str):
+    def preparar():
+        catalogo = gerar_catalogo(50)
+        return CatalogoColunar(catalogo), gerar_trabalhos(n, catalogo.keys())
+
+    def executar(dados):
+        colunar, t = dados
+        calcular_precos_lote(colunar, **t)
+    return preparar, executar
+
+
+def _preco_venda_escalar(n: int, _diretorio: str):
+    def preparar():
+        p = gerar_produtos(n)
+        return list(zip(*(p[c].tolist() for c in
+                          ("preco_custo", "comissao", "taxa_fixa", "nota_fiscal",
+                           "embalagem", "margem_lucro", "outras_taxas"))))
+
+    def executar(linhas):
+        for linha in linhas:
+            calcular_preco_venda(*linha)
+    return preparar, executar
+
+
+def _varredura_marketplaces(n: int, _diretorio: str):
+    def preparar():
+        p = gerar_produtos(n)
+        return pd.DataFrame({c: p[c] for c in ("preco_custo", "embalagem", "margem_lucro")})
+
+    def executar(produtos):
+        for _ in varrer_marketplaces(produtos, marketplaces=DEFAULT_MARKETPLACES):
+            pass
+    return preparar, executar
+
+
+def _salvar_catalogo(n: int, diretorio: str):
+    arquivo = os.path.join(diretorio, f"catalogo_{n}.json")
+
+    def executar(catalogo):
+        salvar_catalogo(catalogo, arquivo)
+    return (lambda: gerar_catalogo(n)), executar
+
+
+def _carregar_catalogo(n: int, diretorio: str):
+    arquivo = os.path.join(diretorio, f"catalogo_{n}.json")
+
+    def preparar():
+        if not os.path.exists(arquivo):
+            salvar_catalogo(gerar_catalogo(n), arquivo)
+
+    def executar(_):
+        carregar_catalogo(arquivo)
+    return preparar, executar
+
+
+def _banco_historico(n: int, diretorio: str) -> str:
+    arquivo = os.path.join(diretorio, f"historico_{n}.db")
+    if not os.path.exists(arquivo):
+        gerar_historico(arquivo, n)
+    return arquivo
+
+
+def _salvar_orcamento(n: int, diretorio: str):
+    dados = {'Filamento': 'PLA', 'Metros Usados': 10.0, 'Tempo (min)': 180, 'Preço Final': 25.0}
+
+    def executar(arquivo):
+        salvar_orcamento(dados, "Benchmark", arquivo)
+    return (lambda: _banco_historico(n, diretorio)), executar
+
+
+def _carregar_historico(n: int, diretorio: str):
+    return (lambda: _banco_historico(n, diretorio)), carregar_historico
+
+
+def _consultar_pagina(n: int, diretorio: str):
+    def executar(arquivo):
+        consultar_historico(pagina=1, por_pagina=50, filamento="PETG", arquivo=arquivo)
+    return (lambda: _banco_historico(n, diretorio)), executar
+
+
+def _painel_resumos(n: int, diretorio: str):
+    # O que o painel do histórico lê: totais por mês, por filamento e os maiores projetos
+    def executar(arquivo):
+        consultar_resumo("mes", arquivo=arquivo)
+        consultar_resumo("filamento", arquivo=arquivo)
+        consultar_resumo("projeto", ordenar_por="receita", limite=10, arquivo=arquivo)
+    return (lambda: _banco_historico(n, diretorio)), executar
+
+
+def _estimar_tempo_gcode(n: int, diretorio: str):
+    arquivo = os.path.join(diretorio, f"movimentos_{n}.gcode")
+
+    def preparar():
+        if not os.path.exists(arquivo):
+            gerar_gcode(arquivo, n)
+        return arquivo
+    return preparar, estimar_tempo
+
+
+def _importar_cli(_n: int, _diretorio: str):
+    # Processo novo: mede a importação a frio, como um worker ou um comando da CLI
+    def executar(_):
+        subprocess.run([sys.executable, "-c", "import cli"], check=True)
+    return (lambda: None), executar
+
+
+CASOS: Dict[str, Tuple[str, Caso]] = {
+    "preco_impressao/escalar": ("precos", _preco_impressao_escalar),
+    "preco_impressao/lote": ("precos", _preco_impressao_lote),
+    "preco_venda/escalar": ("precos", _preco_venda_escalar),
+    "preco_venda/varredura_marketplaces": ("precos", _varredura_marketplaces),
+    "catalogo/salvar": ("catalogo", _salvar_catalogo),
+    "catalogo/carregar": ("catalogo", _carregar_catalogo),
+    "historico/salvar_orcamento": ("historico", _salvar_orcamento),
+    "historico/carregar_historico": ("historico", _carregar_historico),
+    "historico/consultar_pagina": ("historico", _consultar_pagina),
+    "historico/painel_resumos": ("historico", _painel_resumos),
+    "gcode/estimar_tempo": ("gcode", _estimar_tempo_gcode),
+    "inicializacao/importar_cli": ("inicializacao", _importar_cli),
+}
+
+
+def medir(preparar, executar, tempo_minimo: float = 0.2, repeticoes_max: int = 7) -> float:
+    """
+    Melhor tempo de `executar`, repetindo até somar `tempo_minimo` segundos.
+
+    O mínimo é menos sensível a ruído da máquina que a média ou a mediana.
+    """
+    dados = preparar()
+    tempos: List[float] = []
+    while len(tempos) < repeticoes_max and (len(tempos) < 3 or sum(tempos) < tempo_minimo):
+        inicio = time.perf_counter()
+        executar(dados)
+        tempos.append(time.perf_counter() - inicio)
+        if tempos[-1] > 2.0:
+            break
+    return min(tempos)
+
+
+def executar_benchmarks(escala: str = "rapida", filtro: Optional[str] = None) -> Dict:
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome, (grupo, caso) in CASOS.items():
+            if filtro and filtro not in nome:
+                continue
+            for n in ESCALAS[escala][grupo]:
+                segundos = medir(*caso(n, diretorio))
+                resultados.append({"caso": nome, "n": n, "segundos": segundos,
+                                   "por_segundo": n / segundos if segundos > 0 else None})
+                print(f"{nome:32s} n={n:>10,d}  {segundos * 1000:12.3f} ms", file=sys.stderr)
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "escala": escala,
+        "maquina": {"python": platform.python_version(), "sistema": platform.platform(),
+                    "processador": platform.processor() or platform.machine()},
+        "resultados": resultados,
+    }
+
+
+def comparar(atual: Dict, baseline: Dict, tolerancia: float) -> List[Dict]:
+    """Lista os casos que ficaram mais lentos que a linha de base além da tolerância."""
+    referencia = {(r["caso"], r["n"]): r["segundos"] for r in baseline["resultados"]}
+    regressoes = []
+    for r in atual["resultados"]:
+        anterior = referencia.get((r["caso"], r["n"]))
+        if not anterior:
+            continue
+        razao = r["segundos"] / anterior
+        marcador = "REGRESSÃO" if razao > 1 + tolerancia else ""
+        print(f"{r['caso']:32s} n={r['n']:>10,d}  {razao:6.2f}x  {marcador}")
+        if marcador:
+            regressoes.append({**r, "baseline": anterior, "razao": razao})
+    return regressoes
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="rapida")
+    parser.add_argument("--filtro", help="Executa só os casos cujo nome contém este texto")
+    parser.add_argument("--saida", default=ARQUIVO_RESULTADOS, help="Arquivo JSON de resultados")
+    parser.add_argument("--baseline", default=ARQUIVO_BASELINE, help="Linha de base para comparação")
+    parser.add_argument("--salvar-baseline", action="store_true", help="Grava os resultados como nova linha de base")
+    parser.add_argument("--tolerancia", type=float, default=0.3, help="Lentidão aceita (0.3 = 30%%)")
+    args = parser.parse_args(argv)
+
+    atual = executar_benchmarks(args.escala, args.filtro)
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(atual, f, ensure_ascii=False, indent=2)
+
+    if args.salvar_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(atual, f, ensure_ascii=False, indent=2)
+        print(f"Linha de base gravada em {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("Sem linha de base para comparar (use --salvar-baseline).")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressoes = comparar(atual, baseline, args.tolerancia)
+    print(f"{len(regressoes)} regressões acima de {args.tolerancia:.0%}")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""Geradores de dados sintéticos para os benchmarks."""
+from contextlib import closing
+from typing import Dict
+
+import numpy as np
+
+from nucleo.historico import COLUNAS, conectar, reconstruir_resumos
+from nucleo.precificacao import Filamento
+
+MATERIAIS = ("PLA", "PLA+", "PETG", "ABS", "TPU", "ASA")
+
+
+def gerar_catalogo(n: int, semente: int = 0) -> Dict[str, Filamento]:
+    """Catálogo com `n` filamentos de preços e metragens variados."""
+    rng = np.random.default_rng(semente)
+    comprimentos = rng.integers(300, 360, size=n)
+    precos = rng.uniform(80, 250, size=n).round(2)
+    return {
+        f"Filamento {i:06d}": Filamento(
+            f"Filamento {i}", f"Marca {i % 97}", MATERIAIS[i % len(MATERIAIS)],
+            1.75, int(comprimentos[i]), 1.0, float(precos[i])
+        )
+        for i in range(n)
+    }
+
+
+def gerar_trabalhos(n: int, nomes_filamentos, semente: int = 0) -> Dict[str, np.ndarray]:
+    """Colunas de `n` trabalhos de impressão (argumentos de calcular_precos_lote)."""
+    rng = np.random.default_rng(semente)
+    nomes = np.asarray(list(nomes_filamentos), dtype=object)
+    return {
+        "filamentos": nomes[rng.integers(0, len(nomes), size=n)],
+        "metros_usados": rng.uniform(0.5, 200, size=n),
+        "tempo_impressao": rng.uniform(10, 1440, size=n),
+        "custo_energia_hora": rng.uniform(0.3, 1.2, size=n),
+        "custo_manutencao_hora": rng.uniform(0.5, 3.0, size=n),
+        "margem_lucro": rng.uniform(0, 200, size=n),
+        "custo_falha": rng.uniform(0, 15, size=n),
+    }
+
+
+def gerar_produtos(n: int, semente: int = 0) -> Dict[str, np.ndarray]:
+    """Colunas de `n` produtos (argumentos de calcular_preco_venda)."""
+    rng = np.random.default_rng(semente)
+    return {
+        "preco_custo": rng.uniform(2, 300, size=n),
+        "comissao": rng.uniform(5, 22, size=n),
+        "taxa_fixa": rng.uniform(0, 8, size=n),
+        "nota_fiscal": rng.uniform(0, 10, size=n),
+        "embalagem": rng.uniform(0.5, 5, size=n),
+        "margem_lucro": rng.uniform(10, 100, size=n),
+        "outras_taxas": rng.uniform(0, 5, size=n),
+    }
+
+
+def gerar_gcode(arquivo: str, n: int, semente: int = 0) -> None:
+    """G-code com cerca de `n` linhas: camadas com perímetro, preenchimento em zigue-zague e retrações."""
+    rng = np.random.default_rng(semente)
+    linhas_por_camada = 400
+    with open(arquivo, "w", encoding="ascii") as f:
+        f.write("M140 S60\nM104 S210\nM190 S60\nM109 S210\nG28\nG90\nM82\nM204 S1000\n")
+        for camada in range(max(1, n // linhas_por_camada)):
+            f.write(f"G92 E0\nG1 Z{0.2 * (camada + 1):.2f} F600\nG1 E-0.8 F2400\nG0 X20 Y20 F9000\nG1 E0 F2400\n")
+            pontos = rng.uniform(20, 200, size=(linhas_por_camada - 5, 2))
+            pontos[:, 0] = np.sort(pontos[:, 0])
+            extrusao = np.cumsum(rng.uniform(0.01, 0.5, size=len(pontos)))
+            velocidade = np.where(np.arange(len(pontos)) % 50 == 0, " F3000", "")
+            f.writelines(f"G1 X{x:.3f} Y{y:.3f} E{e:.5f}{v}\n"
+                         for (x, y), e, v in zip(pontos, extrusao, velocidade))
+        f.write(";TIME_ELAPSED\nM104 S0\nM140 S0\n")
+
+
+def gerar_historico(arquivo: str, n: int, semente: int = 0, lote: int = 100_000) -> None:
+    """Preenche o banco de histórico com `n` orçamentos sintéticos."""
+    rng = np.random.default_rng(semente)
+    colunas = [banco for banco, _ in COLUNAS.values()]
+    consulta = (f"INSERT INTO orcamentos ({', '.join(colunas)}) "
+                f"VALUES ({', '.join('?' * len(colunas))})")
+    dias = np.datetime64("2020-01-01") + np.arange(2000)
+
+    with closing(conectar(arquivo)) as conexao, conexao:
+        for inicio in range(0, n, lote):
+            m = min(lote, n - inicio)
+            metros = rng.uniform(0.5, 200, size=m)
+            tempo = rng.uniform(10, 1440, size=m)
+            custo = metros * 0.4 + tempo / 60 * 2.5
+            linhas = zip(
+                np.sort(dias[rng.integers(0, len(dias), size=m)]).astype(str).tolist(),
+                [f"Projeto {p}" for p in rng.integers(0, 5000, size=m)],
+                [MATERIAIS[i] for i in rng.integers(0, len(MATERIAIS), size=m)],
+                metros.tolist(), (metros * 3).tolist(), tempo.tolist(),
+                (metros * 0.4).tolist(), (tempo / 60 * 0.5).tolist(), (tempo / 60 * 2).tolist(),
+                (metros * 0.02).tolist(), custo.tolist(), (custo * 2).tolist(),
+            )
+            conexao.executemany(consulta, linhas)
+    # Carga em massa direto na tabela: os resumos são refeitos uma vez no fim
+    reconstruir_resumos(arquivo)
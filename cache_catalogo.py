@@ -0,0 +1,171 @@
+"""
+Cache do catálogo de filamentos compartilhado por todas as sessões do processo.
+
+O catálogo é lido do disco uma única vez e reaproveitado enquanto a versão
+dos arquivos (mtime e tamanho do JSON e do log de alterações) não mudar.
+Cada sessão recebe uma VisaoCatalogo: leitura direta do catálogo
+compartilhado e, por cima dele, uma camada própria (copy-on-write) com as
+edições ainda não salvas.
+"""
+import os
+import threading
+from collections.abc import MutableMapping
+from types import MappingProxyType
+from typing import Dict, Iterator, Mapping, Optional, Set, Tuple
+
+from nucleo.precificacao import (
+    CatalogoColunar,
+    Filamento,
+    carregar_catalogo,
+    registrar_filamento,
+    remover_filamento,
+)
+
+ARQUIVO_CATALOGO = "catalogo_filamentos.json"
+
+
+def _assinatura(caminho: str) -> Optional[Tuple[int, int]]:
+    try:
+        info = os.stat(caminho)
+    except FileNotFoundError:
+        return None
+    return info.st_mtime_ns, info.st_size
+
+
+def versao_catalogo(arquivo: str = ARQUIVO_CATALOGO) -> Tuple:
+    """Versão do catálogo salvo: muda sempre que o JSON ou o log mudam."""
+    return _assinatura(arquivo), _assinatura(arquivo + ".wal")
+
+
+class CacheCatalogo:
+    """Catálogos carregados, um por arquivo, invalidados pela versão em disco."""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._entradas: Dict[str, Tuple[Tuple, Mapping[str, Filamento]]] = {}
+        self._colunares: Dict[str, Tuple[Mapping[str, Filamento], CatalogoColunar]] = {}
+        self.recargas = 0
+
+    def obter(self, arquivo: str = ARQUIVO_CATALOGO) -> Mapping[str, Filamento]:
+        """Retorna o catálogo (somente leitura), recarregando se o arquivo mudou."""
+        chave = os.path.abspath(arquivo)
+        versao = versao_catalogo(arquivo)
+        entrada = self._entradas.get(chave)
+        if entrada is not None and entrada[0] == versao:
+            return entrada[1]
+
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is None or entrada[0] != versao:
+                catalogo = MappingProxyType(carregar_catalogo(arquivo))
+                # A versão foi lida antes da carga: se houver gravação no meio,
+                # a próxima chamada detecta a diferença e recarrega.
+                entrada = (versao, catalogo)
+                self._entradas[chave] = entrada
+                self.recargas += 1
+            return entrada[1]
+
+    def obter_colunar(self, arquivo: str = ARQUIVO_CATALOGO) -> CatalogoColunar:
+        """Visão colunar do catálogo, construída uma vez por versão carregada."""
+        chave = os.path.abspath(arquivo)
+        catalogo = self.obter(arquivo)
+        entrada = self._colunares.get(chave)
+        if entrada is None or entrada[0] is not catalogo:
+            entrada = (catalogo, CatalogoColunar(catalogo))
+            self._colunares[chave] = entrada
+        return entrada[1]
+
+    def invalidar(self, arquivo: Optional[str] = None) -> None:
+        with self._trava:
+            if arquivo is None:
+                self._entradas.clear()
+                self._colunares.clear()
+            else:
+                self._entradas.pop(os.path.abspath(arquivo), None)
+                self._colunares.pop(os.path.abspath(arquivo), None)
+
+
+# Instância única do processo (compartilhada entre sessões do Streamlit)
+CACHE = CacheCatalogo()
+
+
+def obter_catalogo(arquivo: str = ARQUIVO_CATALOGO) -> Mapping[str, Filamento]:
+    """Catálogo compartilhado, somente leitura."""
+    return CACHE.obter(arquivo)
+
+
+class VisaoCatalogo(MutableMapping):
+    """
+    Visão de uma sessão sobre o catálogo compartilhado.
+
+    Leituras consultam primeiro as edições pendentes da sessão e depois o
+    catálogo compartilhado (sempre na versão mais recente). Escritas ficam
+    apenas na camada da sessão até salvar() ser chamado.
+    """
+
+    def __init__(self, arquivo: str = ARQUIVO_CATALOGO, cache: CacheCatalogo = CACHE):
+        self.arquivo = arquivo
+        self._cache = cache
+        self._alterados: Dict[str, Filamento] = {}
+        self._removidos: Set[str] = set()
+
+    @property
+    def base(self) -> Mapping[str, Filamento]:
+        return self._cache.obter(self.arquivo)
+
+    @property
+    def pendente(self) -> bool:
+        """Indica se há edições ainda não salvas nesta sessão."""
+        return bool(self._alterados or self._removidos)
+
+    def __getitem__(self, nome: str) -> Filamento:
+        if nome in self._alterados:
+            return self._alterados[nome]
+        if nome in self._removidos:
+            raise KeyError(nome)
+        return self.base[nome]
+
+    def __setitem__(self, nome: str, filamento: Filamento) -> None:
+        self._removidos.discard(nome)
+        self._alterados[nome] = filamento
+
+    def __delitem__(self, nome: str) -> None:
+        if nome not in self:
+            raise KeyError(nome)
+        self._alterados.pop(nome, None)
+        self._removidos.add(nome)
+
+    def __iter__(self) -> Iterator[str]:
+        base = self.base
+        for nome in base:
+            if nome not in self._removidos and nome not in self._alterados:
+                yield nome
+        yield from self._alterados
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, nome: object) -> bool:
+        if nome in self._alterados:
+            return True
+        return nome not in self._removidos and nome in self.base
+
+    def colunar(self) -> CatalogoColunar:
+        """Visão colunar do catálogo como esta sessão o enxerga."""
+        if not self.pendente:
+            return self._cache.obter_colunar(self.arquivo)
+        return CatalogoColunar(self)
+
+    def salvar(self) -> bool:
+        """Grava as edições pendentes no catálogo compartilhado."""
+        for nome in self._removidos:
+            remover_filamento(nome, self.arquivo)
+        for nome, filamento in self._alterados.items():
+            registrar_filamento(nome, filamento, self.arquivo)
+        self.descartar()
+        return True
+
+    def descartar(self) -> None:
+        """Descarta as edições pendentes desta sessão."""
+        self._alterados.clear()
+        self._removidos.clear()
@@ -1,282 +1,196 @@
+import io
+
+import numpy as np
+import pandas as pd
 import streamlit as st
+from cache_catalogo import versao_catalogo
+from memo_cotacao import MEMO
+from nucleo.marketplace import (
+    ARQUIVO_MARKETPLACES,
+    avaliar_preco_alvo,
+    calcular_preco_venda,
+    calcular_preco_venda_faixas,
+    carregar_marketplaces,
+    comparar_marketplaces,
+    varrer_marketplaces,
+)
+from sensibilidade import superficie_marketplaces
 
-def calcular_preco_venda(preco_custo, comissao, taxa_fixa, nota_fiscal, embalagem, margem_lucro, outras_taxas=0):
-    # Calcula o lucro desejado (percentual do preço de custo)
-    lucro_desejado = preco_custo * (margem_lucro / 100)
-    
-    # Soma dos percentuais que incidem sobre o preço de venda
-    total_percentual = comissao + nota_fiscal + outras_taxas
-    
-    # Evitar divisão por zero ou porcentagens inválidas
-    if total_percentual >= 100:
-        return 0, 0, 0, 0, 0, 0, 0
-    
-    # Calcula o preço de venda usando a equação:
-    # Preço de Venda = (Custo + Lucro Desejado + Taxa Fixa + Embalagem) / (1 - (Comissão + Nota Fiscal + Outras Taxas)/100)
-    preco_venda = (preco_custo + lucro_desejado + taxa_fixa + embalagem) / (1 - (total_percentual / 100))
-    
-    # Cálculo dos valores individuais com base no preço de venda
-    comissao_valor = preco_venda * (comissao / 100)
-    nota_fiscal_valor = preco_venda * (nota_fiscal / 100)
-    outras_taxas_valor = preco_venda * (outras_taxas / 100)
-    
-    # O lucro efetivo é o lucro desejado (definido como percentual sobre o custo)
-    lucro = lucro_desejado
-    
-    # Valor líquido que o vendedor recebe
-    recebe = preco_venda - comissao_valor - taxa_fixa - nota_fiscal_valor - embalagem - outras_taxas_valor
-    
-    return preco_venda, comissao_valor, taxa_fixa, nota_fiscal_valor, embalagem, outras_taxas_valor, lucro, recebe
-
-st.set_page_config(page_title="Calculadora de Preços para Marketplaces", layout="wide")
-
-st.title("Calculadora de Preços para Marketplaces")
-
-tab1, tab2, tab3, tab4 = st.tabs(["Shopee", "Mercado Livre", "TikTok Shop", "Kawaii"])
-
-with tab1:
-    st.header("Calculadora Shopee")
-    
-    # Entradas do usuário para Shopee
-    preco_custo_shopee = st.number_input("Preço de Custo (R$):", min_value=0.0, value=10.0, step=0.1, key="custo_shopee")
-    margem_lucro_shopee = st.number_input("Margem de Lucro Desejada (%):", min_value=0.0, max_value=100.0, value=50.0, step=0.1, key="margem_shopee")
-    comissao_shopee = st.number_input("Comissão da Shopee (%):", min_value=0.0, max_value=100.0, value=20.0, step=0.1, key="comissao_shopee")
-    taxa_fixa_shopee = st.number_input("Taxa Fixa (Frete) (R$):", min_value=0.0, value=4.0, step=0.1, key="taxa_shopee")
-    nota_fiscal_shopee = st.number_input("Nota Fiscal (%):", min_value=0.0, max_value=100.0, value=5.0, step=0.1, key="nf_shopee")
-    embalagem_shopee = st.number_input("Custo de Embalagem (R$):", min_value=0.0, value=1.0, step=0.1, key="embalagem_shopee")
-    
-    # Chamando a função para Shopee
-    if st.button("Calcular Preço Shopee"):
-        preco_venda, comissao_valor, taxa_fixa, nota_fiscal_valor, embalagem, outras_taxas_valor, lucro, recebe = calcular_preco_venda(
-            preco_custo_shopee, comissao_shopee, taxa_fixa_shopee, nota_fiscal_shopee, embalagem_shopee, margem_lucro_shopee
-        )
-        
-        # Exibição dos resultados Shopee
-        st.subheader("Resultados Shopee")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Preço de Venda", f"R$ {preco_venda:.2f}")
-            st.metric(f"Comissão ({comissao_shopee}%)", f"R$ {comissao_valor:.2f}")
-            st.metric("Taxa Fixa", f"R$ {taxa_fixa:.2f}")
-            st.metric("Embalagem", f"R$ {embalagem:.2f}")
-        
-        with col2:
-            st.metric(f"Nota Fiscal ({nota_fiscal_shopee}%)", f"R$ {nota_fiscal_valor:.2f}")
-            st.metric("Lucro Desejado", f"R$ {lucro:.2f}")
-            st.metric("Valor Líquido Recebido", f"R$ {recebe:.2f}")
-            st.info("O valor líquido é o que você recebe após descontar todas as taxas e custos.")
-
-with tab2:
-    st.header("Calculadora Mercado Livre")
-    
-    # Entradas do usuário para Mercado Livre
-    preco_custo_ml = st.number_input("Preço de Custo (R$):", min_value=0.0, value=10.0, step=0.1, key="custo_ml")
-    margem_lucro_ml = st.number_input("Margem de Lucro Desejada (%):", min_value=0.0, max_value=100.0, value=50.0, step=0.1, key="margem_ml")
-    comissao_ml = st.number_input("Comissão do Mercado Livre (%):", min_value=0.0, max_value=100.0, value=17.0, step=0.1, key="comissao_ml")
-    taxa_fixa_ml = st.number_input("Taxa Fixa (Frete) (R$):", min_value=0.0, value=5.0, step=0.1, key="taxa_ml")
-    nota_fiscal_ml = st.number_input("Nota Fiscal (%):", min_value=0.0, max_value=100.0, value=5.0, step=0.1, key="nf_ml")
-    embalagem_ml = st.number_input("Custo de Embalagem (R$):", min_value=0.0, value=1.5, step=0.1, key="embalagem_ml")
-    taxa_anuncio_ml = st.number_input("Taxa de Anúncio (%):", min_value=0.0, max_value=100.0, value=2.0, step=0.1, key="anuncio_ml")
-    
-    # Chamando a função para Mercado Livre
-    if st.button("Calcular Preço Mercado Livre"):
-        preco_venda, comissao_valor, taxa_fixa, nota_fiscal_valor, embalagem, outras_taxas_valor, lucro, recebe = calcular_preco_venda(
-            preco_custo_ml, comissao_ml, taxa_fixa_ml, nota_fiscal_ml, embalagem_ml, margem_lucro_ml, taxa_anuncio_ml
-        )
-        
-        # Exibição dos resultados Mercado Livre
-        st.subheader("Resultados Mercado Livre")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Preço de Venda", f"R$ {preco_venda:.2f}")
-            st.metric(f"Comissão ({comissao_ml}%)", f"R$ {comissao_valor:.2f}")
-            st.metric("Taxa Fixa", f"R$ {taxa_fixa:.2f}")
-            st.metric("Embalagem", f"R$ {embalagem:.2f}")
-        
-        with col2:
-            st.metric(f"Nota Fiscal ({nota_fiscal_ml}%)", f"R$ {nota_fiscal_valor:.2f}")
-            st.metric(f"Taxa de Anúncio ({taxa_anuncio_ml}%)", f"R$ {outras_taxas_valor:.2f}")
-            st.metric("Lucro Desejado", f"R$ {lucro:.2f}")
-            st.metric("Valor Líquido Recebido", f"R$ {recebe:.2f}")
-            st.info("O valor líquido é o que você recebe após descontar todas as taxas e custos.")
-
-with tab3:
-    st.header("Calculadora TikTok Shop")
-    
-    # Entradas do usuário para TikTok Shop
-    preco_custo_tiktok = st.number_input("Preço de Custo (R$):", min_value=0.0, value=10.0, step=0.1, key="custo_tiktok")
-    margem_lucro_tiktok = st.number_input("Margem de Lucro Desejada (%):", min_value=0.0, max_value=100.0, value=50.0, step=0.1, key="margem_tiktok")
-    comissao_tiktok = st.number_input("Comissão do TikTok Shop (%):", min_value=0.0, max_value=100.0, value=8.0, step=0.1, key="comissao_tiktok")
-    taxa_fixa_tiktok = st.number_input("Taxa Fixa (Frete) (R$):", min_value=0.0, value=3.5, step=0.1, key="taxa_tiktok")
-    nota_fiscal_tiktok = st.number_input("Nota Fiscal (%):", min_value=0.0, max_value=100.0, value=5.0, step=0.1, key="nf_tiktok")
-    embalagem_tiktok = st.number_input("Custo de Embalagem (R$):", min_value=0.0, value=1.0, step=0.1, key="embalagem_tiktok")
-    taxa_promocao_tiktok = st.number_input("Taxa de Promoção (%):", min_value=0.0, max_value=100.0, value=3.0, step=0.1, key="promocao_tiktok")
-    
-    # Chamando a função para TikTok Shop
-    if st.button("Calcular Preço TikTok Shop"):
-        preco_venda, comissao_valor, taxa_fixa, nota_fiscal_valor, embalagem, outras_taxas_valor, lucro, recebe = calcular_preco_venda(
-            preco_custo_tiktok, comissao_tiktok, taxa_fixa_tiktok, nota_fiscal_tiktok, embalagem_tiktok, margem_lucro_tiktok, taxa_promocao_tiktok
+# Superfície custo x margem por plataforma, calculada uma vez e consultada a cada ajuste;
+# `versao` (mtime e tamanho de marketplaces.json) entra na chave do cache, assim
+# editar o registro recalcula a superfície
+@st.cache_data(max_entries=16)
+def _superficie_marketplaces(nota_fiscal, embalagem, categoria, incluir_taxa_fixa, versao):
+    return superficie_marketplaces(
+        custos=np.arange(0, 500.5, 0.5),
+        margens=np.arange(0, 100.5, 1.0),
+        nota_fiscal=nota_fiscal,
+        embalagem=embalagem,
+        marketplaces=carregar_marketplaces(),
+        categoria=categoria,
+        incluir_taxa_fixa=incluir_taxa_fixa,
+    )
+
+
+def main():
+    st.set_page_config(page_title="Calculadora de Preços para Marketplaces", layout="wide")
+
+    st.title("Calculadora de Preços para Marketplaces")
+
+    # Registro de plataformas (marketplaces.json): adicionar uma plataforma não exige código novo
+    marketplaces = carregar_marketplaces()
+    categorias = sorted({c for m in marketplaces.values() for c in m.comissoes_categoria})
+
+    # Cada seção é um fragmento: alterar um campo reexecuta só a seção, não a página
+    abas = st.tabs(list(marketplaces))
+
+    for aba, (nome, marketplace) in zip(abas, marketplaces.items()):
+        with aba:
+            _calculadora_marketplace(nome, marketplace)
+
+    # Adicionar uma seção de comparação
+    st.header("Comparação entre Plataformas")
+    st.write("Compare os resultados entre todas as plataformas simultaneamente:")
+    _comparacao(categorias)
+
+    _preco_alvo(categorias)
+    _melhor_plataforma_lote(marketplaces, categorias)
+
+    # Adicionar informações úteis (taxas lidas do registro)
+    st.sidebar.title("Informações Úteis")
+    st.sidebar.info("### Sobre as taxas:\n" + "\n".join(
+        f"- **{nome}**: {_resumo_taxas(marketplace)}" for nome, marketplace in marketplaces.items()
+    ))
+
+    st.sidebar.warning("""
+### Dicas:
+- Sempre verifique as taxas atuais das plataformas, pois elas podem mudar
+- Considere os custos de logística ao definir seu preço
+- Avalie o custo-benefício de cada plataforma para seu produto
+""")
+
+
+def _resumo_taxas(marketplace):
+    """Comissão, taxa fixa e adicionais de uma plataforma em uma linha."""
+    comissoes = [marketplace.comissao, *marketplace.comissoes_categoria.values()]
+    if min(comissoes) == max(comissoes):
+        partes = [f"Comissão de {marketplace.comissao:g}%"]
+    else:
+        partes = [f"Comissão entre {min(comissoes):g}-{max(comissoes):g}% dependendo da categoria"]
+    taxas = [valor for _, valor in marketplace.faixas_taxa_fixa]
+    if len(taxas) > 1:
+        partes.append(f"taxa fixa de R$ {min(taxas):.2f} a R$ {max(taxas):.2f} conforme o preço")
+    elif taxas[0]:
+        partes.append(f"taxa fixa de R$ {taxas[0]:.2f}")
+    partes += [f"{rotulo} de {valor:g}%" for rotulo, valor in marketplace.adicionais.items()]
+    return ", ".join(partes)
+
+
+@st.fragment
+def _calculadora_marketplace(nome, marketplace):
+    st.header(f"Calculadora {nome}")
+
+    # Entradas do usuário, com os valores do registro como padrão
+    preco_custo = st.number_input("Preço de Custo (R$):", min_value=0.0, value=10.0, step=0.1, key=f"custo_{nome}")
+    margem_lucro = st.number_input("Margem de Lucro Desejada (%):", min_value=0.0, max_value=100.0, value=50.0, step=0.1, key=f"margem_{nome}")
+    comissao = st.number_input(f"Comissão da {nome} (%):", min_value=0.0, max_value=100.0, value=marketplace.comissao, step=0.1, key=f"comissao_{nome}")
+    por_faixa = len(marketplace.faixas_taxa_fixa) > 1
+    if por_faixa:
+        # A taxa depende do preço final: o preço é resolvido faixa a faixa
+        st.caption("Taxa fixa por faixa de preço: " + "; ".join(
+            f"até R$ {limite:.2f}: R$ {valor:.2f}" if limite != float("inf") else f"acima: R$ {valor:.2f}"
+            for limite, valor in marketplace.faixas_taxa_fixa
+        ))
+    else:
+        taxa_fixa = st.number_input("Taxa Fixa (Frete) (R$):", min_value=0.0, value=marketplace.taxa_fixa(), step=0.1, key=f"taxa_{nome}")
+    nota_fiscal = st.number_input("Nota Fiscal (%):", min_value=0.0, max_value=100.0, value=5.0, step=0.1, key=f"nf_{nome}")
+    embalagem = st.number_input("Custo de Embalagem (R$):", min_value=0.0, value=1.0, step=0.1, key=f"embalagem_{nome}")
+    adicionais = {
+        rotulo: st.number_input(f"{rotulo} (%):", min_value=0.0, max_value=100.0, value=valor, step=0.1, key=f"{rotulo}_{nome}")
+        for rotulo, valor in marketplace.adicionais.items()
+    }
+
+    # Recalculado a cada alteração, só dentro deste fragmento
+    if por_faixa:
+        preco_venda, comissao_valor, taxa_fixa, nota_fiscal_valor, embalagem, outras_taxas_valor, lucro, recebe = calcular_preco_venda_faixas(
+            preco_custo, comissao, marketplace.faixas_taxa_fixa, nota_fiscal, embalagem, margem_lucro, sum(adicionais.values())
         )
-        
-        # Exibição dos resultados TikTok Shop
-        st.subheader("Resultados TikTok Shop")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Preço de Venda", f"R$ {preco_venda:.2f}")
-            st.metric(f"Comissão ({comissao_tiktok}%)", f"R$ {comissao_valor:.2f}")
-            st.metric("Taxa Fixa", f"R$ {taxa_fixa:.2f}")
-            st.metric("Embalagem", f"R$ {embalagem:.2f}")
-        
-        with col2:
-            st.metric(f"Nota Fiscal ({nota_fiscal_tiktok}%)", f"R$ {nota_fiscal_valor:.2f}")
-            st.metric(f"Taxa de Promoção ({taxa_promocao_tiktok}%)", f"R$ {outras_taxas_valor:.2f}")
-            st.metric("Lucro Desejado", f"R$ {lucro:.2f}")
-            st.metric("Valor Líquido Recebido", f"R$ {recebe:.2f}")
-            st.info("O valor líquido é o que você recebe após descontar todas as taxas e custos.")
-
-with tab4:
-    st.header("Calculadora Kawaii")
-    
-    # Entradas do usuário para Kawaii
-    preco_custo_kawaii = st.number_input("Preço de Custo (R$):", min_value=0.0, value=10.0, step=0.1, key="custo_kawaii")
-    margem_lucro_kawaii = st.number_input("Margem de Lucro Desejada (%):", min_value=0.0, max_value=100.0, value=50.0, step=0.1, key="margem_kawaii")
-    comissao_kawaii = st.number_input("Comissão da Kawaii (%):", min_value=0.0, max_value=100.0, value=15.0, step=0.1, key="comissao_kawaii")
-    taxa_fixa_kawaii = st.number_input("Taxa Fixa (Frete) (R$):", min_value=0.0, value=3.0, step=0.1, key="taxa_kawaii")
-    nota_fiscal_kawaii = st.number_input("Nota Fiscal (%):", min_value=0.0, max_value=100.0, value=5.0, step=0.1, key="nf_kawaii")
-    embalagem_kawaii = st.number_input("Custo de Embalagem (R$):", min_value=0.0, value=0.8, step=0.1, key="embalagem_kawaii")
-    taxa_plataforma_kawaii = st.number_input("Taxa da Plataforma (%):", min_value=0.0, max_value=100.0, value=2.5, step=0.1, key="plataforma_kawaii")
-    
-    # Chamando a função para Kawaii
-    if st.button("Calcular Preço Kawaii"):
+    else:
         preco_venda, comissao_valor, taxa_fixa, nota_fiscal_valor, embalagem, outras_taxas_valor, lucro, recebe = calcular_preco_venda(
-            preco_custo_kawaii, comissao_kawaii, taxa_fixa_kawaii, nota_fiscal_kawaii, embalagem_kawaii, margem_lucro_kawaii, taxa_plataforma_kawaii
+            preco_custo, comissao, taxa_fixa, nota_fiscal, embalagem, margem_lucro, sum(adicionais.values())
         )
-        
-        # Exibição dos resultados Kawaii
-        st.subheader("Resultados Kawaii")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("Preço de Venda", f"R$ {preco_venda:.2f}")
-            st.metric(f"Comissão ({comissao_kawaii}%)", f"R$ {comissao_valor:.2f}")
-            st.metric("Taxa Fixa", f"R$ {taxa_fixa:.2f}")
-            st.metric("Embalagem", f"R$ {embalagem:.2f}")
-        
-        with col2:
-            st.metric(f"Nota Fiscal ({nota_fiscal_kawaii}%)", f"R$ {nota_fiscal_valor:.2f}")
-            st.metric(f"Taxa da Plataforma ({taxa_plataforma_kawaii}%)", f"R$ {outras_taxas_valor:.2f}")
-            st.metric("Lucro Desejado", f"R$ {lucro:.2f}")
-            st.metric("Valor Líquido Recebido", f"R$ {recebe:.2f}")
-            st.info("O valor líquido é o que você recebe após descontar todas as taxas e custos.")
-
-# Adicionar uma seção de comparação
-st.header("Comparação entre Plataformas")
-st.write("Compare os resultados entre todas as plataformas simultaneamente:")
-
-with st.expander("Comparação Automática de Preços", expanded=True):
-    # Campos unificados para a comparação
-    st.subheader("Insira os dados para comparação")
-    
+
+    # Exibição dos resultados
+    st.subheader(f"Resultados {nome}")
+
     col1, col2 = st.columns(2)
-    
     with col1:
-        preco_custo_comp = st.number_input("Preço de Custo (R$):", min_value=0.0, value=10.0, step=0.1, key="custo_comp")
-        margem_lucro_comp = st.number_input("Margem de Lucro Desejada (%):", min_value=0.0, max_value=100.0, value=50.0, step=0.1, key="margem_comp")
-        embalagem_comp = st.number_input("Custo de Embalagem (R$):", min_value=0.0, value=1.0, step=0.1, key="embalagem_comp")
-    
+        st.metric("Preço de Venda", f"R$ {preco_venda:.2f}")
+        st.metric(f"Comissão ({comissao}%)", f"R$ {comissao_valor:.2f}")
+        st.metric("Taxa Fixa", f"R$ {taxa_fixa:.2f}")
+        st.metric("Embalagem", f"R$ {embalagem:.2f}")
+
     with col2:
-        nota_fiscal_comp = st.number_input("Nota Fiscal (%):", min_value=0.0, max_value=100.0, value=5.0, step=0.1, key="nf_comp")
-        incluir_frete = st.checkbox("Incluir taxas de frete", value=True)
-    
-    # Taxas predefinidas para cada marketplace
-    if incluir_frete:
-        taxa_fixa_shopee_comp = 4.0
-        taxa_fixa_ml_comp = 5.0
-        taxa_fixa_tiktok_comp = 3.5
-        taxa_fixa_kawaii_comp = 3.0
-    else:
-        taxa_fixa_shopee_comp = 0.0
-        taxa_fixa_ml_comp = 0.0
-        taxa_fixa_tiktok_comp = 0.0
-        taxa_fixa_kawaii_comp = 0.0
-    
-    # Calcular para todas as plataformas quando o botão for pressionado
-    if st.button("Calcular e Comparar Todas as Plataformas"):
-        # Shopee
-        preco_venda_shopee, comissao_valor_shopee, _, nota_fiscal_valor_shopee, _, _, lucro_shopee, recebe_shopee = calcular_preco_venda(
-            preco_custo_comp, 20.0, taxa_fixa_shopee_comp, nota_fiscal_comp, embalagem_comp, margem_lucro_comp
-        )
-        
-        # Mercado Livre
-        preco_venda_ml, comissao_valor_ml, _, nota_fiscal_valor_ml, _, outras_taxas_valor_ml, lucro_ml, recebe_ml = calcular_preco_venda(
-            preco_custo_comp, 17.0, taxa_fixa_ml_comp, nota_fiscal_comp, embalagem_comp, margem_lucro_comp, 2.0
-        )
-        
-        # TikTok Shop
-        preco_venda_tiktok, comissao_valor_tiktok, _, nota_fiscal_valor_tiktok, _, outras_taxas_valor_tiktok, lucro_tiktok, recebe_tiktok = calcular_preco_venda(
-            preco_custo_comp, 8.0, taxa_fixa_tiktok_comp, nota_fiscal_comp, embalagem_comp, margem_lucro_comp, 3.0
-        )
-        
-        # Kawaii
-        preco_venda_kawaii, comissao_valor_kawaii, _, nota_fiscal_valor_kawaii, _, outras_taxas_valor_kawaii, lucro_kawaii, recebe_kawaii = calcular_preco_venda(
-            preco_custo_comp, 15.0, taxa_fixa_kawaii_comp, nota_fiscal_comp, embalagem_comp, margem_lucro_comp, 2.5
+        st.metric(f"Nota Fiscal ({nota_fiscal}%)", f"R$ {nota_fiscal_valor:.2f}")
+        if adicionais:
+            rotulo = " + ".join(f"{r} ({v}%)" for r, v in adicionais.items())
+            st.metric(rotulo, f"R$ {outras_taxas_valor:.2f}")
+        st.metric("Lucro", f"R$ {lucro:.2f}")
+        st.metric("Valor Líquido Recebido", f"R$ {recebe:.2f}")
+        st.info("O valor líquido é o que você recebe após descontar todas as taxas e custos.")
+
+
+@st.fragment
+def _comparacao(categorias):
+    with st.expander("Comparação Automática de Preços", expanded=True):
+        # Campos unificados para a comparação
+        st.subheader("Insira os dados para comparação")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            preco_custo_comp = st.number_input("Preço de Custo (R$):", min_value=0.0, value=10.0, step=0.1, key="custo_comp")
+            margem_lucro_comp = st.number_input("Margem de Lucro Desejada (%):", min_value=0.0, max_value=100.0, value=50.0, step=0.1, key="margem_comp")
+            embalagem_comp = st.number_input("Custo de Embalagem (R$):", min_value=0.0, value=1.0, step=0.1, key="embalagem_comp")
+
+        with col2:
+            nota_fiscal_comp = st.number_input("Nota Fiscal (%):", min_value=0.0, max_value=100.0, value=5.0, step=0.1, key="nf_comp")
+            incluir_frete = st.checkbox("Incluir taxas de frete", value=True)
+            categoria_comp = st.selectbox("Categoria do Produto:", ["Padrão"] + categorias, key="categoria_comp")
+
+        # Uma única chamada vetorizada para todas as plataformas do registro
+        # (memorizada: a mesma comparação volta do cache até marketplaces.json mudar)
+        df = MEMO.chamar(
+            comparar_marketplaces,
+            preco_custo_comp, nota_fiscal_comp, embalagem_comp, margem_lucro_comp,
+            categoria=None if categoria_comp == "Padrão" else categoria_comp,
+            incluir_taxa_fixa=incluir_frete,
+            dependencias=(ARQUIVO_MARKETPLACES,)
         )
-        
-        # Criar dataframe para visualização
-        import pandas as pd
-        
-        data = {
-            'Plataforma': ['Shopee', 'Mercado Livre', 'TikTok Shop', 'Kawaii'],
-            'Preço de Venda (R$)': [preco_venda_shopee, preco_venda_ml, preco_venda_tiktok, preco_venda_kawaii],
-            'Comissão (R$)': [comissao_valor_shopee, comissao_valor_ml, comissao_valor_tiktok, comissao_valor_kawaii],
-            'Nota Fiscal (R$)': [nota_fiscal_valor_shopee, nota_fiscal_valor_ml, nota_fiscal_valor_tiktok, nota_fiscal_valor_kawaii],
-            'Taxas Adicionais (R$)': [0, outras_taxas_valor_ml, outras_taxas_valor_tiktok, outras_taxas_valor_kawaii],
-            'Frete (R$)': [taxa_fixa_shopee_comp, taxa_fixa_ml_comp, taxa_fixa_tiktok_comp, taxa_fixa_kawaii_comp],
-            'Embalagem (R$)': [embalagem_comp, embalagem_comp, embalagem_comp, embalagem_comp],
-            'Lucro (R$)': [lucro_shopee, lucro_ml, lucro_tiktok, lucro_kawaii],
-            'Valor Líquido (R$)': [recebe_shopee, recebe_ml, recebe_tiktok, recebe_kawaii]
-        }
-        
-        df = pd.DataFrame(data)
-        
+
         # Exibir tabela comparativa
         st.subheader("Tabela Comparativa")
-        st.dataframe(df.style.format({
-            'Preço de Venda (R$)': '{:.2f}',
-            'Comissão (R$)': '{:.2f}',
-            'Nota Fiscal (R$)': '{:.2f}',
-            'Taxas Adicionais (R$)': '{:.2f}',
-            'Frete (R$)': '{:.2f}',
-            'Embalagem (R$)': '{:.2f}',
-            'Lucro (R$)': '{:.2f}',
-            'Valor Líquido (R$)': '{:.2f}'
-        }))
-        
+        st.dataframe(df.style.format({coluna: '{:.2f}' for coluna in df.columns if coluna != 'Plataforma'}))
+
         # Gráfico comparativo de preços de venda
         st.subheader("Comparação de Preços de Venda")
-        chart_data = pd.DataFrame({
-            'Plataforma': ['Shopee', 'Mercado Livre', 'TikTok Shop', 'Kawaii'],
-            'Preço de Venda': [preco_venda_shopee, preco_venda_ml, preco_venda_tiktok, preco_venda_kawaii]
-        })
-        st.bar_chart(chart_data.set_index('Plataforma'))
-        
+        st.bar_chart(df.set_index('Plataforma')[['Preço de Venda (R$)']].rename(columns={'Preço de Venda (R$)': 'Preço de Venda'}))
+
         # Gráfico comparativo de lucro
         st.subheader("Comparação de Valor Líquido Recebido")
-        chart_data = pd.DataFrame({
-            'Plataforma': ['Shopee', 'Mercado Livre', 'TikTok Shop', 'Kawaii'],
-            'Valor Líquido': [recebe_shopee, recebe_ml, recebe_tiktok, recebe_kawaii]
-        })
-        st.bar_chart(chart_data.set_index('Plataforma'))
-        
-        # Mostrar a plataforma mais vantajosa
-        melhor_plataforma = df.loc[df['Valor Líquido (R$)'].idxmax()]['Plataforma']
-        maior_valor_liquido = df['Valor Líquido (R$)'].max()
-        
-        st.success(f"A plataforma mais vantajosa para este produto é: **{melhor_plataforma}** com valor líquido de R$ {maior_valor_liquido:.2f}")
-        
+        st.bar_chart(df.set_index('Plataforma')[['Valor Líquido (R$)']].rename(columns={'Valor Líquido (R$)': 'Valor Líquido'}))
+
+        # Mostrar a plataforma mais vantajosa: com a margem sobre o custo o valor
+        # líquido é o mesmo em todas, então vence o menor preço de venda (como
+        # em melhores_marketplaces); preço zero indica percentuais inválidos
+        precos = df['Preço de Venda (R$)'].where(df['Preço de Venda (R$)'] > 0)
+        if precos.notna().any():
+            melhor = df.loc[precos.idxmin()]
+            st.success(f"A plataforma mais vantajosa para este produto é: **{melhor['Plataforma']}** com o menor preço de venda, "
+                       f"R$ {melhor['Preço de Venda (R$)']:.2f} (valor líquido de R$ {melhor['Valor Líquido (R$)']:.2f})")
+        else:
+            st.warning("Nenhuma plataforma tem percentuais válidos (a soma das taxas chega a 100%).")
+
         # Resumo da rentabilidade
         st.subheader("Resumo da Rentabilidade")
         for index, row in df.iterrows():
@@ -284,19 +198,104 @@ with st.expander("Comparação Automática de Preços", expanded=True):
             percentual_lucro = (row['Valor Líquido (R$)'] / preco_custo_comp - 1) * 100
             st.write(f"**{plataforma}**: Rentabilidade de **{percentual_lucro:.2f}%** sobre o preço de custo")
 
-# Adicionar informações úteis
-st.sidebar.title("Informações Úteis")
-st.sidebar.info("""
-### Sobre as taxas:
-- **Shopee**: Comissão entre 15-20% dependendo da categoria
-- **Mercado Livre**: Comissão entre 12-22% dependendo da categoria, plus taxa de anúncio 
-- **TikTok Shop**: Comissão entre 5-10% dependendo da categoria, plus taxas promocionais
-- **Kawaii**: Comissão entre 13-18% dependendo da categoria
-""")
+    with st.expander("Sensibilidade: Custo x Margem"):
+        superficie = _superficie_marketplaces(
+            nota_fiscal_comp, embalagem_comp,
+            None if categoria_comp == "Padrão" else categoria_comp, incluir_frete,
+            versao_catalogo(ARQUIVO_MARKETPLACES)
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            custo_sens = st.slider("Preço de Custo (R$)", 0.0, 500.0, float(min(preco_custo_comp, 500.0)), 0.5, key="custo_sens")
+        with col2:
+            margem_sens = st.slider("Margem de Lucro (%)", 0, 100, int(margem_lucro_comp), key="margem_sens")
 
-st.sidebar.warning("""
-### Dicas:
-- Sempre verifique as taxas atuais das plataformas, pois elas podem mudar
-- Considere os custos de logística ao definir seu preço
-- Avalie o custo-benefício de cada plataforma para seu produto
-""")
\ No newline at end of file
+        # Consulta na superfície: sem recalcular as plataformas
+        ponto = superficie.consultar(custo_sens, margem_sens)
+        st.dataframe(pd.DataFrame(
+            {chave: valores for chave, valores in ponto.items()},
+            index=pd.Index(superficie.rotulos, name="Plataforma")
+        ).style.format('{:.2f}'))
+
+        st.subheader("Preço de Venda por Custo")
+        st.line_chart(superficie.fatia('Preço de Venda', **{"Margem (%)": margem_sens}))
+        st.subheader("Preço de Venda por Margem")
+        st.line_chart(superficie.fatia('Preço de Venda', **{"Custo (R$)": custo_sens}))
+
+
+@st.fragment
+def _preco_alvo(categorias):
+    # Cálculo inverso: preço de venda fixo -> margem e custo máximo por plataforma
+    with st.expander("Preço Alvo por Plataforma"):
+        col1, col2 = st.columns(2)
+        with col1:
+            preco_alvo = st.number_input("Preço de Venda Desejado (R$):", min_value=0.0, value=49.90, step=0.1, key="preco_alvo")
+            custo_alvo = st.number_input("Preço de Custo (R$):", min_value=0.0, value=20.0, step=0.1, key="custo_alvo")
+            margem_alvo = st.number_input("Margem de Lucro Desejada (%):", min_value=0.0, max_value=100.0, value=50.0, step=0.1, key="margem_alvo")
+        with col2:
+            nota_fiscal_alvo = st.number_input("Nota Fiscal (%):", min_value=0.0, max_value=100.0, value=5.0, step=0.1, key="nf_alvo")
+            embalagem_alvo = st.number_input("Custo de Embalagem (R$):", min_value=0.0, value=1.0, step=0.1, key="embalagem_alvo")
+            categoria_alvo = st.selectbox("Categoria do Produto:", ["Padrão"] + categorias, key="categoria_alvo")
+
+        df_alvo = MEMO.chamar(
+            avaliar_preco_alvo,
+            preco_alvo, custo_alvo, nota_fiscal_alvo, embalagem_alvo, margem_alvo,
+            categoria=None if categoria_alvo == "Padrão" else categoria_alvo,
+            dependencias=(ARQUIVO_MARKETPLACES,)
+        )
+        st.dataframe(df_alvo.style.format({coluna: '{:.2f}' for coluna in df_alvo.columns if coluna != 'Plataforma'}))
+
+
+@st.fragment
+def _melhor_plataforma_lote(marketplaces, categorias):
+    # Melhor canal para um catálogo inteiro de produtos
+    with st.expander("Melhor Plataforma por Produto (catálogo)"):
+        st.write("Envie um CSV com a coluna `preco_custo` e, opcionalmente, `embalagem`, "
+                 "`classe_peso`, `margem_lucro` e `nota_fiscal`.")
+        arquivo_produtos = st.file_uploader("Catálogo de produtos (CSV)", type=["csv"], key="catalogo_produtos")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            margem_lucro_lote = st.number_input("Margem de Lucro Padrão (%):", min_value=0.0, max_value=100.0, value=50.0, step=0.1, key="margem_lote")
+            embalagem_lote = st.number_input("Embalagem Padrão (R$):", min_value=0.0, value=1.0, step=0.1, key="embalagem_lote")
+        with col2:
+            nota_fiscal_lote = st.number_input("Nota Fiscal Padrão (%):", min_value=0.0, max_value=100.0, value=5.0, step=0.1, key="nf_lote")
+            categoria_lote = st.selectbox("Categoria dos Produtos:", ["Padrão"] + categorias, key="categoria_lote")
+
+        if arquivo_produtos is not None and st.button("Comparar Catálogo"):
+            # Lido e calculado em blocos: só um bloco de produtos x plataformas fica
+            # em memória; o resumo é acumulado e o CSV é gravado bloco a bloco
+            vitorias = pd.Series(dtype="int64")
+            primeiras, quantidade = [], 0
+            saida = io.BytesIO()
+            try:
+                for bloco in varrer_marketplaces(
+                    pd.read_csv(arquivo_produtos, chunksize=50_000),
+                    nota_fiscal=nota_fiscal_lote,
+                    embalagem=embalagem_lote,
+                    margem_lucro=margem_lucro_lote,
+                    marketplaces=marketplaces,
+                    categoria=None if categoria_lote == "Padrão" else categoria_lote,
+                ):
+                    vitorias = vitorias.add(bloco['Melhor Plataforma'].value_counts(), fill_value=0)
+                    if quantidade < 1000:
+                        primeiras.append(bloco.head(1000 - quantidade))
+                        quantidade += len(primeiras[-1])
+                    bloco.to_csv(saida, header=saida.tell() == 0, index=False, encoding="utf-8")
+            except KeyError as erro:
+                st.error(f"CSV inválido: {erro.args[0]}")
+                return
+
+            st.subheader("Produtos por Melhor Plataforma")
+            st.bar_chart(vitorias.astype("int64").sort_values(ascending=False).rename("count"))
+            if primeiras:
+                st.dataframe(pd.concat(primeiras, ignore_index=True))
+            st.download_button(
+                "Baixar resultado (CSV)",
+                saida,
+                file_name="melhor_plataforma_por_produto.csv",
+                mime="text/csv"
+            )
+
+if __name__ == "__main__":
+    main()
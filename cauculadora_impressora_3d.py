@@ -1,164 +1,33 @@
+from datetime import datetime, time, timedelta
+
+import altair as alt
+import numpy as np
 import streamlit as st
 import pandas as pd
-from dataclasses import dataclass
-from typing import Dict, List, Tuple
-import json
-import os
-from datetime import datetime
-
-@dataclass
-class Filamento:
-    nome: str
-    marca: str
-    material: str
-    diametro: float
-    comprimento_total: int  # metros por kg
-    peso_total: float      # em kg
-    preco: float          # preço por kg
-    
-    def calcular_peso_por_metro(self) -> float:
-        """Calcula o peso em gramas por metro de filamento."""
-        return (self.peso_total * 1000) / self.comprimento_total
-    
-    def calcular_preco_por_metro(self) -> float:
-        """Calcula o preço por metro de filamento."""
-        return self.preco / self.comprimento_total
-    
-    def calcular_preco_por_grama(self) -> float:
-        """Calcula o preço por grama de filamento."""
-        return self.preco / (self.peso_total * 1000)
-
-# Catálogo de filamentos padrão
-DEFAULT_FILAMENTOS = {
-    "Creality Hyper PLA": Filamento("Hyper PLA", "Creality", "PLA", 1.75, 330, 1.0, 120.00),
-    "3D Lab PLA+": Filamento("PLA+", "3D Lab", "PLA+", 1.75, 330, 1.0, 130.00),
-    "3D Fila PETG": Filamento("PETG Premium", "3D Fila", "PETG", 1.75, 335, 1.0, 140.00),
-    "3DX ABS Premium": Filamento("ABS Premium", "3DX", "ABS", 1.75, 340, 1.0, 110.00),
-    "Flexível TPU": Filamento("TPU Flex", "3D Prime", "TPU", 1.75, 320, 1.0, 180.00)
-}
-
-def salvar_catalogo(catalogo: Dict[str, Filamento], arquivo: str = "catalogo_filamentos.json") -> None:
-    """Salva o catálogo de filamentos em um arquivo JSON."""
-    # Convertendo objetos Filamento para dicionários
-    catalogo_dict = {
-        nome: {
-            "nome": f.nome,
-            "marca": f.marca,
-            "material": f.material,
-            "diametro": f.diametro,
-            "comprimento_total": f.comprimento_total,
-            "peso_total": f.peso_total,
-            "preco": f.preco
-        }
-        for nome, f in catalogo.items()
-    }
-    
-    with open(arquivo, 'w', encoding='utf-8') as f:
-        json.dump(catalogo_dict, f, ensure_ascii=False, indent=4)
-    
-    return True
-
-def carregar_catalogo(arquivo: str = "catalogo_filamentos.json") -> Dict[str, Filamento]:
-    """Carrega o catálogo de filamentos de um arquivo JSON."""
-    try:
-        with open(arquivo, 'r', encoding='utf-8') as f:
-            catalogo_dict = json.load(f)
-        
-        # Convertendo dicionários para objetos Filamento
-        return {
-            nome: Filamento(
-                nome=dados["nome"],
-                marca=dados["marca"],
-                material=dados["material"],
-                diametro=dados["diametro"],
-                comprimento_total=dados["comprimento_total"],
-                peso_total=dados["peso_total"],
-                preco=dados["preco"]
-            )
-            for nome, dados in catalogo_dict.items()
-        }
-    except (FileNotFoundError, json.JSONDecodeError):
-        # Se o arquivo não existir ou estiver corrompido, retorna o catálogo padrão
-        return DEFAULT_FILAMENTOS
-
-def calcular_preco_impressao(filamento: Filamento, 
-                             metros_usados: float, 
-                             tempo_impressao: float, 
-                             custo_energia_hora: float,
-                             custo_manutencao_hora: float, 
-                             margem_lucro: float,
-                             custo_falha: float = 0.0):
-    """
-    Calcula o preço de uma impressão 3D.
-    
-    Args:
-        filamento: Objeto Filamento usado na impressão
-        metros_usados: Quantidade de metros de filamento usados
-        tempo_impressao: Tempo de impressão em minutos
-        custo_energia_hora: Custo da energia elétrica por hora em R$
-        custo_manutencao_hora: Custo de manutenção por hora em R$
-        margem_lucro: Margem de lucro em porcentagem
-        custo_falha: Custo adicional para cobrir potenciais falhas (%)
-    
-    Returns:
-        Dict com os detalhes do cálculo
-    """
-    peso_usado = metros_usados * filamento.calcular_peso_por_metro()
-    custo_material = metros_usados * filamento.calcular_preco_por_metro()
-    tempo_impressao_horas = tempo_impressao / 60
-    custo_energia = tempo_impressao_horas * custo_energia_hora
-    custo_manutencao = tempo_impressao_horas * custo_manutencao_hora
-    
-    # Adicionar custo de falha como porcentagem do custo material
-    valor_custo_falha = custo_material * (custo_falha / 100)
-    
-    custo_total = custo_material + custo_energia + custo_manutencao + valor_custo_falha
-    preco_final = custo_total * (1 + (margem_lucro / 100))
-    
-    return {
-        'Peso Usado (g)': peso_usado,
-        'Metros Usados': metros_usados,
-        'Custo do Material': custo_material,
-        'Custo de Energia': custo_energia,
-        'Custo de Manutenção': custo_manutencao,
-        'Custo para Falhas': valor_custo_falha,
-        'Custo Total': custo_total,
-        'Preço Final': preco_final
-    }
-
-def salvar_orcamento(dados_impressao: Dict, nome_projeto: str):
-    """Salva os dados de um orçamento em um arquivo CSV."""
-    hoje = datetime.now().strftime("%Y-%m-%d")
-    
-    # Verificar se o arquivo existe
-    arquivo = "historico_orcamentos.csv"
-    arquivo_existe = os.path.isfile(arquivo)
-    
-    # Criar um DataFrame e salvar
-    df = pd.DataFrame([{
-        'Data': hoje,
-        'Projeto': nome_projeto,
-        'Filamento': dados_impressao.get('Filamento', 'Não especificado'),
-        'Metros': dados_impressao.get('Metros Usados', 0),
-        'Peso (g)': dados_impressao.get('Peso Usado (g)', 0),
-        'Tempo (min)': dados_impressao.get('Tempo (min)', 0),
-        'Custo Material': dados_impressao.get('Custo do Material', 0),
-        'Custo Energia': dados_impressao.get('Custo de Energia', 0),
-        'Custo Manutenção': dados_impressao.get('Custo de Manutenção', 0),
-        'Custo Falhas': dados_impressao.get('Custo para Falhas', 0),
-        'Custo Total': dados_impressao.get('Custo Total', 0),
-        'Preço Final': dados_impressao.get('Preço Final', 0),
-    }])
-    
-    df.to_csv(arquivo, mode='a', header=not arquivo_existe, index=False)
-    return True
-
-def carregar_historico():
-    """Carrega o histórico de orçamentos salvos."""
-    try:
-        return pd.read_csv("historico_orcamentos.csv")
-    except FileNotFoundError:
-        return pd.DataFrame()
+from nucleo.precificacao import (
+    Filamento,
+    calcular_preco_impressao,
+    margem_para_preco,
+    metros_maximos_para_preco,
+    tempo_maximo_para_preco,
+)
+from nucleo.historico import (
+    salvar_orcamento,
+    consultar_historico,
+    contar_historico,
+    listar_filamentos_historico,
+    consultar_resumo,
+    versao_historico,
+)
+from leitor_gcode import analisar_gcode
+from cinematica import completar_tempo
+from consumo_energia import analisar_aquecimento, carregar_impressoras, comparar_impressoras, perfil_padrao
+from escalonador import escalonar, impressoras_padrao, trabalhos_do_historico
+from risco_falha import custo_falha_equivalente, simular_falhas
+from sensibilidade import superficie_impressao, tabela_longa
+from tarifa_energia import BANDEIRAS, carregar_tarifas, custo_energia_hora_equivalente, melhor_horario
+from cache_catalogo import CACHE, VisaoCatalogo, versao_catalogo
+from memo_cotacao import MEMO
 
 def criar_novo_filamento():
     """Interface para criar um novo filamento."""
@@ -210,8 +79,9 @@ def main():
     )
     
     # Inicialização da sessão
+    # Cada sessão tem uma visão leve sobre o catálogo compartilhado do processo
     if 'catalogo' not in st.session_state:
-        st.session_state.catalogo = carregar_catalogo()
+        st.session_state.catalogo = VisaoCatalogo()
     
     if 'historico' not in st.session_state:
         st.session_state.historico = []
@@ -248,9 +118,69 @@ def main():
     elif st.session_state.modo == 'sobre':
         mostrar_sobre()
 
+def _limite_grade(valor, base):
+    """Limite do eixo: `base` dobrado até cobrir o dobro do valor (o mapa mostra até 2x o trabalho)."""
+    limite = base
+    while limite < 2 * valor:
+        limite *= 2
+    return limite
+
+@st.cache_data(max_entries=32)
+def _superficie_impressao(filamento, custo_energia_hora, custo_manutencao_hora, custo_falha,
+                          limite_metros=1000, limite_minutos=2880):
+    # Grade de 0-200% de margem, 0-1000 m e 0-48 h, ampliada (dobrando) para
+    # trabalhos maiores: as consultas interpolam nela sem sair da borda
+    return superficie_impressao(
+        filamento,
+        metros=np.linspace(0, limite_metros, 201),
+        minutos=np.linspace(0, limite_minutos, 193),
+        margens=np.arange(0, 201, 5),
+        custo_energia_hora=custo_energia_hora,
+        custo_manutencao_hora=custo_manutencao_hora,
+        custo_falha=custo_falha,
+    )
+
+def mostrar_sensibilidade(filamento, metros_usados, tempo_impressao,
+                          custo_energia_hora, custo_manutencao_hora, custo_falha, margem_lucro):
+    """Mapa de calor e curvas de preço a partir da superfície pré-calculada."""
+    superficie = _superficie_impressao(filamento, custo_energia_hora, custo_manutencao_hora, custo_falha,
+                                       _limite_grade(metros_usados, 1000), _limite_grade(tempo_impressao, 2880))
+    ponto = superficie.consultar(margem_lucro, metros_usados, tempo_impressao)
+    
+    col1, col2 = st.columns(2)
+    col1.metric("Preço Final", f"R$ {ponto['Preço Final']:.2f}")
+    col2.metric("Lucro", f"R$ {ponto['Lucro']:.2f}")
+    
+    # Preço por metros x minutos na margem escolhida (só a região próxima ao trabalho atual)
+    fatia = superficie.fatia('Preço Final', **{"Margem (%)": margem_lucro})
+    fatia = fatia.loc[:max(metros_usados * 2, 50), :max(tempo_impressao * 2, 240)]
+    dados = tabela_longa(fatia, 'Preço Final')
+    st.altair_chart(
+        alt.Chart(dados).mark_rect().encode(
+            x=alt.X('Minutos:Q', bin=alt.Bin(maxbins=40)),
+            y=alt.Y('Metros:Q', bin=alt.Bin(maxbins=40)),
+            color=alt.Color('mean(Preço Final):Q', title='Preço (R$)'),
+            tooltip=['Metros', 'Minutos', alt.Tooltip('Preço Final', format='.2f')],
+        ),
+        use_container_width=True
+    )
+    
+    # Preço e lucro em função da margem para o trabalho atual
+    margens = superficie.eixos[0]
+    curva = pd.DataFrame(
+        [superficie.consultar(m, metros_usados, tempo_impressao) for m in margens],
+        index=pd.Index(margens, name='Margem (%)')
+    )[['Preço Final', 'Lucro']]
+    st.line_chart(curva)
+
 def mostrar_calculadora():
     st.title('🧮 Calculadora de Preço para Impressão 3D')
-    
+    _calculadora()
+
+# Entradas e resultado num fragmento: alterar um campo reexecuta só a
+# calculadora (e não a página inteira), e o preço é recalculado na hora
+@st.fragment
+def _calculadora():
     # Layout em colunas
     col_config, col_resultado = st.columns([3, 2])
     
@@ -280,25 +210,84 @@ def mostrar_calculadora():
         - Peso por metro: {filamento.calcular_peso_por_metro():.2f}g/m
         """)
         
+        # Importação opcional do G-code gerado pelo slicer
+        arquivo_gcode = st.file_uploader('📂 Importar G-code (opcional)', type=['gcode', 'gco', 'g'],
+                                         help="Preenche metros de filamento e tempo a partir do arquivo do slicer")
+        metros_padrao, tempo_padrao = 10.0, 180
+        if arquivo_gcode is not None:
+            if st.session_state.get('gcode_id') != arquivo_gcode.file_id:
+                st.session_state.gcode_resultado = completar_tempo(analisar_gcode(arquivo_gcode), arquivo_gcode)
+                st.session_state.gcode_id = arquivo_gcode.file_id
+            gcode = st.session_state.gcode_resultado
+            metros_padrao = max(0.1, round(gcode.metros_usados, 2))
+            if gcode.tempo:
+                tempo_padrao = max(1, round(gcode.tempo))
+            if not gcode.tempo_impressao:
+                st.info("O G-code não informa o tempo do slicer; o tempo foi estimado simulando os movimentos "
+                        "(aceleração e jerk de uma impressora genérica). Ajuste se necessário.")
+        
         # Parâmetros da impressão
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader('📦 Custos do Produto')
             metros_usados = st.number_input('📏 Metros de Filamento:', 
-                                         min_value=0.1, value=10.0, step=1.0,
+                                         min_value=0.1, value=metros_padrao, step=1.0,
                                          help="Quantidade de metros de filamento usados na impressão")
             st.caption(f"Peso estimado: {metros_usados * filamento.calcular_peso_por_metro():.1f}g")
             
             tempo_impressao = st.number_input('⏱️ Tempo de Impressão (minutos):', 
-                                           min_value=1, value=180, step=30,
+                                           min_value=1, value=tempo_padrao, step=30,
                                            help="Tempo estimado de impressão em minutos")
             st.caption(f"Equivalente a {tempo_impressao/60:.1f} horas")
         
         with col2:
             st.subheader('💼 Custos Operacionais')
-            custo_energia_hora = st.number_input('⚡ Custo de Energia por Hora (R$):', 
-                                              min_value=0.1, value=0.5, step=0.1,help="Custo da energia elétrica por hora")
+            modo_energia = st.radio('⚡ Energia', ["Custo fixo por hora", "Tarifa por horário", "Modelo da impressora"],
+                                    help="Tarifa por horário: postos tarifários e bandeira. "
+                                         "Modelo da impressora: consumo dos aquecedores lido do G-code")
+            if modo_energia == "Tarifa por horário":
+                tarifas = carregar_tarifas()
+                tarifa = tarifas[st.selectbox('Tarifa:', list(tarifas))].com_bandeira(
+                    st.selectbox('Bandeira:', list(BANDEIRAS)))
+                potencia_w = st.number_input('Potência média da impressora (W):', min_value=10, value=200, step=10)
+                data_inicio = st.date_input('Início da impressão:', value=datetime.now().date())
+                hora_inicio = st.time_input('Horário de início:', value=time(8, 0))
+                inicio = datetime.combine(data_inicio, hora_inicio)
+                custo_energia_hora = float(custo_energia_hora_equivalente(
+                    inicio, tempo_impressao, potencia_w / 1000, tarifa))
+                st.caption(f"Equivale a R$ {custo_energia_hora:.3f}/h para este horário")
+                
+                # Início mais barato nas próximas 24 horas a partir do horário escolhido
+                melhor, custo_melhor = melhor_horario(tempo_impressao, potencia_w / 1000,
+                                                      inicio, inicio + timedelta(hours=24) + timedelta(minutes=tempo_impressao),
+                                                      tarifa)
+                if melhor is not None:
+                    st.caption(f"Início mais barato em 24h: {pd.Timestamp(melhor):%d/%m %H:%M} "
+                               f"(energia R$ {custo_melhor:.2f})")
+            elif modo_energia == "Modelo da impressora":
+                modelos = carregar_impressoras()
+                modelo = modelos[st.selectbox('Impressora:', list(modelos))]
+                preco_kwh = st.number_input('Preço do kWh (R$):', min_value=0.0, value=0.80, step=0.05)
+                if arquivo_gcode is not None:
+                    if st.session_state.get('aquecimento_id') != arquivo_gcode.file_id:
+                        arquivo_gcode.seek(0)
+                        st.session_state.aquecimento = analisar_aquecimento(arquivo_gcode)
+                        st.session_state.aquecimento_id = arquivo_gcode.file_id
+                    perfil = st.session_state.aquecimento
+                else:
+                    perfil = perfil_padrao()
+                    st.caption("Sem G-code: considera mesa a 60 °C e bico a 210 °C durante toda a impressão")
+                comparacao = comparar_impressoras(perfil, tempo_impressao, preco_kwh, modelos)
+                consumo = comparacao.set_index('Impressora').loc[modelo.nome]
+                custo_energia_hora = float(consumo['Custo Energia por Hora (R$)'])
+                st.caption(f"{consumo['Total (kWh)']:.3f} kWh (aquecimento {consumo['Aquecimento (kWh)']:.3f} kWh) "
+                           f"≈ R$ {custo_energia_hora:.3f}/h")
+                with st.expander('Comparar modelos'):
+                    st.dataframe(comparacao, hide_index=True, use_container_width=True)
+            else:
+                custo_energia_hora = st.number_input('⚡ Custo de Energia por Hora (R$):', 
+                                                  min_value=0.1, value=0.5, step=0.1,help="Custo da energia elétrica por hora")
             
             custo_manutencao_hora = st.number_input('🔧 Custo de Manutenção por Hora (R$):', 
                                                  min_value=0.0, value=2.0, step=0.5,help="Custo de manutenção da impressora por hora")
@@ -312,101 +301,151 @@ def mostrar_calculadora():
         margem_lucro = st.slider('Margem de Lucro (%)', 
                               min_value=0, max_value=200, value=100,help="Margem de lucro desejada em porcentagem")
         
-        # Botão de cálculo
-        if st.button('🧮 Calcular Preço', type="primary"):
-            resultados = calcular_preco_impressao(
-                filamento, 
-                metros_usados, 
-                tempo_impressao, 
-                custo_energia_hora, 
-                custo_manutencao_hora, 
-                margem_lucro,
-                custo_falha
-            )
-            
-            # Adicionar informações extras para salvar
-            resultados['Filamento'] = filamento_selecionado
-            resultados['Tempo (min)'] = tempo_impressao
-            
-            # Guardar na sessão
-            st.session_state.ultimo_resultado = resultados
-            st.session_state.ultimo_projeto = nome_projeto
-            
-            # Forçar atualização da coluna de resultados
-            st.rerun()
+        # Cálculo a cada alteração (memorizado: repetir as mesmas entradas não recalcula)
+        resultados = MEMO.chamar(
+            calcular_preco_impressao,
+            filamento, 
+            metros_usados, 
+            tempo_impressao, 
+            custo_energia_hora, 
+            custo_manutencao_hora, 
+            margem_lucro,
+            custo_falha,
+            dependencias=(st.session_state.catalogo.arquivo,)
+        )
+        
+        # Adicionar informações extras para salvar
+        resultados['Filamento'] = filamento_selecionado
+        resultados['Tempo (min)'] = tempo_impressao
+        
+        with st.expander('📈 Sensibilidade'):
+            mostrar_sensibilidade(filamento, metros_usados, tempo_impressao,
+                                  custo_energia_hora, custo_manutencao_hora, custo_falha, margem_lucro)
+        
+        with st.expander('🎲 Risco de Falha'):
+            st.caption("Simulação de falhas e reimpressões conforme o material e a duração da impressão.")
+            risco = MEMO.chamar(simular_falhas, filamento, metros_usados, tempo_impressao,
+                                custo_energia_hora, custo_manutencao_hora)
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Custo esperado", f"R$ {risco['Custo Esperado']:.2f}")
+            col2.metric("P50", f"R$ {risco['Custo P50']:.2f}")
+            col3.metric("P95", f"R$ {risco['Custo P95']:.2f}")
+            equivalente = custo_falha_equivalente(risco, metros_usados * filamento.calcular_preco_por_metro())
+            st.write(f"Chance de ao menos uma falha: **{risco['Probabilidade de Falha']:.1%}** | "
+                     f"Margem para falhas equivalente: **{equivalente:.1f}%** do material")
+        
+        # Cálculo inverso a partir de um preço de venda já definido
+        with st.expander('🎯 Preço Alvo'):
+            _preco_alvo(filamento, metros_usados, tempo_impressao, custo_energia_hora,
+                        custo_manutencao_hora, custo_falha, margem_lucro)
     
     # Coluna de resultados
     with col_resultado:
-        if 'ultimo_resultado' in st.session_state:
-            resultados = st.session_state.ultimo_resultado
-            nome_projeto = st.session_state.ultimo_projeto
-            
-            st.subheader(f'💵 Resultado: {nome_projeto}')
+        st.subheader(f'💵 Resultado: {nome_projeto}')
+        
+        # Preço final destacado
+        st.metric(
+            label="Preço Final Sugerido", 
+            value=f"R$ {resultados['Preço Final']:.2f}",
+            delta=f"Lucro: R$ {resultados['Preço Final'] - resultados['Custo Total']:.2f}"
+        )
+        
+        # Card com detalhes
+        with st.expander('📊 Detalhamento dos Custos', expanded=True):
+            st.write(f"📏 **Filamento:** {resultados['Metros Usados']:.1f}m ({resultados['Peso Usado (g)']:.1f}g)")
+            st.write(f"⏱️ **Tempo:** {resultados['Tempo (min)']} minutos ({resultados['Tempo (min)']/60:.1f}h)")
             
-            # Preço final destacado
-            st.metric(
-                label="Preço Final Sugerido", 
-                value=f"R$ {resultados['Preço Final']:.2f}",
-                delta=f"Lucro: R$ {resultados['Preço Final'] - resultados['Custo Total']:.2f}"
-            )
+            # Tabela de custos
+            custos_df = pd.DataFrame({
+                'Item': [
+                    'Material', 
+                    'Energia', 
+                    'Manutenção', 
+                    'Reserva para Falhas',
+                    'Custo Total',
+                    'Lucro',
+                    'Preço Final'
+                ],
+                'Valor (R$)': [
+                    f"{resultados['Custo do Material']:.2f}",
+                    f"{resultados['Custo de Energia']:.2f}",
+                    f"{resultados['Custo de Manutenção']:.2f}",
+                    f"{resultados['Custo para Falhas']:.2f}",
+                    f"{resultados['Custo Total']:.2f}",
+                    f"{resultados['Preço Final'] - resultados['Custo Total']:.2f}",
+                    f"{resultados['Preço Final']:.2f}"
+                ]
+            })
             
-            # Card com detalhes
-            with st.expander('📊 Detalhamento dos Custos', expanded=True):
-                st.write(f"📏 **Filamento:** {resultados['Metros Usados']:.1f}m ({resultados['Peso Usado (g)']:.1f}g)")
-                st.write(f"⏱️ **Tempo:** {resultados['Tempo (min)']} minutos ({resultados['Tempo (min)']/60:.1f}h)")
-                
-                # Tabela de custos
-                custos_df = pd.DataFrame({
-                    'Item': [
-                        'Material', 
-                        'Energia', 
-                        'Manutenção', 
-                        'Reserva para Falhas',
-                        'Custo Total',
-                        'Lucro',
-                        'Preço Final'
-                    ],
-                    'Valor (R$)': [
-                        f"{resultados['Custo do Material']:.2f}",
-                        f"{resultados['Custo de Energia']:.2f}",
-                        f"{resultados['Custo de Manutenção']:.2f}",
-                        f"{resultados['Custo para Falhas']:.2f}",
-                        f"{resultados['Custo Total']:.2f}",
-                        f"{resultados['Preço Final'] - resultados['Custo Total']:.2f}",
-                        f"{resultados['Preço Final']:.2f}"
-                    ]
-                })
-                
-                st.dataframe(custos_df, hide_index=True, use_container_width=True)
-            
-            # Opção para salvar
-            if st.button("💾 Salvar Orçamento"):
-                if salvar_orcamento(resultados, nome_projeto):
-                    st.success("Orçamento salvo com sucesso!")
-                else:
-                    st.error("Erro ao salvar o orçamento.")
+            st.dataframe(custos_df, hide_index=True, use_container_width=True)
+        
+        # Opção para salvar
+        if st.button("💾 Salvar Orçamento"):
+            if salvar_orcamento(resultados, nome_projeto):
+                st.success("Orçamento salvo com sucesso!")
+            else:
+                st.error("Erro ao salvar o orçamento.")
+
+# Fragmento próprio: mudar o preço alvo não reexecuta o resto da calculadora
+@st.fragment
+def _preco_alvo(filamento, metros_usados, tempo_impressao, custo_energia_hora,
+                custo_manutencao_hora, custo_falha, margem_lucro):
+    preco_alvo = st.number_input('Preço de venda desejado (R$):', min_value=0.0, value=49.90, step=1.0,
+                                 help="Ex.: preço de um concorrente ou de prateleira")
+    # Memorizados pelos mesmos argumentos e versão do catálogo
+    dependencias = (st.session_state.catalogo.arquivo,)
+    margem_alvo = MEMO.chamar(margem_para_preco, filamento, preco_alvo, metros_usados, tempo_impressao,
+                              custo_energia_hora, custo_manutencao_hora, custo_falha,
+                              dependencias=dependencias)
+    metros_max = MEMO.chamar(metros_maximos_para_preco, filamento, preco_alvo, tempo_impressao,
+                             custo_energia_hora, custo_manutencao_hora, margem_lucro, custo_falha,
+                             dependencias=dependencias)
+    tempo_max = MEMO.chamar(tempo_maximo_para_preco, filamento, preco_alvo, metros_usados,
+                            custo_energia_hora, custo_manutencao_hora, margem_lucro, custo_falha,
+                            dependencias=dependencias)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Margem obtida", f"{margem_alvo:.1f}%")
+    col2.metric(f"Máx. filamento ({margem_lucro}%)", f"{metros_max:.1f} m")
+    col3.metric(f"Máx. tempo ({margem_lucro}%)", f"{tempo_max:.0f} min")
+
+# Tabelas derivadas do catálogo e do histórico, em cache por versão dos
+# arquivos: a versão entra na chave, então gravar gera uma entrada nova
+@st.cache_data(max_entries=8)
+def _tabela_catalogo(arquivo, versao):
+    return CACHE.obter_colunar(arquivo).tabela()
+
+@st.cache_data(max_entries=8)
+def _filamentos_historico(versao):
+    return listar_filamentos_historico()
+
+@st.cache_data(max_entries=64)
+def _contar_historico(versao, **filtros):
+    return contar_historico(**filtros)
+
+@st.cache_data(max_entries=64)
+def _pagina_historico(versao, pagina, por_pagina, **filtros):
+    return consultar_historico(pagina=pagina, por_pagina=por_pagina, **filtros)
+
+@st.cache_data(max_entries=32)
+def _resumo_historico(versao, dimensao, **opcoes):
+    return consultar_resumo(dimensao, **opcoes)
 
 def mostrar_gerenciador_filamentos():
     st.title('🧱 Gerenciador de Filamentos')
-    
+    _gerenciador_filamentos()
+
+# Tabela, cadastro e remoção num fragmento: não reexecutam a página inteira
+@st.fragment
+def _gerenciador_filamentos():
     # Tabela com filamentos existentes
     st.subheader("Catálogo Atual")
     catalogo = st.session_state.catalogo
     
     if catalogo:
-        df_filamentos = pd.DataFrame([
-            {
-                'Nome': nome,
-                'Marca': f.marca, 
-                'Material': f.material, 
-                'Diâmetro (mm)': f.diametro, 
-                'Metros/kg': f.comprimento_total, 
-                'Preço/kg (R$)': f.preco, 
-                'Preço/m (R$)': round(f.calcular_preco_por_metro(), 3),
-                'Preço/g (R$)': round(f.calcular_preco_por_grama(), 3)
-            } 
-            for nome, f in catalogo.items()
-        ])
+        if catalogo.pendente:
+            df_filamentos = catalogo.colunar().tabela()
+        else:
+            df_filamentos = _tabela_catalogo(catalogo.arquivo, versao_catalogo(catalogo.arquivo))
         
         st.dataframe(df_filamentos, use_container_width=True)
     else:
@@ -417,12 +456,11 @@ def mostrar_gerenciador_filamentos():
     novo_filamento = criar_novo_filamento()
     
     if novo_filamento:
-        # Adicionar ao catálogo
+        # Adicionar ao catálogo e salvar no arquivo (apenas a alteração,
+        # sem sobrescrever edições de outras sessões)
         catalogo[novo_filamento["nome_completo"]] = novo_filamento["filamento"]
-        st.session_state.catalogo = catalogo
         
-        # Salvar no arquivo
-        if salvar_catalogo(catalogo):
+        if catalogo.salvar():
             st.success(f"Filamento '{novo_filamento['nome_completo']}' adicionado com sucesso!")
         else:
             st.error("Erro ao salvar o catálogo de filamentos.")
@@ -437,9 +475,8 @@ def mostrar_gerenciador_filamentos():
         
         if st.button("Remover", type="primary"):
             del catalogo[filamento_para_remover]
-            st.session_state.catalogo = catalogo
             
-            if salvar_catalogo(catalogo):
+            if catalogo.salvar():
                 st.success(f"Filamento '{filamento_para_remover}' removido com sucesso!")
             else:
                 st.error("Erro ao salvar o catálogo atualizado.")
@@ -447,19 +484,106 @@ def mostrar_gerenciador_filamentos():
 def mostrar_historico():
     st.title('📜 Histórico de Orçamentos')
     
-    # Carregar histórico
-    df = carregar_historico()
+    with st.expander("📈 Painel", expanded=True):
+        _painel_historico()
+    
+    # Filtros (aplicados no banco, usando os índices)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        projeto = st.text_input("🔎 Projeto (começa com)")
+    versao = versao_historico()
+    with col2:
+        filamento = st.selectbox("🧱 Filamento", ["Todos"] + _filamentos_historico(versao))
+    with col3:
+        periodo = st.date_input("📅 Período", value=())
+    
+    filtros = {
+        'projeto': projeto or None,
+        'filamento': None if filamento == "Todos" else filamento,
+        'data_inicio': periodo[0].isoformat() if len(periodo) > 0 else None,
+        'data_fim': periodo[-1].isoformat() if len(periodo) > 0 else None,
+    }
+    
+    total = _contar_historico(versao, **filtros)
     
-    if not df.empty:
+    if total > 0:
+        por_pagina = 50
+        total_paginas = (total + por_pagina - 1) // por_pagina
+        pagina = st.number_input(f"Página (de {total_paginas})", min_value=1, max_value=total_paginas, value=1)
+        
+        df = _pagina_historico(versao, pagina, por_pagina, **filtros)
+        st.caption(f"{total} orçamentos encontrados")
         st.dataframe(df, use_container_width=True)
         
         # Opção para exportar
         if st.button("📊 Exportar para Excel"):
-            df.to_excel("historico_orcamentos.xlsx", index=False)
+            consultar_historico(por_pagina=None, **filtros).to_excel("historico_orcamentos.xlsx", index=False)
             st.success("Arquivo exportado como 'historico_orcamentos.xlsx'")
+        
+        # Os orçamentos filtrados como fila de trabalhos da fazenda
+        with st.expander("🏭 Escalonar na Fazenda de Impressoras"):
+            col1, col2 = st.columns(2)
+            with col1:
+                quantidade = st.number_input("Impressoras", min_value=1, value=4, step=1)
+                tempo_troca = st.number_input("Troca de carretel (min)", min_value=0.0, value=15.0, step=5.0)
+            with col2:
+                carregados = st.multiselect("Filamentos carregados (em rodízio)", _filamentos_historico(versao))
+            
+            if st.button("Escalonar"):
+                escala = escalonar(
+                    trabalhos_do_historico(**filtros),
+                    impressoras_padrao(int(quantidade), carregados),
+                    tempo_troca=tempo_troca,
+                    catalogo=st.session_state.catalogo,
+                )
+                st.metric("Tempo total (makespan)", f"{escala.makespan / 60:.1f} h")
+                st.dataframe(escala.impressoras, hide_index=True, use_container_width=True)
+                st.dataframe(escala.tarefas, hide_index=True, use_container_width=True)
     else:
         st.info("Nenhum orçamento salvo até o momento.")
 
+# Painel lido dos resumos mantidos a cada orçamento salvo (nucleo.historico):
+# poucas linhas por consulta, qualquer que seja o tamanho do histórico
+@st.fragment
+def _painel_historico():
+    versao = versao_historico()
+    meses = _resumo_historico(versao, 'mes')
+    if meses.empty:
+        return
+    
+    receita, custo = meses['Receita (R$)'].sum(), meses['Custo (R$)'].sum()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Orçamentos", f"{meses['Orçamentos'].sum():,}")
+    col2.metric("Receita", f"R$ {receita:,.2f}")
+    col3.metric("Lucro", f"R$ {receita - custo:,.2f}",
+                delta=f"Margem {(receita - custo) / custo * 100:.1f}%" if custo else None)
+    col4.metric("Material", f"{meses['Peso (g)'].sum() / 1000:,.2f} kg")
+    
+    periodo = st.radio("Período", ["Por mês", "Por dia (últimos 90 dias)"], horizontal=True)
+    if periodo == "Por mês":
+        serie = meses.set_index('Mês')
+    else:
+        inicio = (datetime.now().date() - timedelta(days=89)).isoformat()
+        serie = _resumo_historico(versao, 'dia', inicio=inicio).set_index('Dia')
+    if serie.empty:
+        st.caption("Nenhum orçamento no período.")
+    else:
+        st.bar_chart(serie[['Receita (R$)', 'Lucro (R$)']])
+        st.line_chart(serie[['Margem (%)']])
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Por filamento")
+        filamentos = _resumo_historico(versao, 'filamento', ordenar_por='receita')
+        st.bar_chart(filamentos.set_index('Filamento')[['Peso (g)']])
+        st.dataframe(filamentos[['Filamento', 'Orçamentos', 'Receita (R$)', 'Lucro (R$)', 'Margem (%)', 'Metros']],
+                     hide_index=True, use_container_width=True)
+    with col2:
+        st.subheader("Projetos com maior receita")
+        projetos = _resumo_historico(versao, 'projeto', ordenar_por='receita', limite=10)
+        st.dataframe(projetos[['Projeto', 'Orçamentos', 'Receita (R$)', 'Lucro (R$)', 'Margem (%)']],
+                     hide_index=True, use_container_width=True)
+
 def mostrar_sobre():
     st.title('ℹ️ Sobre a Calculadora')
     
@@ -482,7 +606,7 @@ def mostrar_sobre():
     3. Insira o tempo de impressão estimado
     4. Ajuste os custos operacionais conforme necessário
     5. Defina sua margem de lucro
-    6. Clique em "Calcular Preço"
+    6. O preço é atualizado automaticamente a cada alteração
     
     ### Recursos adicionais
     
@@ -0,0 +1,286 @@
+"""
+Estimativa do tempo de impressão a partir dos movimentos do G-code.
+
+Quando o G-code não traz o tempo do slicer (ou traz um valor errado), o
+tempo é simulado como no planejador de movimento do firmware: cada
+movimento segue um perfil trapezoidal (acelera, velocidade de cruzeiro,
+desacelera) limitado pela aceleração do perfil da impressora, e a
+velocidade em cada junção entre dois movimentos é limitada pelo jerk e pela
+mudança de direção.
+
+Nada é feito movimento a movimento em Python: os parâmetros X/Y/Z/E/F de
+cada trecho do arquivo são extraídos por uma única expressão regular e
+organizados com NumPy, e as passagens para frente e para trás do
+planejador viram acumulações (np.minimum.accumulate) sobre as velocidades
+ao quadrado. O planejamento é feito por bloco do arquivo, com parada
+completa entre blocos (erro desprezível: um bloco tem centenas de
+milhares de movimentos).
+"""
+import os
+import re
+from typing import BinaryIO, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from consumo_energia import ModeloImpressora, carregar_impressoras
+from leitor_gcode import TAMANHO_BLOCO, ResultadoGcode, _blocos
+
+IMPRESSORA_GENERICA = ModeloImpressora("Genérica")
+VELOCIDADE_INICIAL = 1500.0   # mm/min, até o primeiro F do arquivo
+VELOCIDADE_MINIMA = 0.1       # mm/s, para F0 ou F muito baixo
+
+# Comandos que mudam o estado do movimento (raros no arquivo)
+_RE_CONTROLE = re.compile(
+    rb"^[ \t]*(?:(M8[23])|(G9[01])(?![0-9])|(G92|G28|G4|M204|M205)(?![0-9])([^;\n]*))",
+    re.MULTILINE,
+)
+# Parâmetros dos movimentos G0/G1 (a grande maioria das linhas)
+_RE_MOVIMENTO = re.compile(rb"^[ \t]*G0*[01](?![0-9])([^;\n]*)", re.MULTILINE)
+# Cada parâmetro com seu valor, ou a quebra de linha que separa os movimentos
+_RE_PARAMETRO = re.compile(rb"[XYZEF](?:-?[0-9]*\.?[0-9]+)?|\n")
+_RE_VALOR = re.compile(rb"([A-Z])(-?[0-9]*\.?[0-9]+)")
+
+# Coluna de cada letra na matriz de parâmetros (X, Y, Z, E, F)
+_COLUNAS = np.full(256, -1, dtype=np.intp)
+for _indice, _letra in enumerate(b"XYZEF"):
+    _COLUNAS[_letra] = _indice
+
+
+def _preencher(valores: np.ndarray, inicial: np.ndarray) -> np.ndarray:
+    """Repete o último valor definido nas linhas sem o parâmetro; a primeira linha é `inicial`."""
+    completos = np.vstack([inicial[None, :], valores])
+    indices = np.where(np.isnan(completos), 0, np.arange(len(completos))[:, None])
+    np.maximum.accumulate(indices, axis=0, out=indices)
+    return np.take_along_axis(completos, indices, axis=0)
+
+
+class _EstadoMovimento:
+    """Posição e modos da impressora ao longo do arquivo."""
+
+    def __init__(self):
+        self.posicao = np.zeros(4)          # X, Y, Z, E
+        self.relativo = False               # G91
+        self.relativo_e = False             # M83
+        self.velocidade = VELOCIDADE_INICIAL
+        self.aceleracao = np.nan            # M204; nan = a do perfil da impressora
+        self.jerk = np.nan                  # M205; nan = o do perfil da impressora
+        self.pausas = 0.0                   # segundos de G4
+
+    def processar_trecho(self, trecho: bytes) -> Optional[Dict[str, np.ndarray]]:
+        """Deslocamentos e velocidades dos movimentos de um trecho sem comandos de controle."""
+        parametros = _RE_MOVIMENTO.findall(trecho)
+        if not parametros:
+            return None
+        tokens = np.array(_RE_PARAMETRO.findall(b"\n".join(parametros) + b"\n"))
+        largura = tokens.dtype.itemsize
+        bytes_tokens = tokens.view(np.uint8).reshape(len(tokens), largura)
+        quebra = bytes_tokens[:, 0] == ord("\n")
+        linha = np.cumsum(quebra)[~quebra]
+        coluna = _COLUNAS[bytes_tokens[~quebra, 0]]
+
+        matriz = np.full((len(parametros), 5), np.nan)
+        if largura > 1:
+            numeros = bytes_tokens[~quebra, 1:].copy().view(f"S{largura - 1}").ravel()
+            vazios = numeros == b""
+            numeros[vazios] = b"0"
+            valores = numeros.astype(float)
+            valores[vazios] = np.nan
+            matriz[linha, coluna] = valores
+
+        # Posições absolutas: repete o último valor (modo absoluto) ou acumula (modo relativo)
+        relativos = np.array([self.relativo] * 3 + [self.relativo_e])
+        absolutas = _preencher(matriz[:, :4], self.posicao)
+        acumuladas = np.vstack([self.posicao, np.nan_to_num(matriz[:, :4])]).cumsum(axis=0)
+        posicoes = np.where(relativos, acumuladas, absolutas)
+        velocidades = _preencher(matriz[:, 4:], np.array([self.velocidade]))[1:, 0]
+
+        self.posicao = posicoes[-1]
+        self.velocidade = velocidades[-1]
+        n = len(parametros)
+        return {
+            "deslocamentos": np.diff(posicoes, axis=0),
+            "velocidades": velocidades / 60,
+            "aceleracoes": np.full(n, self.aceleracao),
+            "jerks": np.full(n, self.jerk),
+        }
+
+    def aplicar_controle(self, m: "re.Match") -> None:
+        modo_e, modo_geral, comando, argumentos = m.groups()
+        if modo_e is not None:
+            self.relativo_e = modo_e == b"M83"
+            return
+        if modo_geral is not None:
+            self.relativo = self.relativo_e = modo_geral == b"G91"
+            return
+        valores = {letra: float(v) for letra, v in _RE_VALOR.findall(argumentos)}
+        if comando == b"G92":
+            # "G92" sem eixos zera todos
+            for eixo, letra in enumerate((b"X", b"Y", b"Z", b"E")):
+                if letra in valores or not valores:
+                    self.posicao[eixo] = valores.get(letra, 0.0)
+        elif comando == b"G28":
+            # Homing: os eixos informados (ou todos) voltam à origem
+            for eixo, letra in enumerate((b"X", b"Y", b"Z")):
+                if letra in valores or not valores:
+                    self.posicao[eixo] = 0.0
+        elif comando == b"G4":
+            self.pausas += valores.get(b"S", 0.0) + valores.get(b"P", 0.0) / 1000
+        elif comando == b"M204":
+            aceleracao = valores.get(b"S", valores.get(b"P"))
+            if aceleracao:
+                self.aceleracao = aceleracao
+        elif comando == b"M205" and b"X" in valores:
+            self.jerk = valores[b"X"]
+
+
+def _tempo_segmentos(segmentos: Dict[str, np.ndarray], impressora: ModeloImpressora) -> float:
+    """
+    Segundos para executar os movimentos de um bloco, do repouso ao repouso.
+
+    Args:
+        segmentos: Deslocamentos (n x 4: X, Y, Z, E), velocidades (mm/s),
+            aceleracoes e jerks (nan = valores do perfil) de cada movimento
+        impressora: Perfil com os limites de aceleração, jerk e velocidade
+
+    Returns:
+        Tempo total em segundos
+    """
+    deslocamentos = segmentos["deslocamentos"]
+    xyz = deslocamentos[:, :3]
+    comprimento_xyz = np.sqrt((xyz ** 2).sum(axis=1))
+    so_extrusao = comprimento_xyz == 0
+    comprimentos = np.where(so_extrusao, np.abs(deslocamentos[:, 3]), comprimento_xyz)
+    validos = comprimentos > 0
+    if not validos.any():
+        return 0.0
+    comprimentos = comprimentos[validos]
+    so_extrusao = so_extrusao[validos]
+    dz = np.abs(xyz[validos, 2])
+
+    # Velocidade de cruzeiro: F limitado pelas velocidades máximas do perfil
+    velocidades = np.minimum(segmentos["velocidades"][validos], impressora.velocidade_maxima)
+    with np.errstate(divide="ignore"):
+        velocidades = np.minimum(velocidades, np.where(dz > 0, impressora.velocidade_maxima_z * comprimentos / dz, np.inf))
+    velocidades = np.where(so_extrusao, np.minimum(velocidades, impressora.velocidade_maxima_e), velocidades)
+    velocidades = np.maximum(velocidades, VELOCIDADE_MINIMA)
+    # M204/M205 do arquivo, limitados pelos máximos do perfil
+    aceleracoes = np.fmin(segmentos["aceleracoes"][validos], impressora.aceleracao)
+    jerks = np.fmin(segmentos["jerks"][validos], impressora.jerk)
+
+    # Velocidade máxima em cada junção: a mudança de velocidade (vetor) não passa do jerk
+    direcoes = np.where(so_extrusao[:, None], 0.0, xyz[validos] / np.where(so_extrusao, 1.0, comprimentos)[:, None])
+    mudanca = np.sqrt(((direcoes[1:] - direcoes[:-1]) ** 2).sum(axis=1))
+    with np.errstate(divide="ignore"):
+        limite_junta = np.where(mudanca > 0, np.minimum(jerks[1:], jerks[:-1]) / mudanca, np.inf)
+    juncoes = np.concatenate([
+        [min(jerks[0], velocidades[0])],
+        np.minimum(limite_junta, np.minimum(velocidades[1:], velocidades[:-1])),
+        [min(jerks[-1], velocidades[-1])],
+    ]) ** 2
+
+    # Passagens do planejador sobre v²: v²[k] <= v²[k-1] + 2·a·L (frente) e o
+    # simétrico para trás. Com D = soma acumulada de 2·a·L, cada passagem é um
+    # mínimo acumulado: v²[k] = D[k] + min(junção[j] - D[j], j <= k).
+    acumulado = np.concatenate([[0.0], np.cumsum(2 * aceleracoes * comprimentos)])
+    frente = np.minimum.accumulate(juncoes - acumulado) + acumulado
+    tras = np.minimum.accumulate((frente + acumulado)[::-1])[::-1] - acumulado
+    v_entrada = np.sqrt(np.maximum(tras[:-1], 0.0))
+    v_saida = np.sqrt(np.maximum(tras[1:], 0.0))
+
+    # Perfil trapezoidal (ou triangular, se não houver distância para o cruzeiro)
+    dist_aceleracao = (velocidades ** 2 - v_entrada ** 2) / (2 * aceleracoes)
+    dist_frenagem = (velocidades ** 2 - v_saida ** 2) / (2 * aceleracoes)
+    cruzeiro = comprimentos - dist_aceleracao - dist_frenagem
+    pico = np.where(cruzeiro >= 0, velocidades,
+                    np.sqrt((2 * aceleracoes * comprimentos + v_entrada ** 2 + v_saida ** 2) / 2))
+    tempos = (np.maximum(pico - v_entrada, 0.0) + np.maximum(pico - v_saida, 0.0)) / aceleracoes \
+        + np.maximum(cruzeiro, 0.0) / velocidades
+    return float(tempos.sum())
+
+
+def _simular(origem: Union[str, os.PathLike, BinaryIO],
+             impressoras: Sequence[ModeloImpressora],
+             tamanho_bloco: int) -> Tuple[np.ndarray, int, float, float]:
+    """Segundos por impressora, número de movimentos, distância (mm) e pausas (s)."""
+    estado = _EstadoMovimento()
+    segundos = np.zeros(len(impressoras))
+    movimentos, distancia = 0, 0.0
+
+    for bloco in _blocos(origem, tamanho_bloco):
+        partes: List[Dict[str, np.ndarray]] = []
+        inicio = 0
+        for m in _RE_CONTROLE.finditer(bloco):
+            partes.append(estado.processar_trecho(bloco[inicio:m.start()]))
+            estado.aplicar_controle(m)
+            inicio = m.end()
+        partes.append(estado.processar_trecho(bloco[inicio:]))
+        partes = [p for p in partes if p is not None]
+        if not partes:
+            continue
+
+        segmentos = {chave: np.concatenate([p[chave] for p in partes]) for chave in partes[0]}
+        movimentos += len(segmentos["velocidades"])
+        distancia += float(np.sqrt((segmentos["deslocamentos"][:, :3] ** 2).sum(axis=1)).sum())
+        for i, impressora in enumerate(impressoras):
+            segundos[i] += _tempo_segmentos(segmentos, impressora)
+
+    return segundos + estado.pausas, movimentos, distancia, estado.pausas
+
+
+def estimar_tempo(origem: Union[str, os.PathLike, BinaryIO],
+                  impressora: Optional[ModeloImpressora] = None,
+                  tamanho_bloco: int = TAMANHO_BLOCO) -> float:
+    """
+    Estima o tempo de impressão simulando os movimentos do G-code.
+
+    Args:
+        origem: Caminho do arquivo ou objeto binário com método read()
+        impressora: Perfil com aceleração, jerk e velocidades máximas
+            (padrão: IMPRESSORA_GENERICA)
+        tamanho_bloco: Quantidade aproximada de bytes processados por vez
+
+    Returns:
+        Tempo estimado em minutos (inclui as pausas G4, não a espera de
+        aquecimento)
+    """
+    segundos, _, _, _ = _simular(origem, [impressora or IMPRESSORA_GENERICA], tamanho_bloco)
+    return float(segundos[0]) / 60
+
+
+def comparar_tempos(origem: Union[str, os.PathLike, BinaryIO],
+                    impressoras: Optional[Mapping[str, ModeloImpressora]] = None,
+                    tamanho_bloco: int = TAMANHO_BLOCO) -> pd.DataFrame:
+    """
+    Tempo estimado do mesmo G-code em cada modelo do registro, lendo o
+    arquivo uma única vez.
+
+    Returns:
+        DataFrame com Impressora, 'Tempo Estimado (min)', Movimentos,
+        'Distância (m)' e 'Pausas (min)'
+    """
+    modelos = list((impressoras or carregar_impressoras()).values())
+    segundos, movimentos, distancia, pausas = _simular(origem, modelos, tamanho_bloco)
+    return pd.DataFrame({
+        'Impressora': [m.nome for m in modelos],
+        'Tempo Estimado (min)': segundos / 60,
+        'Movimentos': movimentos,
+        'Distância (m)': distancia / 1000,
+        'Pausas (min)': pausas / 60,
+    })
+
+
+def completar_tempo(resultado: ResultadoGcode,
+                    origem: Union[str, os.PathLike, BinaryIO],
+                    impressora: Optional[ModeloImpressora] = None) -> ResultadoGcode:
+    """
+    Preenche resultado.tempo_estimado quando o slicer não informa o tempo.
+
+    Um objeto binário já lido (ex.: st.file_uploader) volta ao início antes
+    da nova leitura.
+    """
+    if resultado.tempo_impressao is None:
+        if hasattr(origem, "seek"):
+            origem.seek(0)
+        resultado.tempo_estimado = estimar_tempo(origem, impressora)
+    return resultado
@@ -0,0 +1,488 @@
+"""
+Interface de linha de comando da calculadora (sem Streamlit).
+
+Uso:
+    python -m cli quote --input trabalhos.csv --output cotacoes.parquet
+    python -m cli marketplaces --input produtos.csv --output canais.csv
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import Iterator
+
+from nucleo.dependencias import importar_preguicoso
+from nucleo.precificacao import CatalogoColunar, carregar_catalogo, calcular_precos_dataframe, calcular_preco_impressao
+
+# Só carregado quando um comando lê ou grava tabelas
+pd = importar_preguicoso("pandas")
+
+FORMATOS = ("csv", "jsonl", "parquet")
+
+
+def detectar_formato(caminho: str) -> str:
+    """Deduz o formato (csv, jsonl ou parquet) pela extensão do arquivo."""
+    extensao = os.path.splitext(caminho)[1].lower().lstrip(".")
+    if extensao in ("json", "ndjson"):
+        extensao = "jsonl"
+    if extensao not in FORMATOS:
+        raise ValueError(f"Formato não suportado: '{caminho}' (use .csv, .jsonl ou .parquet)")
+    return extensao
+
+
+def ler_em_blocos(caminho: str, tamanho_bloco: int) -> Iterator[pd.DataFrame]:
+    """Lê o arquivo de entrada em blocos de no máximo `tamanho_bloco` linhas."""
+    formato = detectar_formato(caminho)
+    if formato == "csv":
+        yield from pd.read_csv(caminho, chunksize=tamanho_bloco)
+    elif formato == "jsonl":
+        yield from pd.read_json(caminho, lines=True, chunksize=tamanho_bloco)
+    else:
+        import pyarrow.parquet as pq
+
+        for lote in pq.ParquetFile(caminho).iter_batches(batch_size=tamanho_bloco):
+            yield lote.to_pandas()
+
+
+class EscritorIncremental:
+    """Grava blocos de resultados no arquivo de saída à medida que são calculados."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.formato = detectar_formato(caminho)
+        self._parquet = None
+        self._primeiro_bloco = True
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+    def escrever(self, df: pd.DataFrame) -> None:
+        if self.formato == "csv":
+            df.to_csv(self.caminho, mode="a", header=self._primeiro_bloco, index=False)
+        elif self.formato == "jsonl":
+            with open(self.caminho, "a", encoding="utf-8") as f:
+                df.to_json(f, orient="records", lines=True, force_ascii=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.caminho, tabela.schema)
+            self._parquet.write_table(tabela.cast(self._parquet.schema))
+        self._primeiro_bloco = False
+
+    def fechar(self) -> None:
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def cotar_arquivo(entrada: str, saida: str, arquivo_catalogo: str,
+                  tamanho_bloco: int = 50_000, tarifa=None, potencia_kw: float = 0.2,
+                  **padroes) -> int:
+    """
+    Cota todos os trabalhos de `entrada` e grava os resultados em `saida`.
+
+    Apenas um bloco fica em memória por vez, então o consumo é limitado
+    pelo tamanho do bloco e não pelo tamanho do arquivo.
+
+    Com `tarifa`, trabalhos com a coluna `inicio` (data/hora) têm o custo de
+    energia calculado pela tarifa por horário em vez do custo fixo por hora.
+
+    Returns:
+        Número de linhas processadas
+    """
+    catalogo = CatalogoColunar(carregar_catalogo(arquivo_catalogo))
+    escritor = EscritorIncremental(saida)
+    total = 0
+    try:
+        for bloco in ler_em_blocos(entrada, tamanho_bloco):
+            if tarifa is not None and "inicio" in bloco.columns:
+                from tarifa_energia import custo_energia_hora_equivalente
+
+                bloco = bloco.assign(custo_energia_hora=custo_energia_hora_equivalente(
+                    pd.to_datetime(bloco["inicio"]).to_numpy(dtype="datetime64[s]"),
+                    bloco["tempo_impressao"].to_numpy(dtype=float), potencia_kw, tarifa
+                ))
+            escritor.escrever(calcular_precos_dataframe(catalogo, bloco, **padroes))
+            total += len(bloco)
+    finally:
+        escritor.fechar()
+    return total
+
+
+def _tarifa(nome, bandeira):
+    if not nome:
+        return None
+    from tarifa_energia import carregar_tarifas
+
+    return carregar_tarifas()[nome].com_bandeira(bandeira)
+
+
+def comando_quote(args: argparse.Namespace) -> int:
+    saida = args.output or os.path.splitext(args.input)[0] + "_cotado.csv"
+    inicio = time.perf_counter()
+    linhas = cotar_arquivo(
+        args.input,
+        saida,
+        args.catalogo,
+        tamanho_bloco=args.chunksize,
+        tarifa=_tarifa(args.tarifa, args.bandeira),
+        potencia_kw=args.potencia / 1000,
+        custo_energia_hora=args.energia,
+        custo_manutencao_hora=args.manutencao,
+        margem_lucro=args.margem,
+        custo_falha=args.falha,
+    )
+    duracao = time.perf_counter() - inicio
+    vazao = linhas / duracao if duracao > 0 else float("inf")
+    print(f"{linhas} linhas cotadas em {duracao:.2f}s ({vazao:,.0f} linhas/s) -> {saida}",
+          file=sys.stderr)
+    return 0
+
+
+def comando_marketplaces(args: argparse.Namespace) -> int:
+    from nucleo.marketplace import carregar_marketplaces, varrer_marketplaces
+
+    saida = args.output or os.path.splitext(args.input)[0] + "_marketplaces.csv"
+    inicio = time.perf_counter()
+    escritor = EscritorIncremental(saida)
+    linhas = 0
+    vitorias = {}
+    try:
+        for bloco in varrer_marketplaces(
+            ler_em_blocos(args.input, args.chunksize),
+            nota_fiscal=args.nota_fiscal,
+            embalagem=args.embalagem,
+            margem_lucro=args.margem,
+            marketplaces=carregar_marketplaces(args.marketplaces),
+            categoria=args.categoria,
+            incluir_taxa_fixa=not args.sem_taxa_fixa,
+        ):
+            escritor.escrever(bloco)
+            linhas += len(bloco)
+            for plataforma, quantidade in bloco['Melhor Plataforma'].value_counts().items():
+                vitorias[plataforma] = vitorias.get(plataforma, 0) + int(quantidade)
+    finally:
+        escritor.fechar()
+
+    duracao = time.perf_counter() - inicio
+    vazao = linhas / duracao if duracao > 0 else float("inf")
+    for plataforma, quantidade in sorted(vitorias.items(), key=lambda item: -item[1]):
+        print(f"{plataforma}: melhor canal para {quantidade} produtos")
+    print(f"{linhas} produtos comparados em {duracao:.2f}s ({vazao:,.0f} produtos/s) -> {saida}",
+          file=sys.stderr)
+    return 0
+
+
+def comando_risco(args: argparse.Namespace) -> int:
+    from risco_falha import simular_falhas_dataframe
+
+    saida = args.output or os.path.splitext(args.input)[0] + "_risco.csv"
+    inicio = time.perf_counter()
+    catalogo = CatalogoColunar(carregar_catalogo(args.catalogo))
+    escritor = EscritorIncremental(saida)
+    linhas = 0
+    try:
+        for numero, bloco in enumerate(ler_em_blocos(args.input, args.chunksize)):
+            # Semente diferente por bloco, derivada da semente informada
+            escritor.escrever(simular_falhas_dataframe(
+                catalogo, bloco,
+                custo_energia_hora=args.energia,
+                custo_manutencao_hora=args.manutencao,
+                simulacoes=args.simulacoes,
+                semente=[args.semente, numero],
+                processos=args.processos or None,
+            ))
+            linhas += len(bloco)
+    finally:
+        escritor.fechar()
+    duracao = time.perf_counter() - inicio
+    print(f"{linhas} trabalhos simulados em {duracao:.2f}s -> {saida}", file=sys.stderr)
+    return 0
+
+
+def comando_escala(args: argparse.Namespace) -> int:
+    from escalonador import escalonar, impressoras_padrao, trabalhos_do_historico
+
+    trabalhos = trabalhos_do_historico(args.historico, data_inicio=args.desde, data_fim=args.ate)
+    filamentos = [f.strip() for f in args.filamentos.split(",")] if args.filamentos else []
+    escala = escalonar(
+        trabalhos,
+        impressoras_padrao(args.impressoras, filamentos, args.potencia / 1000),
+        tempo_troca=args.troca,
+        objetivo=args.objetivo,
+        tarifa=_tarifa(args.tarifa, args.bandeira),
+        inicio=args.inicio,
+        catalogo=carregar_catalogo(args.catalogo),
+    )
+    if args.output:
+        escritor = EscritorIncremental(args.output)
+        escritor.escrever(escala.tarefas.astype({"Início": str}))
+        escritor.fechar()
+    print(escala.impressoras.to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+    resumo = f"\n{len(trabalhos)} trabalhos | Makespan: {escala.makespan / 60:.1f} h"
+    if escala.custo_energia is not None:
+        resumo += f" | Energia: R$ {escala.custo_energia:.2f}"
+    print(resumo)
+    return 0
+
+
+def comando_gcode(args: argparse.Namespace) -> int:
+    from lote_gcode import DIRETORIO_CACHE, analisar_gcodes, orcar_pedido
+
+    diretorio_cache = None if args.sem_cache else DIRETORIO_CACHE
+    if not args.filamento:
+        resultados = analisar_gcodes(args.arquivos, processos=args.processos,
+                                     diretorio_cache=diretorio_cache)
+        for caminho, resultado in zip(args.arquivos, resultados):
+            if resultado.tempo_impressao:
+                tempo = f"Tempo (slicer): {resultado.tempo_impressao:.1f} min"
+            else:
+                tempo = f"Tempo (estimado): {resultado.tempo:.1f} min"
+            ferramentas = ", ".join(f"T{t}: {m:.2f} m" for t, m in resultado.metros_por_ferramenta.items())
+            print(f"{caminho}: {resultado.metros_usados:.2f} m ({ferramentas}) | {tempo}")
+        return 0
+
+    catalogo = carregar_catalogo(args.catalogo)
+    tabela, totais = orcar_pedido(
+        catalogo[args.filamento],
+        args.arquivos,
+        custo_energia_hora=args.energia,
+        custo_manutencao_hora=args.manutencao,
+        margem_lucro=args.margem,
+        custo_falha=args.falha,
+        processos=args.processos,
+        diretorio_cache=diretorio_cache,
+    )
+    print(tabela.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    print(f"\nPedido: {totais['Placas']} placas | {totais['Metros Usados']:.2f} m | "
+          f"{totais['Tempo (min)']:.0f} min | Custo Total R$ {totais['Custo Total']:.2f} | "
+          f"Preço Final R$ {totais['Preço Final']:.2f}")
+    return 0
+
+
+def comando_malha(args: argparse.Namespace) -> int:
+    from malha import analisar_malha, estimar_filamento
+
+    analise = analisar_malha(args.arquivo)
+    largura, profundidade, altura = analise.dimensoes
+    print(f"{analise.triangulos} triângulos | Volume: {analise.volume_mm3 / 1000:.2f} cm³ | "
+          f"Área: {analise.area_mm2 / 100:.2f} cm² | "
+          f"Dimensões: {largura:.1f} x {profundidade:.1f} x {altura:.1f} mm")
+
+    catalogo = carregar_catalogo(args.catalogo)
+    estimativa = estimar_filamento(analise, catalogo[args.filamento], infill=args.infill,
+                                   paredes=args.paredes, largura_linha=args.largura_linha)
+    precos = calcular_preco_impressao(
+        catalogo[args.filamento],
+        estimativa['Metros Usados'],
+        args.tempo,
+        custo_energia_hora=args.energia,
+        custo_manutencao_hora=args.manutencao,
+        margem_lucro=args.margem,
+        custo_falha=args.falha,
+    )
+    for item, valor in {**estimativa, **precos}.items():
+        print(f"{item}: {valor:.2f}")
+    return 0
+
+
+def comando_energia(args: argparse.Namespace) -> int:
+    from cinematica import completar_tempo
+    from consumo_energia import analisar_aquecimento_cache, carregar_impressoras, comparar_impressoras
+    from leitor_gcode import analisar_gcode
+
+    tempo = args.tempo or completar_tempo(analisar_gcode(args.arquivo), args.arquivo).tempo
+    impressoras = carregar_impressoras(args.impressoras)
+    if args.modelo:
+        impressoras = {nome: impressoras[nome] for nome in args.modelo}
+    comparacao = comparar_impressoras(analisar_aquecimento_cache(args.arquivo), tempo, args.preco_kwh, impressoras)
+    print(comparacao.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"\nTempo de impressão: {tempo:.0f} min")
+    return 0
+
+
+def comando_tempo(args: argparse.Namespace) -> int:
+    from cinematica import comparar_tempos
+    from consumo_energia import carregar_impressoras
+    from leitor_gcode import analisar_gcode
+
+    impressoras = carregar_impressoras(args.impressoras)
+    if args.modelo:
+        impressoras = {nome: impressoras[nome] for nome in args.modelo}
+    for caminho in args.arquivos:
+        inicio = time.perf_counter()
+        tabela = comparar_tempos(caminho, impressoras)
+        segundos = time.perf_counter() - inicio
+        slicer = analisar_gcode(caminho).tempo_impressao
+        print(f"{caminho}: {tabela['Movimentos'].iloc[0]:,} movimentos | "
+              f"{tabela['Distância (m)'].iloc[0]:.1f} m | "
+              f"Tempo (slicer): {f'{slicer:.1f} min' if slicer else 'não informado'} | "
+              f"simulado em {segundos:.2f} s")
+        print(tabela[['Impressora', 'Tempo Estimado (min)']].to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+    return 0
+
+
+def comando_resumos(args: argparse.Namespace) -> int:
+    from nucleo.historico import consultar_resumo, reconstruir_resumos
+
+    if args.reconstruir:
+        inicio = time.perf_counter()
+        total = reconstruir_resumos(args.historico)
+        print(f"Resumos reconstruídos a partir de {total:,} orçamentos em {time.perf_counter() - inicio:.2f} s")
+    resumo = consultar_resumo(args.dimensao, args.desde, args.ate, args.limite, args.ordenar, args.historico)
+    colunas = [resumo.columns[0], 'Orçamentos', 'Receita (R$)', 'Custo (R$)', 'Lucro (R$)', 'Margem (%)',
+               'Metros', 'Peso (g)']
+    print(resumo[colunas].to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    return 0
+
+
+def comando_servir(args: argparse.Namespace) -> int:
+    import asyncio
+
+    from servico import servir
+
+    try:
+        asyncio.run(servir(args.host, args.porta, args.catalogo, args.max_concorrencia, args.cache_disco))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _adicionar_custos(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--catalogo", default="catalogo_filamentos.json", help="Catálogo de filamentos")
+    parser.add_argument("--energia", type=float, default=0.5, help="Custo de energia por hora (R$)")
+    parser.add_argument("--manutencao", type=float, default=2.0, help="Custo de manutenção por hora (R$)")
+    parser.add_argument("--margem", type=float, default=100.0, help="Margem de lucro (%%)")
+    parser.add_argument("--falha", type=float, default=5.0, help="Margem para falhas (%%)")
+
+
+def criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m cli",
+                                     description="Calculadora de impressão 3D sem interface gráfica")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    quote = subparsers.add_parser("quote", help="Cota trabalhos em lote a partir de CSV/JSONL/Parquet")
+    quote.add_argument("--input", required=True, help="Arquivo de trabalhos (.csv, .jsonl ou .parquet)")
+    quote.add_argument("--output", help="Arquivo de saída (padrão: <entrada>_cotado.csv)")
+    quote.add_argument("--chunksize", type=int, default=50_000, help="Linhas por bloco")
+    quote.add_argument("--tarifa", help="Tarifa por horário (ex.: \"Tarifa Branca\") para trabalhos com a coluna inicio")
+    quote.add_argument("--bandeira", default="verde", help="Bandeira tarifária (verde, amarela, vermelha 1, vermelha 2)")
+    quote.add_argument("--potencia", type=float, default=200.0, help="Potência média da impressora (W)")
+    _adicionar_custos(quote)
+    quote.set_defaults(func=comando_quote)
+
+    canais = subparsers.add_parser("marketplaces", help="Melhor marketplace para cada produto de um catálogo")
+    canais.add_argument("--input", required=True,
+                        help="Produtos (.csv, .jsonl ou .parquet) com preco_custo e, opcionalmente, "
+                             "embalagem, classe_peso, margem_lucro e nota_fiscal")
+    canais.add_argument("--output", help="Arquivo de saída (padrão: <entrada>_marketplaces.csv)")
+    canais.add_argument("--chunksize", type=int, default=50_000, help="Produtos por bloco")
+    canais.add_argument("--marketplaces", default="marketplaces.json", help="Registro de marketplaces")
+    canais.add_argument("--categoria", help="Categoria do produto (comissão específica)")
+    canais.add_argument("--nota-fiscal", type=float, default=5.0, help="Nota fiscal (%%) padrão")
+    canais.add_argument("--embalagem", type=float, default=1.0, help="Embalagem (R$) padrão")
+    canais.add_argument("--margem", type=float, default=50.0, help="Margem de lucro (%%) padrão")
+    canais.add_argument("--sem-taxa-fixa", action="store_true", help="Desconsidera as taxas fixas (o frete por classe de peso continua)")
+    canais.set_defaults(func=comando_marketplaces)
+
+    risco = subparsers.add_parser("risco", help="Simula o custo de falhas (Monte Carlo) de trabalhos em lote")
+    risco.add_argument("--input", required=True, help="Arquivo de trabalhos (.csv, .jsonl ou .parquet)")
+    risco.add_argument("--output", help="Arquivo de saída (padrão: <entrada>_risco.csv)")
+    risco.add_argument("--chunksize", type=int, default=50_000, help="Linhas por bloco")
+    risco.add_argument("--simulacoes", type=int, default=2000, help="Simulações por trabalho")
+    risco.add_argument("--semente", type=int, default=0, help="Semente (mesma semente, mesmo resultado)")
+    risco.add_argument("--processos", type=int, default=1, help="Processos (0 = número de CPUs)")
+    _adicionar_custos(risco)
+    risco.set_defaults(func=comando_risco)
+
+    escala = subparsers.add_parser("escala", help="Distribui os orçamentos do histórico entre as impressoras")
+    escala.add_argument("--historico", default="historico_orcamentos.db", help="Banco do histórico")
+    escala.add_argument("--impressoras", type=int, required=True, help="Número de impressoras")
+    escala.add_argument("--filamentos", help="Filamentos carregados, em rodízio (ex.: PLA,PETG)")
+    escala.add_argument("--troca", type=float, default=15.0, help="Tempo de troca de carretel (min)")
+    escala.add_argument("--objetivo", choices=("makespan", "energia"), default="makespan")
+    escala.add_argument("--tarifa", help="Tarifa por horário (obrigatória no objetivo energia)")
+    escala.add_argument("--bandeira", default="verde", help="Bandeira tarifária")
+    escala.add_argument("--potencia", type=float, default=200.0, help="Potência média de cada impressora (W)")
+    escala.add_argument("--inicio", help="Data/hora de início da escala (padrão: agora)")
+    escala.add_argument("--desde", help="Só orçamentos a partir desta data (AAAA-MM-DD)")
+    escala.add_argument("--ate", help="Só orçamentos até esta data (AAAA-MM-DD)")
+    escala.add_argument("--catalogo", default="catalogo_filamentos.json", help="Catálogo de filamentos")
+    escala.add_argument("--output", help="Grava a escala de cada trabalho (.csv, .jsonl ou .parquet)")
+    escala.set_defaults(func=comando_escala)
+
+    gcode = subparsers.add_parser("gcode", help="Extrai filamento e tempo de arquivos G-code")
+    gcode.add_argument("arquivos", nargs="+", help="Arquivos .gcode (uma placa por arquivo)")
+    gcode.add_argument("--filamento", help="Nome do filamento no catálogo para orçar o pedido")
+    gcode.add_argument("--processos", type=int, help="Número de processos (padrão: número de CPUs)")
+    gcode.add_argument("--sem-cache", action="store_true", help="Não usar o cache de resultados")
+    _adicionar_custos(gcode)
+    gcode.set_defaults(func=comando_gcode)
+
+    malha = subparsers.add_parser("malha", help="Estima filamento e preço a partir de um STL/3MF")
+    malha.add_argument("arquivo", help="Arquivo .stl ou .3mf")
+    malha.add_argument("--filamento", required=True, help="Nome do filamento no catálogo")
+    malha.add_argument("--infill", type=float, default=20.0, help="Preenchimento (%%)")
+    malha.add_argument("--paredes", type=int, default=2, help="Número de perímetros")
+    malha.add_argument("--largura-linha", type=float, default=0.4, help="Largura de extrusão (mm)")
+    malha.add_argument("--tempo", type=float, default=0.0, help="Tempo estimado de impressão (min)")
+    _adicionar_custos(malha)
+    malha.set_defaults(func=comando_malha)
+
+    energia = subparsers.add_parser("energia", help="Consumo de energia de um G-code em cada modelo de impressora")
+    energia.add_argument("arquivo", help="Arquivo .gcode")
+    energia.add_argument("--preco-kwh", type=float, default=0.80, help="Preço do kWh (R$)")
+    energia.add_argument("--tempo", type=float,
+                         help="Tempo de impressão (min); padrão: o do slicer ou o estimado pela cinemática")
+    energia.add_argument("--impressoras", default="impressoras.json", help="Registro de modelos de impressora")
+    energia.add_argument("--modelo", action="append", help="Modelo a comparar (pode repetir; padrão: todos)")
+    energia.set_defaults(func=comando_energia)
+
+    tempo = subparsers.add_parser("tempo", help="Estima o tempo de impressão simulando os movimentos do G-code")
+    tempo.add_argument("arquivos", nargs="+", help="Arquivos .gcode")
+    tempo.add_argument("--impressoras", default="impressoras.json", help="Registro de modelos de impressora")
+    tempo.add_argument("--modelo", action="append", help="Modelo a simular (pode repetir; padrão: todos)")
+    tempo.set_defaults(func=comando_tempo)
+
+    resumos = subparsers.add_parser("resumos", help="Receita, custos e material do histórico por dia, mês, filamento ou projeto")
+    resumos.add_argument("dimensao", nargs="?", choices=("dia", "mes", "filamento", "projeto"), default="mes")
+    resumos.add_argument("--historico", default="historico_orcamentos.db", help="Banco do histórico")
+    resumos.add_argument("--reconstruir", action="store_true",
+                         help="Refaz os resumos a partir dos orçamentos antes de consultar")
+    resumos.add_argument("--desde", help="Primeira chave (ex.: 2024-01-01 por dia, 2024-01 por mês)")
+    resumos.add_argument("--ate", help="Última chave (inclusiva)")
+    resumos.add_argument("--limite", type=int, help="Número máximo de linhas")
+    resumos.add_argument("--ordenar", choices=("orcamentos", "receita", "custo_total", "metros", "peso_g"),
+                         help="Ordena de forma decrescente por esta coluna (padrão: pela chave)")
+    resumos.set_defaults(func=comando_resumos)
+
+    servidor = subparsers.add_parser("servir", help="Serviço HTTP de cotações (JSON) para loja virtual e ERP")
+    servidor.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+    servidor.add_argument("--porta", type=int, default=8765, help="Porta de escuta")
+    servidor.add_argument("--catalogo", default="catalogo_filamentos.json", help="Catálogo de filamentos")
+    servidor.add_argument("--max-concorrencia", type=int, default=64,
+                          help="Cálculos simultâneos (as demais requisições aguardam)")
+    servidor.add_argument("--cache-disco",
+                          help="Arquivo SQLite para compartilhar cotações memorizadas entre processos")
+    servidor.set_defaults(func=comando_servir)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = criar_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (KeyError, ValueError, OSError) as erro:
+        # Erros de uso (filamento ou coluna inexistente, arquivo inválido):
+        # uma linha no stderr em vez do traceback
+        mensagem = erro.args[0] if isinstance(erro, KeyError) and erro.args else erro
+        print(f"erro: {mensagem}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Consumo de energia por modelo de impressora, a partir do G-code.
+
+O registro de impressoras (impressoras.json) descreve a potência dos
+aquecedores, o consumo ocioso (eletrônica, motores, ventoinhas) e a
+eficiência da fonte. A linha do tempo dos aquecedores é lida do G-code em
+uma única passada (comandos M104/M109 do bico e M140/M190 da mesa) e o
+consumo é dividido em duas fases:
+
+- aquecimento: aquecedor em potência máxima até atingir a temperatura
+- regime: potência para manter a temperatura, proporcional à diferença
+  para a temperatura ambiente
+
+A linha do tempo não depende da impressora, então é guardada em cache por
+arquivo e o consumo de vários modelos para o mesmo trabalho é calculado de
+uma vez (eventos x impressoras).
+"""
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from typing import BinaryIO, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from nucleo.armazenamento import gravar_atomico
+from leitor_gcode import TAMANHO_BLOCO, _blocos
+
+ARQUIVO_IMPRESSORAS = "impressoras.json"
+TEMPERATURA_AMBIENTE = 25.0
+# Incrementar quando a leitura dos aquecedores mudar, para invalidar o cache antigo
+VERSAO_AQUECIMENTO = 1
+
+# M104/M109 (bico) e M140/M190 (mesa) com a temperatura em S ou R
+_RE_AQUECEDOR = re.compile(rb"^[ \t]*M(104|109|140|190)(?![0-9])[^;\n]*?[SR]([0-9]*\.?[0-9]+)", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class ModeloImpressora:
+    """Características elétricas de um modelo de impressora."""
+    nome: str
+    potencia_bico_w: float = 40.0
+    potencia_mesa_w: float = 220.0
+    consumo_ocioso_w: float = 15.0    # eletrônica, motores e ventoinhas
+    eficiencia_fonte: float = 0.85
+    aquecimento_bico: float = 2.0     # °C por segundo em potência máxima
+    aquecimento_mesa: float = 0.5     # °C por segundo em potência máxima
+    perda_bico: float = 0.12          # W por °C acima do ambiente, em regime
+    perda_mesa: float = 0.9           # W por °C acima do ambiente, em regime
+    # Cinemática (usada por cinematica.estimar_tempo)
+    aceleracao: float = 500.0         # mm/s², até o G-code definir outra com M204
+    jerk: float = 10.0                # mm/s, variação de velocidade instantânea nas junções
+    velocidade_maxima: float = 200.0  # mm/s
+    velocidade_maxima_z: float = 5.0  # mm/s
+    velocidade_maxima_e: float = 40.0 # mm/s (retrações)
+
+
+DEFAULT_IMPRESSORAS = {
+    m.nome: m for m in (
+        ModeloImpressora("Creality Ender 3 V2", 40.0, 220.0, 15.0, 0.85, 1.5, 0.4, 0.12, 0.95,
+                         500.0, 10.0, 500.0, 5.0, 25.0),
+        ModeloImpressora("Prusa MK4", 50.0, 230.0, 12.0, 0.90, 2.5, 0.6, 0.12, 0.85,
+                         2500.0, 8.0, 300.0, 12.0, 120.0),
+        ModeloImpressora("Bambu Lab X1 Carbon", 60.0, 350.0, 25.0, 0.90, 4.0, 0.8, 0.10, 0.70,
+                         20000.0, 9.0, 500.0, 20.0, 40.0),
+        ModeloImpressora("Bambu Lab A1 mini", 48.0, 150.0, 10.0, 0.88, 3.0, 0.7, 0.12, 0.55,
+                         10000.0, 9.0, 500.0, 20.0, 40.0),
+    )
+}
+
+
+def carregar_impressoras(arquivo: str = ARQUIVO_IMPRESSORAS) -> Dict[str, ModeloImpressora]:
+    """Carrega o registro de modelos de impressora de um arquivo JSON."""
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        return {nome: ModeloImpressora(nome=nome, **valores) for nome, valores in dados.items()}
+    except (FileNotFoundError, json.JSONDecodeError):
+        # Se o arquivo não existir ou estiver corrompido, retorna o registro padrão
+        return dict(DEFAULT_IMPRESSORAS)
+
+
+@dataclass
+class PerfilAquecimento:
+    """
+    Comandos de aquecimento de um G-code, na ordem do arquivo.
+
+    A posição de cada comando é a fração do arquivo já percorrida, usada
+    como fração do tempo de impressão decorrido.
+    """
+    posicoes: np.ndarray       # 0 a 1
+    mesa: np.ndarray           # True para a mesa, False para o bico
+    temperaturas: np.ndarray   # °C
+    espera: np.ndarray         # True para M109/M190 (aguarda atingir a temperatura)
+
+    def para_dict(self) -> Dict:
+        return {chave: valor.tolist() for chave, valor in asdict(self).items()}
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> "PerfilAquecimento":
+        return cls(
+            np.asarray(dados["posicoes"], dtype=float),
+            np.asarray(dados["mesa"], dtype=bool),
+            np.asarray(dados["temperaturas"], dtype=float),
+            np.asarray(dados["espera"], dtype=bool),
+        )
+
+
+def perfil_padrao(temperatura_bico: float = 210.0, temperatura_mesa: float = 60.0) -> PerfilAquecimento:
+    """Perfil de uma impressão comum quando não há G-code: aquece mesa e bico no início."""
+    return PerfilAquecimento(
+        np.zeros(2), np.array([True, False]), np.array([temperatura_mesa, temperatura_bico]), np.ones(2, dtype=bool)
+    )
+
+
+def analisar_aquecimento(origem: Union[str, os.PathLike, BinaryIO],
+                         tamanho_bloco: int = TAMANHO_BLOCO) -> PerfilAquecimento:
+    """Lê os comandos de aquecimento do G-code em uma única passada, em blocos."""
+    posicoes, codigos, temperaturas = [], [], []
+    deslocamento = 0
+    for bloco in _blocos(origem, tamanho_bloco):
+        for m in _RE_AQUECEDOR.finditer(bloco):
+            posicoes.append(deslocamento + m.start())
+            codigos.append(int(m.group(1)))
+            temperaturas.append(float(m.group(2)))
+        deslocamento += len(bloco)
+
+    codigos = np.asarray(codigos, dtype=int)
+    return PerfilAquecimento(
+        np.asarray(posicoes, dtype=float) / max(deslocamento, 1),
+        np.isin(codigos, (140, 190)),
+        np.asarray(temperaturas, dtype=float),
+        np.isin(codigos, (109, 190)),
+    )
+
+
+def analisar_aquecimento_cache(caminho: str, diretorio_cache: Optional[str] = None) -> PerfilAquecimento:
+    """analisar_aquecimento com cache em disco pelo hash do conteúdo do arquivo."""
+    from lote_gcode import DIRETORIO_CACHE, hash_arquivo
+
+    diretorio = diretorio_cache or DIRETORIO_CACHE
+    arquivo_cache = os.path.join(diretorio, f"{hash_arquivo(caminho)}.aquecimento.v{VERSAO_AQUECIMENTO}.json")
+    try:
+        with open(arquivo_cache, "r", encoding="utf-8") as f:
+            return PerfilAquecimento.de_dict(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    perfil = analisar_aquecimento(caminho)
+    os.makedirs(diretorio, exist_ok=True)
+    gravar_atomico(arquivo_cache, json.dumps(perfil.para_dict()))
+    return perfil
+
+
+def _estado(valores: np.ndarray, ativos: np.ndarray) -> np.ndarray:
+    """Temperatura alvo vigente após cada evento (última definida; ambiente antes da primeira)."""
+    indices = np.where(ativos, np.arange(len(ativos)), -1)
+    np.maximum.accumulate(indices, out=indices)
+    return np.where(indices >= 0, valores[np.maximum(indices, 0)], TEMPERATURA_AMBIENTE)
+
+
+def estimar_consumo(perfil: PerfilAquecimento,
+                    tempo_impressao: float,
+                    impressoras: Sequence[ModeloImpressora]) -> pd.DataFrame:
+    """
+    Energia consumida por cada modelo de impressora em um trabalho.
+
+    Args:
+        perfil: Linha do tempo dos aquecedores (analisar_aquecimento)
+        tempo_impressao: Duração da impressão em minutos (sem o tempo de
+            espera pelo aquecimento, que é estimado e somado)
+        impressoras: Modelos a comparar
+
+    Returns:
+        DataFrame com uma linha por impressora: tempo de aquecimento,
+        kWh de aquecimento, de regime e total, e potência média
+    """
+    def coluna(atributo):
+        return np.array([getattr(i, atributo) for i in impressoras], dtype=float)[None, :]
+
+    mesa = np.asarray(perfil.mesa, dtype=bool)
+    # Aquecedor desligado (S0) equivale à temperatura ambiente
+    bico_alvo = np.maximum(_estado(perfil.temperaturas, ~mesa), TEMPERATURA_AMBIENTE)
+    mesa_alvo = np.maximum(_estado(perfil.temperaturas, mesa), TEMPERATURA_AMBIENTE)
+    anterior_bico = np.concatenate([[TEMPERATURA_AMBIENTE], bico_alvo[:-1]])
+    anterior_mesa = np.concatenate([[TEMPERATURA_AMBIENTE], mesa_alvo[:-1]])
+
+    # Fase de aquecimento: elevação de temperatura em potência máxima (eventos x impressoras)
+    subida_bico = np.where(~mesa, np.maximum(bico_alvo - anterior_bico, 0.0), 0.0)[:, None]
+    subida_mesa = np.where(mesa, np.maximum(mesa_alvo - anterior_mesa, 0.0), 0.0)[:, None]
+    segundos_bico = subida_bico / coluna("aquecimento_bico")
+    segundos_mesa = subida_mesa / coluna("aquecimento_mesa")
+    wh_aquecimento = (segundos_bico * coluna("potencia_bico_w")
+                      + segundos_mesa * coluna("potencia_mesa_w")).sum(axis=0) / 3600
+    # Só a espera (M109/M190) prolonga o trabalho: cada M109/M190 aguarda a última
+    # elevação do seu aquecedor (ex.: M140 S60 seguido de M190 S60), contada uma vez.
+    # Bico e mesa aquecem em paralelo, então vale a maior das duas esperas.
+    espera = np.asarray(perfil.espera, dtype=bool)
+    minutos_espera = 0.0
+    for alvo, segundos in ((~mesa, segundos_bico), (mesa, segundos_mesa)):
+        subidas = np.where(alvo & (segundos[:, 0] > 0), np.arange(len(alvo)), -1)
+        np.maximum.accumulate(subidas, out=subidas)
+        aguardadas = np.unique(subidas[espera & alvo & (subidas >= 0)])
+        minutos_espera = np.maximum(minutos_espera, segundos[aguardadas].sum(axis=0) / 60)
+
+    # Fase de regime: entre um evento e o próximo, mantém as temperaturas vigentes
+    limites = np.concatenate([perfil.posicoes, [1.0]])
+    minutos = np.diff(limites)[:, None] * tempo_impressao
+    manter_bico = np.minimum(coluna("perda_bico") * np.maximum(bico_alvo - TEMPERATURA_AMBIENTE, 0.0)[:, None],
+                             coluna("potencia_bico_w"))
+    manter_mesa = np.minimum(coluna("perda_mesa") * np.maximum(mesa_alvo - TEMPERATURA_AMBIENTE, 0.0)[:, None],
+                             coluna("potencia_mesa_w"))
+    wh_regime = ((manter_bico + manter_mesa) * minutos).sum(axis=0) / 60
+
+    duracao = tempo_impressao + minutos_espera
+    wh_ocioso = coluna("consumo_ocioso_w")[0] * duracao / 60
+    eficiencia = coluna("eficiencia_fonte")[0]
+    kwh_aquecimento = wh_aquecimento / eficiencia / 1000
+    kwh_regime = (wh_regime + wh_ocioso) / eficiencia / 1000
+    kwh_total = kwh_aquecimento + kwh_regime
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        potencia_media = np.where(duracao > 0, kwh_total * 1000 / (duracao / 60), 0.0)
+    return pd.DataFrame({
+        'Impressora': [i.nome for i in impressoras],
+        'Espera Aquecimento (min)': minutos_espera,
+        'Aquecimento (kWh)': kwh_aquecimento,
+        'Regime (kWh)': kwh_regime,
+        'Total (kWh)': kwh_total,
+        'Potência Média (W)': potencia_media,
+    })
+
+
+def comparar_impressoras(perfil: PerfilAquecimento,
+                         tempo_impressao: float,
+                         preco_kwh: float,
+                         impressoras: Optional[Mapping[str, ModeloImpressora]] = None) -> pd.DataFrame:
+    """
+    Custo de energia de um trabalho em cada modelo do registro.
+
+    A coluna 'Custo Energia por Hora (R$)' pode ser usada diretamente como
+    custo_energia_hora em calcular_preco_impressao.
+    """
+    consumo = estimar_consumo(perfil, tempo_impressao, list((impressoras or carregar_impressoras()).values()))
+    consumo['Custo Energia (R$)'] = consumo['Total (kWh)'] * preco_kwh
+    horas = tempo_impressao / 60
+    consumo['Custo Energia por Hora (R$)'] = consumo['Custo Energia (R$)'] / horas if horas > 0 else 0.0
+    return consumo
@@ -0,0 +1,230 @@
+"""
+Escalonamento de trabalhos de impressão em uma fazenda de impressoras.
+
+Os orçamentos salvos no histórico funcionam como uma fila de trabalhos
+(tempo e filamento). Cada trabalho é atribuído a uma impressora com a
+heurística LPT (mais longos primeiro), usando filas de prioridade (heapq):
+uma com todas as impressoras e uma por filamento carregado, de modo que
+trocar o carretel (com seu tempo de troca) só acontece quando compensa.
+Com uma tarifa de energia, o objetivo pode ser o menor custo de energia
+em vez do menor tempo total (makespan).
+"""
+import heapq
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from nucleo.historico import ARQUIVO_BANCO, consultar_historico
+from nucleo.precificacao import Filamento
+
+TEMPO_TROCA_MIN = 15.0   # tempo para trocar o carretel de uma impressora
+
+OBJETIVOS = ("makespan", "energia")
+
+
+@dataclass
+class Impressora:
+    """Impressora da fazenda e o filamento carregado nela."""
+    nome: str
+    filamento: Optional[str] = None
+    potencia_kw: float = 0.2
+
+
+@dataclass
+class Escala:
+    """Resultado do escalonamento."""
+    tarefas: pd.DataFrame      # uma linha por trabalho, com impressora, início e fim
+    impressoras: pd.DataFrame  # resumo por impressora
+    makespan: float            # minutos até a última impressora terminar
+    custo_energia: Optional[float] = None
+
+
+def trabalhos_do_historico(arquivo: str = ARQUIVO_BANCO, **filtros) -> pd.DataFrame:
+    """
+    Fila de trabalhos a partir dos orçamentos salvos (filtros de consultar_historico).
+
+    Returns:
+        DataFrame com Trabalho, Filamento, Tempo (min) e Metros
+    """
+    historico = consultar_historico(por_pagina=None, arquivo=arquivo, **filtros)
+    return pd.DataFrame({
+        'Trabalho': historico['Projeto'],
+        'Filamento': historico['Filamento'],
+        'Tempo (min)': historico['Tempo (min)'].fillna(0.0).astype(float),
+        'Metros': historico['Metros'].fillna(0.0).astype(float),
+    })
+
+
+class _Filas:
+    """
+    Impressoras ordenadas por horário em que ficam livres: uma fila geral e
+    uma por filamento carregado. Entradas antigas são descartadas ao sair
+    da fila (remoção preguiçosa), comparando a versão da impressora.
+    """
+
+    def __init__(self, impressoras: Sequence[Impressora]):
+        self.livre = [0.0] * len(impressoras)
+        self.filamento = [i.filamento for i in impressoras]
+        self.versao = [0] * len(impressoras)
+        self.geral: List[Tuple[float, int, int]] = []
+        self.por_filamento: Dict[Optional[str], List[Tuple[float, int, int]]] = {}
+        for indice in range(len(impressoras)):
+            self._inserir(indice)
+
+    def _inserir(self, indice: int) -> None:
+        entrada = (self.livre[indice], indice, self.versao[indice])
+        heapq.heappush(self.geral, entrada)
+        heapq.heappush(self.por_filamento.setdefault(self.filamento[indice], []), entrada)
+
+    def _topo(self, fila: List[Tuple[float, int, int]]) -> Optional[int]:
+        while fila and fila[0][2] != self.versao[fila[0][1]]:
+            heapq.heappop(fila)
+        return fila[0][1] if fila else None
+
+    def primeira_livre(self, filamento: Optional[str] = None, geral: bool = False) -> Optional[int]:
+        return self._topo(self.geral if geral else self.por_filamento.get(filamento, []))
+
+    def ocupar(self, indice: int, ate: float, filamento: str) -> None:
+        self.livre[indice] = ate
+        self.filamento[indice] = filamento
+        self.versao[indice] += 1
+        self._inserir(indice)
+
+
+def escalonar(trabalhos: pd.DataFrame,
+              impressoras: Sequence[Impressora],
+              tempo_troca: float = TEMPO_TROCA_MIN,
+              objetivo: str = "makespan",
+              tarifa=None,
+              inicio: Optional[datetime] = None,
+              folga: float = 120.0,
+              catalogo: Optional[Mapping[str, Filamento]] = None) -> Escala:
+    """
+    Distribui os trabalhos entre as impressoras.
+
+    Args:
+        trabalhos: Colunas Trabalho, Filamento, Tempo (min) e, opcionalmente,
+            Metros (ex.: trabalhos_do_historico)
+        impressoras: Impressoras disponíveis, com o filamento já carregado
+        tempo_troca: Minutos para trocar o carretel
+        objetivo: "makespan" (terminar tudo o quanto antes) ou "energia"
+            (menor custo pela tarifa por horário; exige `tarifa`)
+        tarifa: Tarifa de tarifa_energia, usada no objetivo "energia" e
+            para informar o custo de energia da escala
+        inicio: Data/hora do início da escala (padrão: agora)
+        folga: No objetivo "energia", quantos minutos um trabalho pode
+            terminar depois do melhor término possível para ficar mais barato
+        catalogo: Catálogo de filamentos, para informar o peso de
+            filamento consumido por impressora
+
+    Returns:
+        Escala com as tarefas, o resumo por impressora e o makespan
+
+    Raises:
+        ValueError: Para objetivo desconhecido, ou "energia" sem tarifa
+    """
+    if objetivo not in OBJETIVOS:
+        raise ValueError(f"Objetivo desconhecido: {objetivo} (use {', '.join(OBJETIVOS)})")
+    if objetivo == "energia" and tarifa is None:
+        raise ValueError("O objetivo 'energia' exige uma tarifa")
+    if not impressoras:
+        raise ValueError("Nenhuma impressora informada")
+    if tarifa is not None:
+        from tarifa_energia import custo_energia_tarifa
+    inicio = np.datetime64(inicio or datetime.now(), "m")
+
+    tempos = trabalhos['Tempo (min)'].to_numpy(dtype=float)
+    filamentos = trabalhos['Filamento'].to_numpy(dtype=object)
+    potencias = np.array([i.potencia_kw for i in impressoras])
+    ordem = np.argsort(-tempos, kind="stable")   # LPT: mais longos primeiro
+
+    filas = _Filas(impressoras)
+    atribuida = np.empty(len(tempos), dtype=np.intp)
+    comeco = np.empty(len(tempos))
+    troca = np.zeros(len(tempos), dtype=bool)
+
+    for j in ordem:
+        tempo, filamento = tempos[j], filamentos[j]
+        if objetivo == "makespan":
+            # Candidatas: a primeira livre com o mesmo filamento e a primeira livre de todas
+            mesma = filas.primeira_livre(filamento)
+            qualquer = filas.primeira_livre(geral=True)
+            fim_mesma = filas.livre[mesma] + tempo if mesma is not None else np.inf
+            trocar = filas.filamento[qualquer] != filamento
+            fim_qualquer = filas.livre[qualquer] + tempo_troca * trocar + tempo
+            indice = mesma if fim_mesma <= fim_qualquer else qualquer
+        else:
+            # Avalia todas as impressoras de uma vez: menor custo de energia, depois menor fim
+            livre = np.asarray(filas.livre)
+            trocas = np.asarray(filas.filamento, dtype=object) != filamento
+            inicio_impressao = livre + tempo_troca * trocas
+            custos = custo_energia_tarifa(inicio + inicio_impressao.astype("timedelta64[m]"),
+                                          tempo, potencias, tarifa)
+            fins = inicio_impressao + tempo
+            # Só aceita atrasar o trabalho até `folga` minutos para economizar energia
+            custos = np.where(fins <= fins.min() + folga, np.round(custos, 6), np.inf)
+            indice = int(np.lexsort((fins, custos))[0])
+
+        trocou = filas.filamento[indice] != filamento
+        comeco[j] = filas.livre[indice] + tempo_troca * trocou
+        troca[j] = trocou
+        atribuida[j] = indice
+        filas.ocupar(indice, comeco[j] + tempo, filamento)
+
+    nomes = np.array([i.nome for i in impressoras], dtype=object)
+    fim = comeco + tempos
+    tarefas = pd.DataFrame({
+        'Trabalho': trabalhos['Trabalho'].to_numpy(),
+        'Filamento': filamentos,
+        'Impressora': nomes[atribuida],
+        'Início (min)': comeco,
+        'Fim (min)': fim,
+        'Troca de Carretel': troca,
+        'Início': inicio + comeco.astype("timedelta64[m]"),
+    })
+    if 'Metros' in trabalhos:
+        tarefas['Metros'] = trabalhos['Metros'].to_numpy(dtype=float)
+        if catalogo is not None:
+            gramas_por_metro = {nome: f.calcular_peso_por_metro() for nome, f in catalogo.items()}
+            tarefas['Peso (g)'] = tarefas['Metros'] * tarefas['Filamento'].map(gramas_por_metro).astype(float)
+
+    custo_energia = None
+    if tarefas.empty:
+        makespan = 0.0
+    else:
+        makespan = float(fim.max())
+    if tarifa is not None and not tarefas.empty:
+        tarefas['Custo Energia (R$)'] = custo_energia_tarifa(
+            tarefas['Início'].to_numpy(), tempos, potencias[atribuida], tarifa)
+        custo_energia = float(tarefas['Custo Energia (R$)'].sum())
+
+    tarefas = tarefas.sort_values(['Impressora', 'Início (min)'], kind="stable").reset_index(drop=True)
+    return Escala(tarefas, _resumo(tarefas, nomes, makespan), makespan, custo_energia)
+
+
+def _resumo(tarefas: pd.DataFrame, nomes: np.ndarray, makespan: float) -> pd.DataFrame:
+    """Tempo ocupado, trocas e utilização de cada impressora."""
+    ocupacao = (tarefas['Fim (min)'] - tarefas['Início (min)']).groupby(tarefas['Impressora']).sum()
+    agregados = {
+        'Trabalhos': tarefas.groupby('Impressora').size(),
+        'Impressão (min)': ocupacao,
+        'Trocas': tarefas.groupby('Impressora')['Troca de Carretel'].sum(),
+        'Término (min)': tarefas.groupby('Impressora')['Fim (min)'].max(),
+    }
+    for coluna in ('Peso (g)', 'Custo Energia (R$)'):
+        if coluna in tarefas:
+            agregados[coluna] = tarefas.groupby('Impressora')[coluna].sum()
+    resumo = pd.DataFrame(agregados).reindex(pd.Index(nomes, name='Impressora')).fillna(0)
+    resumo['Utilização (%)'] = resumo['Impressão (min)'] / makespan * 100 if makespan else 0.0
+    return resumo.reset_index()
+
+
+def impressoras_padrao(quantidade: int, filamentos: Sequence[str] = (), potencia_kw: float = 0.2) -> List[Impressora]:
+    """Fazenda de `quantidade` impressoras iguais, com os filamentos carregados em rodízio."""
+    return [
+        Impressora(f"Impressora {i + 1}", filamentos[i % len(filamentos)] if filamentos else None, potencia_kw)
+        for i in range(quantidade)
+    ]
@@ -0,0 +1,243 @@
+"""
+Leitura de arquivos G-code para obter metros de filamento e tempo de impressão.
+
+O arquivo é percorrido em blocos (via mmap quando é um arquivo em disco), de
+modo que arquivos de centenas de MB não precisam caber na memória. Só os
+comandos de controle (M82/M83, G90/G91, G92, T<n>) são tratados um a um em
+Python; os valores de extrusão de cada trecho entre dois comandos de controle
+são extraídos e somados em bloco com NumPy.
+"""
+import mmap
+import os
+import re
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterator, Optional, Union
+
+import numpy as np
+
+from nucleo.precificacao import Filamento, calcular_preco_impressao
+
+TAMANHO_BLOCO = 8 * 1024 * 1024   # bytes lidos por vez
+TAMANHO_CABECALHO = 64 * 1024     # bytes do início/fim analisados em busca de comentários do slicer
+
+# Comandos que mudam o estado da extrusão (raros no arquivo)
+_RE_CONTROLE = re.compile(
+    rb"^[ \t]*(?:(M8[23])|(G9[01])(?![0-9])|G92(?![0-9])([^;\n]*)|T([0-9]+))",
+    re.MULTILINE,
+)
+# Valor de E em movimentos G0/G1 (a grande maioria das linhas)
+_RE_EXTRUSAO = re.compile(rb"^[ \t]*G0*[01](?![0-9])[^;\n]*?E(-?[0-9]*\.?[0-9]+)", re.MULTILINE)
+_RE_E = re.compile(rb"E(-?[0-9]*\.?[0-9]+)")
+
+# Comentários de cabeçalho/rodapé dos slicers mais comuns
+_RE_TEMPO_CURA = re.compile(rb"^;TIME:\s*([0-9.]+)", re.MULTILINE)
+_RE_TEMPO_PRUSA = re.compile(
+    rb"^;\s*(?:estimated printing time \(normal mode\)|total estimated time)\s*[=:]\s*([0-9dhms ]+)",
+    re.MULTILINE,
+)
+_RE_FILAMENTO_MM = re.compile(rb"^;\s*filament used \[mm\]\s*=\s*([0-9., ]+)", re.MULTILINE)
+_RE_FILAMENTO_M = re.compile(rb"^;\s*Filament used:\s*([0-9.m, ]+)", re.MULTILINE | re.IGNORECASE)
+_RE_DURACAO = re.compile(rb"([0-9]+)\s*([dhms])")
+
+
+@dataclass
+class ResultadoGcode:
+    """Resumo de um arquivo G-code."""
+    metros_por_ferramenta: Dict[int, float] = field(default_factory=dict)
+    tempo_impressao: Optional[float] = None          # minutos, segundo o slicer
+    metros_slicer: Optional[Dict[int, float]] = None  # metros informados no cabeçalho
+    tempo_estimado: Optional[float] = None            # minutos, pela simulação dos movimentos (cinematica.py)
+
+    @property
+    def metros_usados(self) -> float:
+        """Total de metros de filamento extrudados (todas as ferramentas)."""
+        return sum(self.metros_por_ferramenta.values())
+
+    @property
+    def tempo(self) -> float:
+        """Tempo do slicer ou, na falta dele, o estimado pela cinemática (minutos)."""
+        return self.tempo_impressao or self.tempo_estimado or 0.0
+
+    def argumentos_preco(self) -> Dict[str, float]:
+        """Argumentos metros_usados/tempo_impressao para calcular_preco_impressao."""
+        return {
+            "metros_usados": self.metros_usados,
+            "tempo_impressao": self.tempo,
+        }
+
+
+class _EstadoExtrusao:
+    """Estado do extrusor ao longo do arquivo."""
+
+    def __init__(self):
+        self.relativo = False
+        self.ferramenta = 0
+        self.posicao = 0.0   # último E absoluto conhecido
+        self.base = 0.0      # E absoluto no início do trecho atual
+        self.mm_por_ferramenta: Dict[int, float] = {}
+
+    def _acumular(self, mm: float) -> None:
+        if mm:
+            self.mm_por_ferramenta[self.ferramenta] = self.mm_por_ferramenta.get(self.ferramenta, 0.0) + mm
+
+    def processar_trecho(self, trecho: bytes) -> None:
+        """Contabiliza as extrusões de um trecho sem comandos de controle."""
+        valores = _RE_EXTRUSAO.findall(trecho)
+        if not valores:
+            return
+        if self.relativo:
+            avanco = float(np.fromiter(map(float, valores), dtype=np.float64, count=len(valores)).sum())
+            self._acumular(avanco)
+            # A posição segue em coordenadas absolutas: ao voltar para M82
+            # sem G92, o firmware continua a partir dela
+            self.posicao += avanco
+        else:
+            # Em modo absoluto só o último valor importa: retrações e
+            # recuperações se anulam dentro do trecho.
+            self.posicao = float(valores[-1])
+
+    def fechar_trecho(self) -> None:
+        """Encerra o trecho absoluto atual, contabilizando o avanço de E."""
+        if not self.relativo:
+            self._acumular(self.posicao - self.base)
+        self.base = self.posicao
+
+    def aplicar_controle(self, m: "re.Match") -> None:
+        modo_e, modo_geral, g92, ferramenta = m.groups()
+        self.fechar_trecho()
+        if modo_e is not None:
+            self.relativo = modo_e == b"M83"
+        elif modo_geral is not None:
+            self.relativo = modo_geral == b"G91"
+        elif g92 is not None:
+            valor = _RE_E.search(g92)
+            if valor is not None or not g92.strip():
+                # "G92" sem eixos zera todos, inclusive E
+                self.posicao = float(valor.group(1)) if valor is not None else 0.0
+                self.base = self.posicao
+        else:
+            self.ferramenta = int(ferramenta)
+
+
+def _blocos(origem: Union[str, os.PathLike, BinaryIO], tamanho: int) -> Iterator[bytes]:
+    """Gera blocos do arquivo terminados em quebra de linha."""
+    if isinstance(origem, (str, os.PathLike)):
+        with open(origem, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                inicio, total = 0, len(mm)
+                while inicio < total:
+                    fim = mm.find(b"\n", min(inicio + tamanho, total) - 1)
+                    fim = total if fim == -1 else fim + 1
+                    yield mm[inicio:fim]
+                    inicio = fim
+        return
+
+    resto = b""
+    while True:
+        dados = origem.read(tamanho)
+        if not dados:
+            break
+        dados = resto + dados
+        corte = dados.rfind(b"\n") + 1
+        if corte == 0:
+            resto = dados
+            continue
+        resto = dados[corte:]
+        yield dados[:corte]
+    if resto:
+        yield resto + b"\n"
+
+
+def _segundos_duracao(texto: bytes) -> float:
+    """Converte '1d 2h 3m 4s' em segundos."""
+    fatores = {b"d": 86400, b"h": 3600, b"m": 60, b"s": 1}
+    return float(sum(int(n) * fatores[u] for n, u in _RE_DURACAO.findall(texto)))
+
+
+def _lista_numeros(texto: bytes) -> Dict[int, float]:
+    valores = [v.strip().rstrip(b"m") for v in texto.split(b",")]
+    return {i: float(v) for i, v in enumerate(valores) if v}
+
+
+def _ler_comentarios_slicer(resultado: ResultadoGcode, texto: bytes) -> None:
+    """Preenche tempo e filamento a partir dos comentários do slicer."""
+    if resultado.tempo_impressao is None:
+        m = _RE_TEMPO_CURA.search(texto)
+        if m is not None:
+            resultado.tempo_impressao = float(m.group(1)) / 60
+        else:
+            m = _RE_TEMPO_PRUSA.search(texto)
+            if m is not None:
+                resultado.tempo_impressao = _segundos_duracao(m.group(1)) / 60
+
+    if resultado.metros_slicer is None:
+        m = _RE_FILAMENTO_MM.search(texto)
+        if m is not None:
+            resultado.metros_slicer = {t: mm / 1000 for t, mm in _lista_numeros(m.group(1)).items()}
+        else:
+            m = _RE_FILAMENTO_M.search(texto)
+            if m is not None:
+                resultado.metros_slicer = _lista_numeros(m.group(1))
+
+
+def analisar_gcode(origem: Union[str, os.PathLike, BinaryIO],
+                   tamanho_bloco: int = TAMANHO_BLOCO) -> ResultadoGcode:
+    """
+    Analisa um arquivo G-code e retorna o filamento usado por ferramenta.
+
+    Args:
+        origem: Caminho do arquivo ou objeto binário com método read()
+            (por exemplo o arquivo enviado por st.file_uploader)
+        tamanho_bloco: Quantidade aproximada de bytes processados por vez
+
+    Returns:
+        ResultadoGcode com metros por ferramenta (a partir do eixo E) e o
+        tempo estimado informado pelo slicer, quando disponível
+    """
+    resultado = ResultadoGcode()
+    estado = _EstadoExtrusao()
+    cauda = b""
+
+    for indice, bloco in enumerate(_blocos(origem, tamanho_bloco)):
+        if indice == 0:
+            _ler_comentarios_slicer(resultado, bloco[:TAMANHO_CABECALHO])
+
+        inicio = 0
+        for m in _RE_CONTROLE.finditer(bloco):
+            estado.processar_trecho(bloco[inicio:m.start()])
+            estado.aplicar_controle(m)
+            inicio = m.end()
+        estado.processar_trecho(bloco[inicio:])
+        cauda = (cauda + bloco[-TAMANHO_CABECALHO:])[-TAMANHO_CABECALHO:]
+
+    estado.fechar_trecho()
+    _ler_comentarios_slicer(resultado, cauda)
+
+    resultado.metros_por_ferramenta = {
+        ferramenta: mm / 1000 for ferramenta, mm in sorted(estado.mm_por_ferramenta.items())
+    }
+    return resultado
+
+
+def calcular_preco_gcode(filamento: Filamento,
+                         origem: Union[str, os.PathLike, BinaryIO],
+                         custo_energia_hora: float,
+                         custo_manutencao_hora: float,
+                         margem_lucro: float,
+                         custo_falha: float = 0.0) -> Dict:
+    """Calcula o preço de uma impressão diretamente a partir do G-code."""
+    from cinematica import completar_tempo
+
+    resultado = completar_tempo(analisar_gcode(origem), origem)
+    precos = calcular_preco_impressao(
+        filamento,
+        custo_energia_hora=custo_energia_hora,
+        custo_manutencao_hora=custo_manutencao_hora,
+        margem_lucro=margem_lucro,
+        custo_falha=custo_falha,
+        **resultado.argumentos_preco()
+    )
+    precos['Tempo (min)'] = resultado.tempo
+    return precos
@@ -0,0 +1,142 @@
+"""
+Ingestão de vários arquivos G-code em paralelo, com cache em disco.
+
+Cada arquivo é identificado pelo hash do seu conteúdo: se o mesmo G-code for
+enviado de novo (por exemplo numa revisão do orçamento), o resultado salvo em
+cache é reutilizado sem nova leitura do arquivo.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from nucleo.armazenamento import gravar_atomico
+from cinematica import completar_tempo
+from leitor_gcode import ResultadoGcode, analisar_gcode
+from nucleo.precificacao import Filamento, calcular_preco_impressao
+
+DIRETORIO_CACHE = ".cache_gcode"
+# Incrementar quando a lógica de leitura mudar, para invalidar o cache antigo
+VERSAO_LEITOR = 2
+
+
+def hash_arquivo(caminho: str) -> str:
+    """Calcula o hash SHA-256 do conteúdo do arquivo, lendo-o em blocos."""
+    with open(caminho, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def _caminho_cache(diretorio: str, chave: str) -> str:
+    return os.path.join(diretorio, f"{chave}.v{VERSAO_LEITOR}.json")
+
+
+def _ler_cache(diretorio: str, chave: str) -> Optional[ResultadoGcode]:
+    try:
+        with open(_caminho_cache(diretorio, chave), "r", encoding="utf-8") as f:
+            dados = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    metros_slicer = dados["metros_slicer"]
+    return ResultadoGcode(
+        metros_por_ferramenta={int(t): m for t, m in dados["metros_por_ferramenta"].items()},
+        tempo_impressao=dados["tempo_impressao"],
+        metros_slicer={int(t): m for t, m in metros_slicer.items()} if metros_slicer is not None else None,
+        tempo_estimado=dados["tempo_estimado"],
+    )
+
+
+def _gravar_cache(diretorio: str, chave: str, resultado: ResultadoGcode) -> None:
+    """Grava o resultado de forma atômica (arquivo temporário + rename)."""
+    os.makedirs(diretorio, exist_ok=True)
+    dados = {
+        "metros_por_ferramenta": resultado.metros_por_ferramenta,
+        "tempo_impressao": resultado.tempo_impressao,
+        "metros_slicer": resultado.metros_slicer,
+        "tempo_estimado": resultado.tempo_estimado,
+    }
+    gravar_atomico(_caminho_cache(diretorio, chave), json.dumps(dados))
+
+
+def _hash_e_analise(caminho: str, diretorio_cache: Optional[str]) -> ResultadoGcode:
+    """
+    Executado nos processos auxiliares: consulta o cache ou lê o arquivo.
+    Sem o tempo do slicer, o tempo é estimado pela cinemática (e guardado no cache).
+    """
+    if diretorio_cache is None:
+        return completar_tempo(analisar_gcode(caminho), caminho)
+    chave = hash_arquivo(caminho)
+    resultado = _ler_cache(diretorio_cache, chave)
+    if resultado is None:
+        resultado = completar_tempo(analisar_gcode(caminho), caminho)
+        _gravar_cache(diretorio_cache, chave, resultado)
+    return resultado
+
+
+def analisar_gcodes(caminhos: Sequence[str],
+                    processos: Optional[int] = None,
+                    diretorio_cache: Optional[str] = DIRETORIO_CACHE) -> List[ResultadoGcode]:
+    """
+    Analisa vários arquivos G-code distribuindo-os entre processos.
+
+    Args:
+        caminhos: Arquivos a analisar
+        processos: Número de processos (padrão: número de CPUs). Com 1,
+            tudo roda no processo atual.
+        diretorio_cache: Diretório do cache por hash de conteúdo, ou None
+            para desativar o cache
+
+    Returns:
+        Lista de ResultadoGcode na mesma ordem de `caminhos`
+    """
+    if processos == 1 or len(caminhos) <= 1:
+        return [_hash_e_analise(c, diretorio_cache) for c in caminhos]
+
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        return list(executor.map(_hash_e_analise, caminhos, [diretorio_cache] * len(caminhos)))
+
+
+def orcar_pedido(filamento: Filamento,
+                 caminhos: Sequence[str],
+                 custo_energia_hora: float,
+                 custo_manutencao_hora: float,
+                 margem_lucro: float,
+                 custo_falha: float = 0.0,
+                 processos: Optional[int] = None,
+                 diretorio_cache: Optional[str] = DIRETORIO_CACHE) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Orça um pedido com várias placas, uma por arquivo G-code.
+
+    Returns:
+        Tupla (tabela por placa, totais do pedido). A tabela tem uma linha
+        por arquivo com metros, tempo, uso por ferramenta e os custos de
+        calcular_preco_impressao; os totais somam as colunas numéricas.
+    """
+    resultados = analisar_gcodes(caminhos, processos=processos, diretorio_cache=diretorio_cache)
+
+    linhas = []
+    for caminho, resultado in zip(caminhos, resultados):
+        precos = calcular_preco_impressao(
+            filamento,
+            custo_energia_hora=custo_energia_hora,
+            custo_manutencao_hora=custo_manutencao_hora,
+            margem_lucro=margem_lucro,
+            custo_falha=custo_falha,
+            **resultado.argumentos_preco()
+        )
+        linha = {'Placa': os.path.basename(caminho), 'Tempo (min)': resultado.tempo}
+        linha.update({f'Metros T{t}': m for t, m in resultado.metros_por_ferramenta.items()})
+        linha.update(precos)
+        linhas.append(linha)
+
+    tabela = pd.DataFrame(linhas)
+    colunas_ferramentas = sorted(c for c in tabela.columns if c.startswith('Metros T'))
+    tabela[colunas_ferramentas] = tabela[colunas_ferramentas].fillna(0.0)
+    primeiras = ['Placa', 'Tempo (min)'] + colunas_ferramentas
+    tabela = tabela[primeiras + [c for c in tabela.columns if c not in primeiras]]
+
+    totais = tabela.drop(columns=['Placa'], errors='ignore').sum(numeric_only=True).to_dict()
+    totais['Placas'] = len(tabela)
+    return tabela, totais
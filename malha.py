@@ -0,0 +1,228 @@
+"""
+Análise de malhas STL/3MF para orçar peças antes do fatiamento.
+
+As malhas são carregadas como arrays NumPy de triângulos (n, 3, 3). STL
+binário é mapeado em memória (np.memmap), então mesmo malhas com milhões de
+triângulos não são copiadas por inteiro; STL ASCII é lido aos pedaços.
+Volume, área e caixa delimitadora são calculados em blocos nos dois casos.
+"""
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, Iterator, Tuple, Union
+
+import numpy as np
+
+from leitor_gcode import TAMANHO_BLOCO, _blocos
+from nucleo.precificacao import Filamento
+
+TRIANGULOS_POR_BLOCO = 1_000_000
+
+# Registro de 50 bytes de cada triângulo no STL binário
+_DTYPE_STL = np.dtype([
+    ("normal", "<f4", (3,)),
+    ("vertices", "<f4", (3, 3)),
+    ("atributo", "<u2"),
+])
+
+_RE_VERTICE_ASCII = re.compile(
+    rb"vertex\s+([-+0-9.eE]+)\s+([-+0-9.eE]+)\s+([-+0-9.eE]+)"
+)
+_RE_MALHA_3MF = re.compile(rb"<(?:\w+:)?mesh\b.*?</(?:\w+:)?mesh>", re.DOTALL)
+_RE_VERTICE_3MF = re.compile(
+    rb"<(?:\w+:)?vertex\s+x=\"([^\"]+)\"\s+y=\"([^\"]+)\"\s+z=\"([^\"]+)\""
+)
+_RE_TRIANGULO_3MF = re.compile(
+    rb"<(?:\w+:)?triangle\s+v1=\"([0-9]+)\"\s+v2=\"([0-9]+)\"\s+v3=\"([0-9]+)\""
+)
+
+
+@dataclass
+class AnaliseMalha:
+    """Medidas geométricas de uma malha (em mm)."""
+    triangulos: int
+    volume_mm3: float
+    area_mm2: float
+    minimo: Tuple[float, float, float]
+    maximo: Tuple[float, float, float]
+
+    @property
+    def dimensoes(self) -> Tuple[float, float, float]:
+        """Largura, profundidade e altura da caixa delimitadora."""
+        return tuple(b - a for a, b in zip(self.minimo, self.maximo))
+
+
+def _stl_binario(caminho: str) -> bool:
+    """Um STL é binário quando o tamanho bate com 84 + 50 * n_triângulos."""
+    tamanho = os.path.getsize(caminho)
+    if tamanho < 84:
+        return False
+    with open(caminho, "rb") as f:
+        f.seek(80)
+        n = int(np.frombuffer(f.read(4), dtype="<u4")[0])
+    return tamanho == 84 + 50 * n
+
+
+def _numeros(valores) -> np.ndarray:
+    """Converte uma lista de tuplas de bytes em um array float64."""
+    return np.array(valores, dtype=np.bytes_).astype(np.float64)
+
+
+def carregar_stl(caminho: str) -> np.ndarray:
+    """
+    Carrega um STL (binário ou ASCII) como array (n, 3, 3) de vértices.
+
+    No formato binário o array retornado é uma visão de um np.memmap, sem
+    cópia dos dados para a memória.
+    """
+    if _stl_binario(caminho):
+        registros = np.memmap(caminho, dtype=_DTYPE_STL, mode="r", offset=84)
+        return registros["vertices"]
+
+    blocos = list(_blocos_stl_ascii(caminho))
+    return np.concatenate(blocos) if blocos else np.empty((0, 3, 3))
+
+
+def _blocos_stl_ascii(caminho: str,
+                      triangulos_por_bloco: int = TRIANGULOS_POR_BLOCO,
+                      tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[np.ndarray]:
+    """
+    Triângulos de um STL ASCII em blocos (k, 3, 3) de cerca de
+    `triangulos_por_bloco`, lendo o arquivo `tamanho_bloco` bytes por vez.
+    """
+    pendentes, quantidade = [], 0   # vértices lidos que ainda não formam um bloco
+    for texto in _blocos(caminho, tamanho_bloco):
+        vertices = _numeros(_RE_VERTICE_ASCII.findall(texto)).reshape(-1, 3)
+        pendentes.append(vertices)
+        quantidade += len(vertices)
+        if quantidade >= 3 * triangulos_por_bloco:
+            # Um triângulo pode começar num pedaço e terminar no próximo
+            vertices = np.concatenate(pendentes)
+            completos = quantidade // 3 * 3
+            yield vertices[:completos].reshape(-1, 3, 3)
+            pendentes, quantidade = [vertices[completos:]], quantidade - completos
+    if quantidade >= 3:
+        yield np.concatenate(pendentes)[:quantidade // 3 * 3].reshape(-1, 3, 3)
+
+
+def _blocos_malha(malha: Union[str, np.ndarray], triangulos_por_bloco: int) -> Iterator[np.ndarray]:
+    """Blocos float64 (k, 3, 3) de uma malha; STL ASCII é lido aos pedaços, sem carregar o arquivo."""
+    if isinstance(malha, str) and os.path.splitext(malha)[1].lower() == ".stl" and not _stl_binario(malha):
+        yield from _blocos_stl_ascii(malha, triangulos_por_bloco)
+        return
+    triangulos = carregar_malha(malha) if isinstance(malha, str) else malha
+    for inicio in range(0, len(triangulos), triangulos_por_bloco):
+        yield np.asarray(triangulos[inicio:inicio + triangulos_por_bloco], dtype=np.float64)
+
+
+def carregar_3mf(caminho: str) -> np.ndarray:
+    """
+    Carrega todas as malhas de um arquivo 3MF como array (n, 3, 3).
+
+    As transformações de montagem (<build>/<component>) não são aplicadas:
+    volume e área não dependem delas, apenas a posição da caixa delimitadora.
+    """
+    partes = []
+    with zipfile.ZipFile(caminho) as arquivo:
+        for nome in arquivo.namelist():
+            if not nome.lower().endswith(".model"):
+                continue
+            conteudo = arquivo.read(nome)
+            for malha in _RE_MALHA_3MF.finditer(conteudo):
+                texto = malha.group(0)
+                vertices = _numeros(_RE_VERTICE_3MF.findall(texto))
+                indices = np.array(_RE_TRIANGULO_3MF.findall(texto), dtype=np.bytes_).astype(np.int64)
+                if len(indices):
+                    partes.append(vertices.reshape(-1, 3)[indices])
+    if not partes:
+        return np.empty((0, 3, 3))
+    return np.concatenate(partes)
+
+
+def carregar_malha(caminho: str) -> np.ndarray:
+    """Carrega um arquivo .stl ou .3mf como array (n, 3, 3) de triângulos."""
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".stl":
+        return carregar_stl(caminho)
+    if extensao == ".3mf":
+        return carregar_3mf(caminho)
+    raise ValueError(f"Formato de malha não suportado: '{caminho}' (use .stl ou .3mf)")
+
+
+def analisar_malha(malha: Union[str, np.ndarray],
+                   triangulos_por_bloco: int = TRIANGULOS_POR_BLOCO) -> AnaliseMalha:
+    """
+    Calcula volume, área de superfície e caixa delimitadora de uma malha.
+
+    O volume é a soma dos volumes com sinal dos tetraedros formados por cada
+    triângulo e a origem; para malhas fechadas com normais para fora ele é
+    positivo (o valor absoluto é usado caso as normais estejam invertidas).
+
+    Args:
+        malha: Caminho do arquivo ou array (n, 3, 3) de triângulos
+        triangulos_por_bloco: Triângulos convertidos para float64 por vez
+    """
+    triangulos = 0
+    volume = 0.0
+    area = 0.0
+    minimo = np.full(3, np.inf)
+    maximo = np.full(3, -np.inf)
+
+    for bloco in _blocos_malha(malha, triangulos_por_bloco):
+        triangulos += len(bloco)
+        v0, v1, v2 = bloco[:, 0], bloco[:, 1], bloco[:, 2]
+        volume += float(np.einsum("ij,ij->", v0, np.cross(v1, v2))) / 6
+        area += float(np.linalg.norm(np.cross(v1 - v0, v2 - v0), axis=1).sum()) / 2
+        pontos = bloco.reshape(-1, 3)
+        minimo = np.minimum(minimo, pontos.min(axis=0))
+        maximo = np.maximum(maximo, pontos.max(axis=0))
+
+    if not triangulos:
+        minimo = maximo = np.zeros(3)
+
+    return AnaliseMalha(
+        triangulos=triangulos,
+        volume_mm3=abs(volume),
+        area_mm2=area,
+        minimo=tuple(float(v) for v in minimo),
+        maximo=tuple(float(v) for v in maximo),
+    )
+
+
+def estimar_filamento(analise: AnaliseMalha,
+                      filamento: Filamento,
+                      infill: float = 20.0,
+                      paredes: int = 2,
+                      largura_linha: float = 0.4) -> Dict[str, float]:
+    """
+    Estima gramas e metros de filamento para imprimir a peça.
+
+    A casca (paredes, topo e base) é aproximada por área × espessura
+    (paredes × largura_linha); o restante do volume recebe o infill. A
+    densidade vem do próprio filamento: peso por metro dividido pela área
+    da seção transversal.
+
+    Args:
+        analise: Resultado de analisar_malha
+        filamento: Filamento usado na impressão
+        infill: Preenchimento interno em porcentagem
+        paredes: Número de perímetros
+        largura_linha: Largura de extrusão em mm
+
+    Returns:
+        Dict com volume da peça, volume de material, peso e metros
+    """
+    volume_casca = min(analise.volume_mm3, analise.area_mm2 * paredes * largura_linha)
+    volume_interno = analise.volume_mm3 - volume_casca
+    volume_material = volume_casca + volume_interno * (infill / 100)
+
+    secao_mm2 = np.pi * (filamento.diametro / 2) ** 2
+    metros_usados = volume_material / secao_mm2 / 1000
+
+    return {
+        'Volume da Peça (cm³)': analise.volume_mm3 / 1000,
+        'Volume de Material (cm³)': volume_material / 1000,
+        'Peso Usado (g)': metros_usados * filamento.calcular_peso_por_metro(),
+        'Metros Usados': metros_usados,
+    }
@@ -0,0 +1,266 @@
+"""
+Memorização de cotações compartilhada por reruns, sessões e processos.
+
+Os mesmos orçamentos (mesmo filamento, metros, minutos, custos e margem)
+são pedidos repetidamente: a cada rerun do Streamlit, por vários usuários
+cotando produtos padrão e pelo serviço HTTP. MemoCotacao guarda os
+resultados em dois níveis:
+
+- memória: LRU limitado (OrderedDict) com validade, por processo;
+- disco (opcional): SQLite compartilhado entre workers e processos.
+
+A chave inclui a função, os argumentos e a versão dos arquivos de que o
+resultado depende (catálogo de filamentos, marketplaces): alterar um preço
+muda a versão e as entradas antigas deixam de ser encontradas, sem precisar
+limpar o cache. Resultados mutáveis (dicionários, DataFrames) são copiados
+na entrega, para que quem chama possa alterá-los.
+
+    from memo_cotacao import MEMO
+    resultados = MEMO.chamar(calcular_preco_impressao, filamento, 12.5, 90, 0.5, 2.0, 100,
+                             dependencias=(ARQUIVO_CATALOGO,))
+    MEMO.estatisticas()   # acertos, falhas, despejos...
+"""
+import copy
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from cache_catalogo import versao_catalogo
+
+MAXIMO_MEMORIA = 4_096
+MAXIMO_DISCO = 100_000
+VALIDADE_PADRAO = 3_600.0   # segundos
+
+_AUSENTE = object()
+_IMUTAVEIS = (tuple, str, bytes, int, float, bool, frozenset, type(None))
+
+
+class CacheLRU:
+    """LRU limitado a `maximo` entradas, com validade opcional (segundos) por entrada."""
+
+    def __init__(self, maximo: int = MAXIMO_MEMORIA, validade: Optional[float] = VALIDADE_PADRAO):
+        self.maximo = maximo
+        self.validade = validade
+        self._trava = threading.Lock()
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.expirados = 0
+
+    def obter(self, chave: Hashable, padrao: Any = None) -> Any:
+        with self._trava:
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                valor, expira = entrada
+                if expira >= time.monotonic():
+                    self._entradas.move_to_end(chave)
+                    self.acertos += 1
+                    return valor
+                del self._entradas[chave]
+                self.expirados += 1
+            self.falhas += 1
+            return padrao
+
+    def guardar(self, chave: Hashable, valor: Any) -> None:
+        expira = time.monotonic() + self.validade if self.validade is not None else float("inf")
+        with self._trava:
+            self._entradas[chave] = (valor, expira)
+            self._entradas.move_to_end(chave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+                self.despejos += 1
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+class CacheDisco:
+    """
+    Nível em disco (SQLite, modo WAL), compartilhado por todos os processos
+    que apontam para o mesmo arquivo. Valores são gravados com pickle: use
+    apenas um arquivo local do próprio sistema.
+    """
+
+    _ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS cotacoes (
+            chave TEXT PRIMARY KEY,
+            valor BLOB NOT NULL,
+            criado REAL NOT NULL,
+            usado REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cotacoes_usado ON cotacoes (usado);
+    """
+
+    def __init__(self, arquivo: str, maximo: int = MAXIMO_DISCO, validade: Optional[float] = VALIDADE_PADRAO):
+        self.arquivo = arquivo
+        self.maximo = maximo
+        self.validade = validade
+        self._trava = threading.Lock()
+        self._conexao = sqlite3.connect(arquivo, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.executescript(self._ESQUEMA)
+        self._insercoes = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+        self.expirados = 0
+
+    def obter(self, chave: str, padrao: Any = None) -> Any:
+        agora = time.time()
+        with self._trava:
+            linha = self._conexao.execute(
+                "SELECT valor, criado FROM cotacoes WHERE chave = ?", (chave,)).fetchone()
+            if linha is not None:
+                if self.validade is None or linha[1] + self.validade >= agora:
+                    self._conexao.execute("UPDATE cotacoes SET usado = ? WHERE chave = ?", (agora, chave))
+                    self.acertos += 1
+                    return pickle.loads(linha[0])
+                self._conexao.execute("DELETE FROM cotacoes WHERE chave = ?", (chave,))
+                self.expirados += 1
+            self.falhas += 1
+            return padrao
+
+    def guardar(self, chave: str, valor: Any) -> None:
+        agora = time.time()
+        dados = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._trava:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO cotacoes (chave, valor, criado, usado) VALUES (?, ?, ?, ?)",
+                (chave, dados, agora, agora))
+            # Aplica o limite de tempos em tempos, removendo as menos usadas
+            self._insercoes += 1
+            if self._insercoes >= max(self.maximo // 10, 1):
+                self._insercoes = 0
+                self._podar()
+
+    def _podar(self) -> None:
+        (total,) = self._conexao.execute("SELECT COUNT(*) FROM cotacoes").fetchone()
+        if total > self.maximo:
+            cursor = self._conexao.execute(
+                "DELETE FROM cotacoes WHERE chave IN (SELECT chave FROM cotacoes ORDER BY usado LIMIT ?)",
+                (total - self.maximo,))
+            self.despejos += cursor.rowcount
+
+    def limpar(self) -> None:
+        with self._trava:
+            self._conexao.execute("DELETE FROM cotacoes")
+
+    def __len__(self) -> int:
+        with self._trava:
+            return self._conexao.execute("SELECT COUNT(*) FROM cotacoes").fetchone()[0]
+
+    def fechar(self) -> None:
+        with self._trava:
+            self._conexao.close()
+
+
+def _copiar(valor: Any) -> Any:
+    return valor if isinstance(valor, _IMUTAVEIS) else copy.copy(valor)
+
+
+class MemoCotacao:
+    """Memorização de funções de precificação em memória e, opcionalmente, em disco."""
+
+    def __init__(self,
+                 maximo: int = MAXIMO_MEMORIA,
+                 validade: Optional[float] = VALIDADE_PADRAO,
+                 arquivo_disco: Optional[str] = None,
+                 maximo_disco: int = MAXIMO_DISCO):
+        self.memoria = CacheLRU(maximo, validade)
+        self.disco: Optional[CacheDisco] = None
+        self.nao_memorizaveis = 0
+        if arquivo_disco:
+            self.usar_disco(arquivo_disco, maximo_disco, validade)
+
+    def usar_disco(self, arquivo: str, maximo: int = MAXIMO_DISCO, validade: Optional[float] = VALIDADE_PADRAO) -> None:
+        """Ativa o nível em disco, compartilhado com outros processos que usem o mesmo arquivo."""
+        if self.disco is not None:
+            self.disco.fechar()
+        self.disco = CacheDisco(arquivo, maximo, validade)
+
+    @staticmethod
+    def chave(funcao: Callable, args: Tuple, kwargs: Dict, dependencias: Iterable[str] = ()) -> Tuple:
+        """Chave de uma chamada: função, versão dos arquivos dependentes e argumentos."""
+        return (
+            f"{funcao.__module__}.{funcao.__qualname__}",
+            tuple((os.path.abspath(arquivo), versao_catalogo(arquivo)) for arquivo in dependencias),
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+
+    def chamar(self, funcao: Callable, *args, dependencias: Iterable[str] = (), **kwargs) -> Any:
+        """
+        Chama funcao(*args, **kwargs), reaproveitando um resultado já calculado.
+
+        Args:
+            funcao: Função pura de precificação
+            dependencias: Arquivos cujo conteúdo altera o resultado (ex.: o
+                catálogo de filamentos); a versão deles entra na chave
+
+        Returns:
+            O resultado da função (uma cópia, se for mutável)
+        """
+        chave = self.chave(funcao, args, kwargs, dependencias)
+        try:
+            valor = self.memoria.obter(chave, _AUSENTE)
+        except TypeError:
+            # Argumento não hashable (ex.: dicionário): calcula sem memorizar
+            self.nao_memorizaveis += 1
+            return funcao(*args, **kwargs)
+        if valor is not _AUSENTE:
+            return _copiar(valor)
+
+        if self.disco is not None:
+            chave_disco = hashlib.sha256(repr(chave).encode("utf-8")).hexdigest()
+            valor = self.disco.obter(chave_disco, _AUSENTE)
+            if valor is not _AUSENTE:
+                self.memoria.guardar(chave, valor)
+                return _copiar(valor)
+
+        valor = funcao(*args, **kwargs)
+        self.memoria.guardar(chave, valor)
+        if self.disco is not None:
+            self.disco.guardar(chave_disco, valor)
+        return _copiar(valor)
+
+    def limpar(self) -> None:
+        self.memoria.limpar()
+        if self.disco is not None:
+            self.disco.limpar()
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Contadores de acertos, falhas, despejos e expirações de cada nível."""
+        memoria = self.memoria
+        consultas = memoria.acertos + memoria.falhas
+        estatisticas = {
+            "acertos": memoria.acertos,
+            "falhas": memoria.falhas,
+            "despejos": memoria.despejos,
+            "expirados": memoria.expirados,
+            "entradas": len(memoria),
+            "nao_memorizaveis": self.nao_memorizaveis,
+            "taxa_acerto": memoria.acertos / consultas if consultas else 0.0,
+        }
+        if self.disco is not None:
+            estatisticas.update({
+                "acertos_disco": self.disco.acertos,
+                "falhas_disco": self.disco.falhas,
+                "despejos_disco": self.disco.despejos,
+                "expirados_disco": self.disco.expirados,
+            })
+        return estatisticas
+
+
+# Instância única do processo (compartilhada entre sessões do Streamlit e o serviço)
+MEMO = MemoCotacao()
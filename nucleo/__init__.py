@@ -0,0 +1,49 @@
+"""
+Núcleo da calculadora: precificação, catálogo de filamentos, marketplaces e
+histórico de orçamentos, sem Streamlit.
+
+As interfaces (Streamlit, CLI, workers) importam daqui. Nada pesado é
+carregado na importação: os submódulos só são importados quando um nome é
+usado pela primeira vez, e NumPy/pandas só quando um cálculo em lote ou uma
+tabela precisa deles (ver dependencias.importar_preguicoso).
+
+    from nucleo import Filamento, calcular_preco_impressao
+"""
+import importlib
+
+# Nome público -> submódulo que o define
+_EXPORTACOES = {
+    **dict.fromkeys((
+        "Filamento", "CatalogoColunar", "DEFAULT_FILAMENTOS", "COLUNAS_LOTE",
+        "calcular_preco_impressao", "calcular_precos_lote", "calcular_precos_dataframe",
+        "carregar_catalogo", "salvar_catalogo", "registrar_filamento", "remover_filamento",
+        "margem_para_preco", "metros_maximos_para_preco", "tempo_maximo_para_preco",
+    ), "precificacao"),
+    **dict.fromkeys((
+        "Marketplace", "TabelaMarketplaces", "DEFAULT_MARKETPLACES",
+        "calcular_preco_venda", "calcular_preco_venda_faixas", "carregar_marketplaces",
+        "comparar_marketplaces", "melhores_marketplaces", "varrer_marketplaces", "avaliar_preco_alvo",
+        "margem_para_preco_venda", "custo_maximo_para_preco_venda",
+    ), "marketplace"),
+    **dict.fromkeys((
+        "ARQUIVO_BANCO", "salvar_orcamento", "consultar_historico", "contar_historico",
+        "listar_filamentos_historico", "carregar_historico", "versao_historico",
+        "DIMENSOES_RESUMO", "consultar_resumo", "reconstruir_resumos",
+    ), "historico"),
+}
+
+__all__ = sorted(_EXPORTACOES)
+
+
+def __getattr__(nome: str):
+    try:
+        submodulo = _EXPORTACOES[nome]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}") from None
+    valor = getattr(importlib.import_module(f"{__name__}.{submodulo}"), nome)
+    globals()[nome] = valor   # próximos acessos não passam mais por aqui
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,101 @@
+"""
+Primitivas de gravação segura em arquivos compartilhados entre sessões.
+
+- trava_arquivo: trava entre processos (e threads) via arquivo .lock
+- gravar_atomico: grava em arquivo temporário e troca com os.replace, de
+  modo que leitores nunca veem um arquivo pela metade
+- anexar_registro / ler_registros: log de escrita antecipada (write-ahead
+  log) em JSON Lines; cada alteração é um append pequeno em vez de
+  reescrever o arquivo inteiro
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def trava_arquivo(arquivo: str, exclusiva: bool = True) -> Iterator[None]:
+    """
+    Trava `arquivo` usando o arquivo auxiliar `<arquivo>.lock`.
+
+    Args:
+        arquivo: Arquivo protegido
+        exclusiva: True para escrita; False para leitura (trava compartilhada,
+            ignorada no Windows, onde toda trava é exclusiva)
+    """
+    with open(arquivo + ".lock", "a+b") as trava:
+        if fcntl is not None:
+            fcntl.flock(trava.fileno(), fcntl.LOCK_EX if exclusiva else fcntl.LOCK_SH)
+        else:
+            trava.seek(0)
+            msvcrt.locking(trava.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(trava.fileno(), fcntl.LOCK_UN)
+            else:
+                trava.seek(0)
+                msvcrt.locking(trava.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def gravar_atomico(arquivo: str, conteudo: str) -> None:
+    """Grava `conteudo` em `arquivo` de forma atômica (temporário + os.replace)."""
+    diretorio = os.path.dirname(os.path.abspath(arquivo))
+    fd, temporario = tempfile.mkstemp(dir=diretorio, prefix=".tmp-", suffix=os.path.basename(arquivo))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporario, arquivo)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def anexar_registro(arquivo_log: str, registro: Dict) -> None:
+    """
+    Acrescenta um registro ao log.
+
+    Deve ser chamado com a trava do arquivo principal já adquirida. A linha é
+    gravada com uma única chamada write em modo append e sincronizada em disco.
+    """
+    linha = (json.dumps(registro, ensure_ascii=False) + "\n").encode("utf-8")
+    fd = os.open(arquivo_log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, linha)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def ler_registros(arquivo_log: str) -> List[Dict]:
+    """
+    Lê os registros do log, ignorando uma última linha incompleta
+    (gravação interrompida no meio).
+    """
+    try:
+        with open(arquivo_log, "r", encoding="utf-8") as f:
+            linhas = f.readlines()
+    except FileNotFoundError:
+        return []
+
+    registros = []
+    for linha in linhas:
+        if not linha.endswith("\n"):
+            break
+        try:
+            registros.append(json.loads(linha))
+        except json.JSONDecodeError:
+            continue
+    return registros
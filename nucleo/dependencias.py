@@ -0,0 +1,37 @@
+"""
+Importação preguiçosa das dependências pesadas (NumPy, pandas).
+
+O núcleo só precisa delas nos cálculos em lote e nas tabelas; o cálculo de
+um único orçamento é aritmética pura. Com importar_preguicoso o módulo é
+registrado de imediato, mas só é de fato carregado no primeiro acesso a um
+atributo, então importar o núcleo (CLI, workers) não paga o custo de
+carregar NumPy e pandas.
+"""
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def importar_preguicoso(nome: str) -> ModuleType:
+    """
+    Retorna o módulo `nome`, carregado só no primeiro uso (importlib.util.LazyLoader).
+
+    Se o módulo já foi importado, retorna o próprio módulo.
+    """
+    if nome in sys.modules:
+        return sys.modules[nome]
+    especificacao = importlib.util.find_spec(nome)
+    if especificacao is None:
+        raise ModuleNotFoundError(f"No module named '{nome}'", name=nome)
+    carregador = importlib.util.LazyLoader(especificacao.loader)
+    especificacao.loader = carregador
+    modulo = importlib.util.module_from_spec(especificacao)
+    sys.modules[nome] = modulo
+    carregador.exec_module(modulo)
+    return modulo
+
+
+def carregado(nome: str) -> bool:
+    """Indica se o módulo já foi de fato carregado (e não apenas registrado)."""
+    modulo = sys.modules.get(nome)
+    return modulo is not None and not isinstance(modulo, importlib.util._LazyModule)
@@ -0,0 +1,368 @@
+"""
+Histórico de orçamentos em um banco SQLite embutido.
+
+Substitui o antigo historico_orcamentos.csv, que era relido por inteiro a
+cada exibição. As consultas são paginadas e filtradas por data, projeto e
+filamento usando índices, então o tempo de carregamento da página não cresce
+com o tamanho do histórico. O CSV antigo é importado automaticamente na
+primeira abertura do banco (historico_orcamentos.csv -> historico_orcamentos.db).
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from typing import Dict, Optional
+
+from .dependencias import importar_preguicoso
+
+pd = importar_preguicoso("pandas")
+
+ARQUIVO_BANCO = "historico_orcamentos.db"
+VERSAO_ESQUEMA = 1   # PRAGMA user_version do banco com o esquema atual
+
+# Coluna exibida -> (coluna no banco, chave em dados_impressao)
+COLUNAS = {
+    'Data': ('data', None),
+    'Projeto': ('projeto', None),
+    'Filamento': ('filamento', 'Filamento'),
+    'Metros': ('metros', 'Metros Usados'),
+    'Peso (g)': ('peso_g', 'Peso Usado (g)'),
+    'Tempo (min)': ('tempo_min', 'Tempo (min)'),
+    'Custo Material': ('custo_material', 'Custo do Material'),
+    'Custo Energia': ('custo_energia', 'Custo de Energia'),
+    'Custo Manutenção': ('custo_manutencao', 'Custo de Manutenção'),
+    'Custo Falhas': ('custo_falhas', 'Custo para Falhas'),
+    'Custo Total': ('custo_total', 'Custo Total'),
+    'Preço Final': ('preco_final', 'Preço Final'),
+}
+_COLUNAS_BANCO = [banco for banco, _ in COLUNAS.values()]
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS orcamentos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    data TEXT NOT NULL,
+    projeto TEXT NOT NULL COLLATE NOCASE,
+    filamento TEXT NOT NULL,
+    metros REAL, peso_g REAL, tempo_min REAL,
+    custo_material REAL, custo_energia REAL, custo_manutencao REAL,
+    custo_falhas REAL, custo_total REAL, preco_final REAL
+);
+CREATE INDEX IF NOT EXISTS idx_orcamentos_data ON orcamentos (data);
+CREATE INDEX IF NOT EXISTS idx_orcamentos_projeto ON orcamentos (projeto COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_orcamentos_filamento ON orcamentos (filamento);
+CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT);
+"""
+
+# Resumos (agregados materializados) por dimensão: dimensão -> (expressão
+# sobre orcamentos, colação da chave, rótulo exibido). Cada salvar_orcamento
+# soma o novo orçamento em uma linha de cada resumo, então os painéis leem
+# poucas linhas já agregadas em vez de agrupar o histórico inteiro.
+DIMENSOES_RESUMO = {
+    'dia': ("substr(data, 1, 10)", "", 'Dia'),
+    'mes': ("substr(data, 1, 7)", "", 'Mês'),
+    'filamento': ("filamento", "", 'Filamento'),
+    'projeto': ("projeto", " COLLATE NOCASE", 'Projeto'),
+}
+
+# Coluna do resumo -> (coluna somada em orcamentos, rótulo exibido)
+_MEDIDAS_RESUMO = {
+    'receita': ('preco_final', 'Receita (R$)'),
+    'custo_total': ('custo_total', 'Custo (R$)'),
+    'custo_material': ('custo_material', 'Custo Material (R$)'),
+    'custo_energia': ('custo_energia', 'Custo Energia (R$)'),
+    'custo_manutencao': ('custo_manutencao', 'Custo Manutenção (R$)'),
+    'custo_falhas': ('custo_falhas', 'Custo Falhas (R$)'),
+    'metros': ('metros', 'Metros'),
+    'peso_g': ('peso_g', 'Peso (g)'),
+    'tempo_min': ('tempo_min', 'Tempo (min)'),
+}
+
+_ESQUEMA_RESUMOS = "".join(
+    f"""
+CREATE TABLE IF NOT EXISTS resumo_{dimensao} (
+    chave TEXT PRIMARY KEY{colacao},
+    orcamentos INTEGER NOT NULL,
+    {', '.join(f'{medida} REAL NOT NULL' for medida in _MEDIDAS_RESUMO)}
+);"""
+    for dimensao, (_, colacao, _) in DIMENSOES_RESUMO.items()
+)
+
+# Upsert de um orçamento em cada resumo (montado uma vez)
+_SOMAR_RESUMO = {
+    dimensao: (
+        f"INSERT INTO resumo_{dimensao} (chave, orcamentos, {', '.join(_MEDIDAS_RESUMO)}) "
+        f"VALUES (?, 1, {', '.join('?' * len(_MEDIDAS_RESUMO))}) "
+        f"ON CONFLICT (chave) DO UPDATE SET orcamentos = orcamentos + 1, "
+        + ", ".join(f"{medida} = {medida} + excluded.{medida}" for medida in _MEDIDAS_RESUMO)
+    )
+    for dimensao in DIMENSOES_RESUMO
+}
+
+
+def conectar(arquivo: str = ARQUIVO_BANCO) -> sqlite3.Connection:
+    """Abre o banco, criando o esquema e migrando o CSV antigo (mesmo nome, .csv) se houver."""
+    conexao = sqlite3.connect(arquivo, timeout=30)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    if conexao.execute("PRAGMA user_version").fetchone()[0] < VERSAO_ESQUEMA:
+        _preparar_esquema(conexao)
+    migrar_csv(conexao, os.path.splitext(arquivo)[0] + ".csv")
+    return conexao
+
+
+def _preparar_esquema(conexao: sqlite3.Connection) -> None:
+    """
+    Cria o esquema (marcado em user_version) e agrega os resumos de bancos
+    anteriores a eles. Roda com o banco travado para escrita (BEGIN
+    IMMEDIATE): sessões que abrem o banco ao mesmo tempo esperam a primeira
+    e, ao conferir user_version de novo, encontram tudo pronto.
+    """
+    with conexao:
+        conexao.execute("BEGIN IMMEDIATE")
+        if conexao.execute("PRAGMA user_version").fetchone()[0] >= VERSAO_ESQUEMA:
+            return
+        # Comando a comando: executescript faria COMMIT e soltaria a trava
+        for comando in (_ESQUEMA + _ESQUEMA_RESUMOS).split(";"):
+            if comando.strip():
+                conexao.execute(comando)
+        _reconstruir_resumos(conexao)
+        conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+
+
+def versao_historico(arquivo: str = ARQUIVO_BANCO) -> tuple:
+    """
+    Versão do banco: muda a cada gravação (mtime e tamanho do banco e do
+    arquivo -wal). Serve de chave para caches de consultas ao histórico.
+    """
+    versao = []
+    for caminho in (arquivo, arquivo + "-wal"):
+        try:
+            info = os.stat(caminho)
+        except FileNotFoundError:
+            versao.append(None)
+        else:
+            versao.append((info.st_mtime_ns, info.st_size))
+    return tuple(versao)
+
+
+def migrar_csv(conexao: sqlite3.Connection, arquivo_csv: str) -> int:
+    """
+    Importa o histórico do CSV antigo uma única vez.
+
+    A verificação e a importação acontecem na mesma transação de escrita
+    (BEGIN IMMEDIATE): se duas sessões abrirem o banco ao mesmo tempo, só a
+    primeira importa e a outra encontra a marca de migração já gravada.
+
+    Returns:
+        Número de orçamentos importados (0 se já migrado ou sem CSV)
+    """
+    if not os.path.isfile(arquivo_csv):
+        return 0
+    # Verificação rápida, sem travar o banco, para o caso comum (já migrado)
+    if conexao.execute("SELECT 1 FROM meta WHERE chave = 'migrado_csv'").fetchone():
+        return 0
+    with conexao:
+        conexao.execute("BEGIN IMMEDIATE")
+        if conexao.execute("SELECT 1 FROM meta WHERE chave = 'migrado_csv'").fetchone():
+            return 0
+        df = pd.read_csv(arquivo_csv)
+        df = df.reindex(columns=list(COLUNAS)).rename(
+            columns={exibida: banco for exibida, (banco, _) in COLUNAS.items()}
+        )
+        df['filamento'] = df['filamento'].fillna('Não especificado')
+        df = df.astype(object).where(df.notna(), None)
+        conexao.executemany(
+            f"INSERT INTO orcamentos ({', '.join(_COLUNAS_BANCO)}) "
+            f"VALUES ({', '.join('?' * len(_COLUNAS_BANCO))})",
+            df[_COLUNAS_BANCO].itertuples(index=False, name=None)
+        )
+        conexao.execute(
+            "INSERT INTO meta (chave, valor) VALUES ('migrado_csv', ?)",
+            (datetime.now().isoformat(timespec="seconds"),)
+        )
+        # Os orçamentos importados entram nos resumos na mesma transação
+        _reconstruir_resumos(conexao)
+    return len(df)
+
+
+def _linha_orcamento(dados_impressao: Dict, nome_projeto: str) -> tuple:
+    valores = {
+        'data': datetime.now().strftime("%Y-%m-%d"),
+        'projeto': nome_projeto,
+    }
+    for banco, chave in COLUNAS.values():
+        if chave is not None:
+            padrao = 'Não especificado' if banco == 'filamento' else 0
+            valores[banco] = dados_impressao.get(chave, padrao)
+    return tuple(valores[c] for c in _COLUNAS_BANCO)
+
+
+def salvar_orcamento(dados_impressao: Dict, nome_projeto: str,
+                     arquivo: str = ARQUIVO_BANCO) -> bool:
+    """Salva os dados de um orçamento no histórico (e o soma nos resumos, na mesma transação)."""
+    linha = _linha_orcamento(dados_impressao, nome_projeto)
+    with closing(conectar(arquivo)) as conexao, conexao:
+        conexao.execute(
+            f"INSERT INTO orcamentos ({', '.join(_COLUNAS_BANCO)}) "
+            f"VALUES ({', '.join('?' * len(_COLUNAS_BANCO))})",
+            linha
+        )
+        _somar_nos_resumos(conexao, dict(zip(_COLUNAS_BANCO, linha)))
+    return True
+
+
+def _somar_nos_resumos(conexao: sqlite3.Connection, orcamento: Dict) -> None:
+    """Atualiza uma linha de cada resumo com um orçamento novo (upsert)."""
+    data = str(orcamento['data'])
+    valores = [float(orcamento[coluna] or 0) for coluna, _ in _MEDIDAS_RESUMO.values()]
+    for dimensao, chave in (('dia', data[:10]), ('mes', data[:7]),
+                            ('filamento', orcamento['filamento']), ('projeto', orcamento['projeto'])):
+        conexao.execute(_SOMAR_RESUMO[dimensao], [chave, *valores])
+
+
+def _reconstruir_resumos(conexao: sqlite3.Connection) -> None:
+    """Refaz os resumos dentro da transação de quem chama (sem commit)."""
+    medidas = ', '.join(_MEDIDAS_RESUMO)
+    somas = ', '.join(f"COALESCE(SUM({coluna}), 0)" for coluna, _ in _MEDIDAS_RESUMO.values())
+    for dimensao, (expressao, _, _) in DIMENSOES_RESUMO.items():
+        conexao.execute(f"DELETE FROM resumo_{dimensao}")
+        conexao.execute(
+            f"INSERT INTO resumo_{dimensao} (chave, orcamentos, {medidas}) "
+            f"SELECT {expressao}, COUNT(*), {somas} FROM orcamentos GROUP BY {expressao}"
+        )
+
+
+def reconstruir_resumos(arquivo: str = ARQUIVO_BANCO) -> int:
+    """
+    Refaz todos os resumos a partir dos orçamentos (após importações em
+    massa ou edições diretas no banco).
+
+    Returns:
+        Número de orçamentos agregados
+    """
+    with closing(conectar(arquivo)) as conexao:
+        with conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            _reconstruir_resumos(conexao)
+        return conexao.execute("SELECT COUNT(*) FROM orcamentos").fetchone()[0]
+
+
+def consultar_resumo(dimensao: str,
+                     inicio: Optional[str] = None,
+                     fim: Optional[str] = None,
+                     limite: Optional[int] = None,
+                     ordenar_por: Optional[str] = None,
+                     arquivo: str = ARQUIVO_BANCO) -> pd.DataFrame:
+    """
+    Lê um resumo já agregado: receita, custos, lucro, margem e material.
+
+    Args:
+        dimensao: 'dia', 'mes', 'filamento' ou 'projeto'
+        inicio / fim: Faixa de chaves (inclusiva), ex.: '2024-01' a '2024-06' no resumo por mês
+        limite: Número máximo de linhas
+        ordenar_por: Coluna do resumo em ordem decrescente (ex.: 'receita');
+            padrão: pela chave
+
+    Returns:
+        DataFrame com uma linha por chave da dimensão
+
+    Raises:
+        ValueError: Para dimensão ou coluna de ordenação desconhecida
+    """
+    if dimensao not in DIMENSOES_RESUMO:
+        raise ValueError(f"Dimensão desconhecida: {dimensao} (use {', '.join(DIMENSOES_RESUMO)})")
+    if ordenar_por is not None and ordenar_por not in ('orcamentos', *_MEDIDAS_RESUMO):
+        raise ValueError(f"Coluna desconhecida para ordenar: {ordenar_por}")
+
+    condicoes, parametros = [], []
+    if inicio:
+        condicoes.append("chave >= ?")
+        parametros.append(str(inicio))
+    if fim:
+        condicoes.append("chave <= ?")
+        parametros.append(str(fim))
+    consulta = (f"SELECT chave, orcamentos, {', '.join(_MEDIDAS_RESUMO)} FROM resumo_{dimensao} "
+                f"{'WHERE ' + ' AND '.join(condicoes) if condicoes else ''} "
+                f"ORDER BY {f'{ordenar_por} DESC' if ordenar_por else 'chave'}")
+    if limite is not None:
+        consulta += " LIMIT ?"
+        parametros.append(limite)
+
+    with closing(conectar(arquivo)) as conexao:
+        df = pd.read_sql_query(consulta, conexao, params=parametros)
+    df = df.rename(columns={'chave': DIMENSOES_RESUMO[dimensao][2], 'orcamentos': 'Orçamentos',
+                            **{medida: rotulo for medida, (_, rotulo) in _MEDIDAS_RESUMO.items()}})
+    df['Lucro (R$)'] = df['Receita (R$)'] - df['Custo (R$)']
+    df['Margem (%)'] = (df['Lucro (R$)'] / df['Custo (R$)'].where(df['Custo (R$)'] != 0) * 100).fillna(0.0)
+    return df
+
+
+def _filtros(data_inicio: Optional[str], data_fim: Optional[str],
+             projeto: Optional[str], filamento: Optional[str]):
+    condicoes, parametros = [], []
+    if data_inicio:
+        condicoes.append("data >= ?")
+        parametros.append(str(data_inicio))
+    if data_fim:
+        condicoes.append("data <= ?")
+        parametros.append(str(data_fim))
+    if projeto:
+        # Prefixo com LIKE aproveita o índice NOCASE de projeto
+        condicoes.append("projeto LIKE ? ESCAPE '\\'")
+        parametros.append(projeto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+    if filamento:
+        condicoes.append("filamento = ?")
+        parametros.append(filamento)
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    return where, parametros
+
+
+def consultar_historico(pagina: int = 1,
+                        por_pagina: int = 50,
+                        data_inicio: Optional[str] = None,
+                        data_fim: Optional[str] = None,
+                        projeto: Optional[str] = None,
+                        filamento: Optional[str] = None,
+                        arquivo: str = ARQUIVO_BANCO) -> pd.DataFrame:
+    """
+    Retorna uma página do histórico, do orçamento mais recente ao mais antigo.
+
+    Args:
+        pagina: Número da página (começando em 1)
+        por_pagina: Orçamentos por página; None retorna todos
+        data_inicio / data_fim: Datas no formato AAAA-MM-DD (inclusivas)
+        projeto: Início do nome do projeto (sem diferenciar maiúsculas)
+        filamento: Nome exato do filamento
+    """
+    where, parametros = _filtros(data_inicio, data_fim, projeto, filamento)
+    consulta = f"SELECT {', '.join(_COLUNAS_BANCO)} FROM orcamentos {where} ORDER BY id DESC"
+    if por_pagina is not None:
+        consulta += " LIMIT ? OFFSET ?"
+        parametros += [por_pagina, (max(pagina, 1) - 1) * por_pagina]
+
+    with closing(conectar(arquivo)) as conexao:
+        df = pd.read_sql_query(consulta, conexao, params=parametros)
+    return df.rename(columns={banco: exibida for exibida, (banco, _) in COLUNAS.items()})
+
+
+def contar_historico(data_inicio: Optional[str] = None,
+                     data_fim: Optional[str] = None,
+                     projeto: Optional[str] = None,
+                     filamento: Optional[str] = None,
+                     arquivo: str = ARQUIVO_BANCO) -> int:
+    """Conta os orçamentos que atendem aos filtros."""
+    where, parametros = _filtros(data_inicio, data_fim, projeto, filamento)
+    with closing(conectar(arquivo)) as conexao:
+        return conexao.execute(f"SELECT COUNT(*) FROM orcamentos {where}", parametros).fetchone()[0]
+
+
+def listar_filamentos_historico(arquivo: str = ARQUIVO_BANCO) -> list:
+    """Lista os filamentos distintos presentes no histórico (via índice)."""
+    with closing(conectar(arquivo)) as conexao:
+        return [f for (f,) in conexao.execute("SELECT DISTINCT filamento FROM orcamentos ORDER BY filamento")]
+
+
+def carregar_historico(arquivo: str = ARQUIVO_BANCO) -> pd.DataFrame:
+    """Carrega o histórico completo de orçamentos salvos, em ordem cronológica."""
+    return consultar_historico(por_pagina=None, arquivo=arquivo).iloc[::-1].reset_index(drop=True)
@@ -0,0 +1,529 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+from .dependencias import importar_preguicoso
+
+np = importar_preguicoso("numpy")
+pd = importar_preguicoso("pandas")
+
+ARQUIVO_MARKETPLACES = "marketplaces.json"
+# Tipos calculados direto em Python, sem passar por NumPy
+_NUMEROS = frozenset((int, float))
+
+def _calcular_venda(preco_custo, comissao, taxa_fixa, nota_fiscal, embalagem, margem_lucro, outras_taxas):
+    """Fórmula do preço de venda; funciona com floats ou arrays NumPy."""
+    # Calcula o lucro desejado (percentual do preço de custo)
+    lucro_desejado = preco_custo * (margem_lucro / 100)
+
+    # Soma dos percentuais que incidem sobre o preço de venda
+    total_percentual = comissao + nota_fiscal + outras_taxas
+
+    # Calcula o preço de venda usando a equação:
+    # Preço de Venda = (Custo + Lucro Desejado + Taxa Fixa + Embalagem) / (1 - (Comissão + Nota Fiscal + Outras Taxas)/100)
+    preco_venda = (preco_custo + lucro_desejado + taxa_fixa + embalagem) / (1 - (total_percentual / 100))
+
+    # Cálculo dos valores individuais com base no preço de venda
+    comissao_valor = preco_venda * (comissao / 100)
+    nota_fiscal_valor = preco_venda * (nota_fiscal / 100)
+    outras_taxas_valor = preco_venda * (outras_taxas / 100)
+
+    # O lucro efetivo é o lucro desejado (definido como percentual sobre o custo)
+    lucro = lucro_desejado
+
+    # Valor líquido que o vendedor recebe
+    recebe = preco_venda - comissao_valor - taxa_fixa - nota_fiscal_valor - embalagem - outras_taxas_valor
+
+    return preco_venda, comissao_valor, taxa_fixa, nota_fiscal_valor, embalagem, outras_taxas_valor, lucro, recebe
+
+def calcular_preco_venda(preco_custo, comissao, taxa_fixa, nota_fiscal, embalagem, margem_lucro, outras_taxas=0):
+    """
+    Calcula o preço de venda em um marketplace.
+
+    Aceita escalares ou arrays NumPy (um valor por produto/plataforma, com
+    broadcasting). Onde a soma dos percentuais chega a 100% todos os valores
+    retornados são zero.
+
+    Returns:
+        Tupla (preço de venda, comissão, taxa fixa, nota fiscal, embalagem,
+        outras taxas, lucro, valor líquido recebido)
+    """
+    total_percentual = comissao + nota_fiscal + outras_taxas
+
+    # Números Python seguem sem NumPy (não o carrega para um único orçamento)
+    if {type(total_percentual), type(preco_custo), type(taxa_fixa), type(embalagem), type(margem_lucro)} <= _NUMEROS or (
+            np.ndim(total_percentual) == 0
+            and all(np.ndim(v) == 0 for v in (preco_custo, taxa_fixa, embalagem, margem_lucro))):
+        # Evitar divisão por zero ou porcentagens inválidas
+        if total_percentual >= 100:
+            return 0, 0, 0, 0, 0, 0, 0, 0
+        return _calcular_venda(preco_custo, comissao, taxa_fixa, nota_fiscal, embalagem, margem_lucro, outras_taxas)
+
+    validos = np.asarray(total_percentual) < 100
+    # Onde inválido, zera os percentuais só para evitar a divisão por zero
+    resultados = _calcular_venda(
+        np.asarray(preco_custo, dtype=float),
+        np.where(validos, comissao, 0.0),
+        np.asarray(taxa_fixa, dtype=float),
+        np.where(validos, nota_fiscal, 0.0),
+        np.asarray(embalagem, dtype=float),
+        np.asarray(margem_lucro, dtype=float),
+        np.where(validos, outras_taxas, 0.0),
+    )
+    forma = np.broadcast_shapes(*(np.shape(v) for v in resultados))
+    return tuple(np.where(validos, np.broadcast_to(v, forma), 0.0) for v in resultados)
+
+# Menor incremento de preço: usado para ficar logo acima do limite de uma faixa
+CENTAVO = 0.01
+
+def resolver_faixas(necessario, percentual, limites, valores) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Menor preço de venda cujo valor líquido cobre `necessario` quando a taxa
+    fixa depende do próprio preço (faixas "preço até limite -> taxa").
+
+    Em cada faixa o preço tem solução fechada, (necessario + taxa) / (1 - percentual/100).
+    Ela vale se cair dentro da faixa; se cair abaixo, o menor preço da faixa
+    (um centavo acima do limite anterior) também cobre o necessário, pois o
+    líquido cresce com o preço. Entre as faixas viáveis fica o menor preço.
+    Tudo é calculado de uma vez para arrays de produtos e plataformas.
+
+    Args:
+        necessario: Custo + lucro + embalagem + fretes extras, forma (..., P)
+        percentual: Soma dos percentuais sobre a venda (< 100), forma (..., P)
+        limites / valores: Faixas de cada plataforma, forma (P, B), limites
+            crescentes e o último infinito
+
+    Returns:
+        Tupla (preço de venda, taxa fixa da faixa escolhida), forma (..., P)
+    """
+    necessario = np.asarray(necessario, dtype=float)[..., None]
+    fator = (1 - np.asarray(percentual, dtype=float) / 100)[..., None]
+    inicio = np.concatenate([np.full(limites.shape[:-1] + (1,), -np.inf), limites[..., :-1]], axis=-1)
+
+    candidatos = (necessario + valores) / fator
+    candidatos = np.maximum(candidatos, np.where(np.isfinite(inicio), inicio + CENTAVO, -np.inf))
+    viaveis = candidatos <= limites
+    candidatos = np.where(viaveis, candidatos, np.inf)
+    faixa = np.argmin(candidatos, axis=-1)[..., None]
+
+    preco = np.take_along_axis(candidatos, faixa, axis=-1)[..., 0]
+    taxa = np.take_along_axis(np.broadcast_to(valores, candidatos.shape), faixa, axis=-1)[..., 0]
+    return preco, taxa
+
+def _decompor_venda(preco_venda, preco_custo, comissao, taxa_fixa, nota_fiscal, embalagem, outras_taxas):
+    """Valores individuais para um preço de venda já definido (mesma ordem de calcular_preco_venda)."""
+    comissao_valor = preco_venda * (comissao / 100)
+    nota_fiscal_valor = preco_venda * (nota_fiscal / 100)
+    outras_taxas_valor = preco_venda * (outras_taxas / 100)
+    recebe = preco_venda - comissao_valor - taxa_fixa - nota_fiscal_valor - embalagem - outras_taxas_valor
+    # Igual ao lucro desejado, ou maior quando o preço foi levado ao início de uma faixa
+    lucro = recebe - preco_custo
+    return preco_venda, comissao_valor, taxa_fixa, nota_fiscal_valor, embalagem, outras_taxas_valor, lucro, recebe
+
+def calcular_preco_venda_faixas(preco_custo, comissao, faixas_taxa_fixa, nota_fiscal, embalagem,
+                                margem_lucro, outras_taxas=0):
+    """
+    Calcula o preço de venda quando a taxa fixa varia com o preço final.
+
+    Args:
+        faixas_taxa_fixa: Sequência de (preço até, taxa R$) em ordem crescente;
+            a última faixa deve ter limite infinito
+
+    Returns:
+        Mesma tupla de calcular_preco_venda (escalares ou arrays)
+    """
+    limites, valores = (np.array(v, dtype=float)[None, :] for v in zip(*faixas_taxa_fixa))
+    total_percentual = np.asarray(comissao + nota_fiscal + outras_taxas, dtype=float)
+    validos = total_percentual < 100
+    lucro_desejado = np.asarray(preco_custo, dtype=float) * (np.asarray(margem_lucro, dtype=float) / 100)
+    necessario = np.asarray(preco_custo + lucro_desejado + embalagem, dtype=float)
+
+    forma = np.broadcast_shapes(necessario.shape, total_percentual.shape)
+    preco, taxa = resolver_faixas(np.broadcast_to(necessario, forma).reshape(-1),
+                                  np.broadcast_to(np.where(validos, total_percentual, 0.0), forma).reshape(-1),
+                                  limites, valores)
+    resultado = _decompor_venda(preco.reshape(forma), preco_custo, comissao, taxa.reshape(forma),
+                                nota_fiscal, embalagem, outras_taxas)
+    resultado = tuple(np.where(validos, np.broadcast_to(v, forma), 0.0) for v in resultado)
+    if not forma:
+        return tuple(float(v) for v in resultado)
+    return resultado
+
+def _liquido(preco_venda, comissao, taxa_fixa, nota_fiscal, embalagem, outras_taxas):
+    """Valor líquido recebido para um preço de venda (inverso de _calcular_venda)."""
+    return preco_venda * (1 - (comissao + nota_fiscal + outras_taxas) / 100) - taxa_fixa - embalagem
+
+def margem_para_preco_venda(preco_venda, preco_custo, comissao, taxa_fixa, nota_fiscal, embalagem, outras_taxas=0):
+    """
+    Margem de lucro (%) sobre o custo obtida vendendo ao preço dado.
+
+    Aceita escalares ou arrays (ex.: milhares de preços de prateleira).
+
+    Returns:
+        Margem em porcentagem (negativa se o preço não cobre custo e taxas)
+    """
+    recebe = _liquido(np.asarray(preco_venda, dtype=float), comissao, taxa_fixa, nota_fiscal, embalagem, outras_taxas)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margem = (recebe / np.asarray(preco_custo, dtype=float) - 1) * 100
+    return margem[()] if np.ndim(margem) == 0 else margem
+
+def custo_maximo_para_preco_venda(preco_venda, margem_lucro, comissao, taxa_fixa, nota_fiscal, embalagem, outras_taxas=0):
+    """
+    Maior preço de custo que ainda rende `margem_lucro` (%) vendendo ao preço dado.
+
+    Returns:
+        Custo máximo em R$ (0 quando as taxas consomem todo o preço)
+    """
+    recebe = _liquido(np.asarray(preco_venda, dtype=float), comissao, taxa_fixa, nota_fiscal, embalagem, outras_taxas)
+    custo = np.maximum(recebe / (1 + np.asarray(margem_lucro, dtype=float) / 100), 0.0)
+    return custo[()] if np.ndim(custo) == 0 else custo
+
+@dataclass(frozen=True)
+class Marketplace:
+    """Regras de taxas de uma plataforma de venda."""
+    nome: str
+    comissao: float                                   # comissão padrão (%)
+    comissoes_categoria: Dict[str, float] = field(default_factory=dict)
+    faixas_taxa_fixa: Tuple[Tuple[float, float], ...] = ((float("inf"), 0.0),)  # (preço até, taxa R$)
+    adicionais: Dict[str, float] = field(default_factory=dict)  # taxas percentuais extras
+    taxas_peso: Dict[str, float] = field(default_factory=dict)  # frete extra (R$) por classe de peso
+
+    def comissao_categoria(self, categoria: Optional[str] = None) -> float:
+        """Comissão (%) da categoria, ou a padrão se a categoria não tiver regra própria."""
+        return self.comissoes_categoria.get(categoria, self.comissao)
+
+    @property
+    def total_adicionais(self) -> float:
+        return sum(self.adicionais.values())
+
+    def taxa_fixa(self, preco_venda: float = 0.0) -> float:
+        """Taxa fixa (R$) cobrada para um preço de venda."""
+        for limite, valor in self.faixas_taxa_fixa:
+            if preco_venda <= limite:
+                return valor
+        return self.faixas_taxa_fixa[-1][1]
+
+def _validar_faixas(nome: str, faixas: Tuple[Tuple[float, float], ...]) -> None:
+    """Exige limites estritamente crescentes e a última faixa aberta (sem "ate"), como resolver_faixas supõe."""
+    if not faixas:
+        raise ValueError(f"{nome}: informe ao menos uma faixa de taxa fixa")
+    limites = [limite for limite, _ in faixas]
+    if any(atual <= anterior for anterior, atual in zip(limites, limites[1:])):
+        raise ValueError(f"{nome}: os limites das faixas de taxa fixa devem ser estritamente crescentes ({limites})")
+    if limites[-1] != float("inf"):
+        raise ValueError(f"{nome}: a última faixa de taxa fixa deve ser aberta (sem \"ate\"), não até R$ {limites[-1]:.2f}")
+
+def _marketplace_de_dict(nome: str, dados: Dict) -> Marketplace:
+    taxa = dados.get("taxa_fixa", 0.0)
+    if isinstance(taxa, (int, float)):
+        faixas = ((float("inf"), float(taxa)),)
+    else:
+        # Lista de faixas {"ate": preço, "valor": taxa}; a última pode omitir "ate"
+        faixas = tuple(
+            (float(f["ate"]) if f.get("ate") is not None else float("inf"), float(f["valor"]))
+            for f in taxa
+        )
+    _validar_faixas(nome, faixas)
+    return Marketplace(
+        nome=nome,
+        comissao=float(dados["comissao"]),
+        comissoes_categoria={c: float(v) for c, v in dados.get("comissoes_categoria", {}).items()},
+        faixas_taxa_fixa=faixas,
+        adicionais={n: float(v) for n, v in dados.get("adicionais", {}).items()},
+        taxas_peso={c: float(v) for c, v in dados.get("taxa_peso", {}).items()},
+    )
+
+# Registro padrão, usado quando marketplaces.json não existe
+DEFAULT_MARKETPLACES = {
+    "Shopee": Marketplace("Shopee", 20.0, faixas_taxa_fixa=((float("inf"), 4.0),)),
+    "Mercado Livre": Marketplace("Mercado Livre", 17.0, faixas_taxa_fixa=((float("inf"), 5.0),),
+                                 adicionais={"Taxa de Anúncio": 2.0}),
+    "TikTok Shop": Marketplace("TikTok Shop", 8.0, faixas_taxa_fixa=((float("inf"), 3.5),),
+                               adicionais={"Taxa de Promoção": 3.0}),
+    "Kawaii": Marketplace("Kawaii", 15.0, faixas_taxa_fixa=((float("inf"), 3.0),),
+                          adicionais={"Taxa da Plataforma": 2.5}),
+}
+
+def carregar_marketplaces(arquivo: str = ARQUIVO_MARKETPLACES) -> Dict[str, Marketplace]:
+    """Carrega o registro de marketplaces de um arquivo JSON."""
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+        return {nome: _marketplace_de_dict(nome, regras) for nome, regras in dados.items()}
+    except (FileNotFoundError, json.JSONDecodeError):
+        # Se o arquivo não existir ou estiver corrompido, retorna o registro padrão
+        return dict(DEFAULT_MARKETPLACES)
+
+class TabelaMarketplaces:
+    """
+    Registro de marketplaces em forma de arrays (uma linha por plataforma).
+
+    As faixas de taxa fixa viram matrizes (plataformas x faixas), completadas
+    com limite infinito, para que a taxa de todas as plataformas seja obtida
+    de uma vez para um array de preços.
+    """
+
+    def __init__(self, marketplaces: Mapping[str, Marketplace], categoria: Optional[str] = None):
+        lista = list(marketplaces.values())
+        self.nomes = [m.nome for m in lista]
+        self.comissao = np.array([m.comissao_categoria(categoria) for m in lista])
+        self.adicionais = np.array([m.total_adicionais for m in lista])
+        n_faixas = max(len(m.faixas_taxa_fixa) for m in lista)
+        self.limites = np.full((len(lista), n_faixas), np.inf)
+        self.valores = np.zeros((len(lista), n_faixas))
+        for i, m in enumerate(lista):
+            limites, valores = zip(*m.faixas_taxa_fixa)
+            self.limites[i, :len(limites)] = limites
+            self.valores[i, :len(valores)] = valores
+            self.valores[i, len(valores):] = valores[-1]
+        # Frete por classe de peso (plataformas x classes); a última coluna,
+        # zerada, atende produtos sem classe ou com classe desconhecida
+        self.classes_peso = sorted({c for m in lista for c in m.taxas_peso})
+        self._indice_classe = {c: j for j, c in enumerate(self.classes_peso)}
+        self.fretes_peso = np.zeros((len(lista), len(self.classes_peso) + 1))
+        for i, m in enumerate(lista):
+            for classe, valor in m.taxas_peso.items():
+                self.fretes_peso[i, self._indice_classe[classe]] = valor
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    def taxa_fixa(self, precos_venda: np.ndarray) -> np.ndarray:
+        """
+        Taxa fixa de cada plataforma para os preços dados.
+
+        `precos_venda` tem as plataformas no último eixo (forma (..., P)).
+        """
+        precos = np.asarray(precos_venda, dtype=float)[..., None]
+        faixa = (precos > self.limites).sum(axis=-1)
+        faixa = np.minimum(faixa, self.limites.shape[1] - 1)
+        return np.take_along_axis(np.broadcast_to(self.valores, faixa.shape + (self.valores.shape[1],)),
+                                  faixa[..., None], axis=-1)[..., 0]
+
+    def frete_peso(self, classes_peso) -> np.ndarray:
+        """
+        Frete extra (R$) de cada plataforma para um array de classes de peso.
+
+        Returns:
+            Matriz (produtos x plataformas)
+        """
+        sem_classe = len(self.classes_peso)
+        indices = np.fromiter((self._indice_classe.get(c, sem_classe) for c in classes_peso),
+                              dtype=np.intp)
+        return self.fretes_peso.T[indices]
+
+    def precificar(self, preco_custo, nota_fiscal, embalagem, margem_lucro,
+                   incluir_taxa_fixa: bool = True, frete_extra=0.0) -> Tuple[np.ndarray, ...]:
+        """
+        Calcula calcular_preco_venda para todas as plataformas de uma vez.
+
+        A taxa fixa de cada plataforma é a da faixa do preço final; o preço
+        consistente com ela é obtido por resolver_faixas, sem iterações.
+
+        Args:
+            incluir_taxa_fixa: Se False, desconsidera as taxas fixas das
+                faixas; o frete_extra continua sendo cobrado
+            frete_extra: Valor (R$) somado à taxa fixa, por exemplo o frete
+                por classe de peso (escalar ou forma (..., P))
+
+        Returns:
+            Mesma tupla de calcular_preco_venda, cada item com um valor por
+            plataforma (ou forma (..., P) se os argumentos forem arrays)
+        """
+        if not incluir_taxa_fixa:
+            return calcular_preco_venda(preco_custo, self.comissao, np.zeros(len(self)) + frete_extra,
+                                        nota_fiscal, embalagem, margem_lucro, self.adicionais)
+
+        preco_custo = np.asarray(preco_custo, dtype=float)
+        total_percentual = self.comissao + np.asarray(nota_fiscal, dtype=float) + self.adicionais
+        validos = total_percentual < 100
+        necessario = preco_custo * (1 + np.asarray(margem_lucro, dtype=float) / 100) + embalagem + frete_extra
+        forma = np.broadcast_shapes(np.shape(necessario), np.shape(total_percentual))
+
+        preco, taxa = resolver_faixas(np.broadcast_to(necessario, forma),
+                                      np.where(validos, total_percentual, 0.0),
+                                      self.limites, self.valores)
+        resultado = _decompor_venda(preco, preco_custo, self.comissao, taxa + frete_extra,
+                                    nota_fiscal, embalagem, self.adicionais)
+        return tuple(np.where(validos, np.broadcast_to(v, forma), 0.0) for v in resultado)
+
+    def liquido(self, precos_venda, nota_fiscal, embalagem, frete_extra=0.0) -> np.ndarray:
+        """
+        Valor líquido de cada plataforma vendendo aos preços dados, com a
+        taxa fixa da faixa de cada preço.
+
+        Returns:
+            Array de forma precos_venda.shape + (P,)
+        """
+        precos = np.broadcast_to(np.asarray(precos_venda, dtype=float)[..., None],
+                                 np.shape(precos_venda) + (len(self),))
+        return _liquido(precos, self.comissao, self.taxa_fixa(precos) + frete_extra,
+                        nota_fiscal, embalagem, self.adicionais)
+
+    def margens(self, precos_venda, preco_custo, nota_fiscal, embalagem) -> np.ndarray:
+        """Margem (%) sobre o custo em cada plataforma para os preços dados, forma (..., P)."""
+        custo = np.asarray(preco_custo, dtype=float)[..., None]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (self.liquido(precos_venda, nota_fiscal, embalagem) / custo - 1) * 100
+
+    def custos_maximos(self, precos_venda, margem_lucro, nota_fiscal, embalagem) -> np.ndarray:
+        """Maior custo (R$) que rende `margem_lucro` em cada plataforma, forma (..., P)."""
+        fator = 1 + np.asarray(margem_lucro, dtype=float)[..., None] / 100
+        return np.maximum(self.liquido(precos_venda, nota_fiscal, embalagem) / fator, 0.0)
+
+def avaliar_preco_alvo(preco_venda: float,
+                       preco_custo: float,
+                       nota_fiscal: float,
+                       embalagem: float,
+                       margem_lucro: float,
+                       marketplaces: Optional[Mapping[str, Marketplace]] = None,
+                       categoria: Optional[str] = None) -> pd.DataFrame:
+    """
+    Para um preço de venda fixo, a margem obtida em cada plataforma e o maior
+    custo que ainda rende `margem_lucro`.
+    """
+    tabela = TabelaMarketplaces(marketplaces or carregar_marketplaces(), categoria)
+    return pd.DataFrame({
+        'Plataforma': tabela.nomes,
+        'Valor Líquido (R$)': tabela.liquido(preco_venda, nota_fiscal, embalagem),
+        'Margem Obtida (%)': tabela.margens(preco_venda, preco_custo, nota_fiscal, embalagem),
+        'Custo Máximo (R$)': tabela.custos_maximos(preco_venda, margem_lucro, nota_fiscal, embalagem),
+    })
+
+def comparar_marketplaces(preco_custo: float,
+                          nota_fiscal: float,
+                          embalagem: float,
+                          margem_lucro: float,
+                          marketplaces: Optional[Mapping[str, Marketplace]] = None,
+                          categoria: Optional[str] = None,
+                          incluir_taxa_fixa: bool = True) -> pd.DataFrame:
+    """Tabela comparativa de um produto em todas as plataformas do registro."""
+    tabela = TabelaMarketplaces(marketplaces or carregar_marketplaces(), categoria)
+    preco_venda, comissao_valor, taxa_fixa, nota_fiscal_valor, embalagem_valor, outras_taxas_valor, lucro, recebe = \
+        tabela.precificar(preco_custo, nota_fiscal, embalagem, margem_lucro, incluir_taxa_fixa)
+    n = len(tabela)
+    return pd.DataFrame({
+        'Plataforma': tabela.nomes,
+        'Preço de Venda (R$)': preco_venda,
+        'Comissão (R$)': comissao_valor,
+        'Nota Fiscal (R$)': nota_fiscal_valor,
+        'Taxas Adicionais (R$)': outras_taxas_valor,
+        'Frete (R$)': np.broadcast_to(taxa_fixa, (n,)),
+        'Embalagem (R$)': np.broadcast_to(embalagem_valor, (n,)),
+        'Lucro (R$)': np.broadcast_to(lucro, (n,)),
+        'Valor Líquido (R$)': recebe
+    })
+
+# Colunas da tabela de produtos aceitas por varrer_marketplaces
+COLUNAS_PRODUTOS = ("preco_custo", "embalagem", "classe_peso", "margem_lucro", "nota_fiscal")
+
+
+def _em_blocos(produtos: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+               tamanho_bloco: int) -> Iterator[pd.DataFrame]:
+    if isinstance(produtos, pd.DataFrame):
+        for inicio in range(0, len(produtos), tamanho_bloco):
+            yield produtos.iloc[inicio:inicio + tamanho_bloco]
+    else:
+        yield from produtos
+
+
+def melhores_marketplaces(tabela: TabelaMarketplaces,
+                          produtos: pd.DataFrame,
+                          nota_fiscal: float = 5.0,
+                          embalagem: float = 1.0,
+                          margem_lucro: float = 50.0,
+                          incluir_taxa_fixa: bool = True) -> pd.DataFrame:
+    """
+    Precifica um bloco de produtos em todas as plataformas (produtos x plataformas).
+
+    Como a margem é definida sobre o custo, o valor líquido recebido é o mesmo
+    em todas as plataformas; a melhor é a que chega a ele com o menor preço de
+    venda (a mais competitiva para o comprador).
+
+    Args:
+        tabela: Registro de marketplaces em forma de arrays
+        produtos: Coluna preco_custo e, opcionalmente, embalagem, classe_peso,
+            margem_lucro e nota_fiscal (os argumentos preenchem as ausentes)
+
+    Returns:
+        As colunas de `produtos` seguidas de melhor plataforma, preço, lucro,
+        valor líquido, preço em cada plataforma e posição de cada plataforma
+        no ranking (1 = menor preço)
+
+    Raises:
+        KeyError: Se `produtos` não tiver a coluna preco_custo
+    """
+    if "preco_custo" not in produtos:
+        raise KeyError("Coluna obrigatória ausente: preco_custo")
+
+    def coluna(nome, padrao):
+        if nome in produtos:
+            return produtos[nome].to_numpy(dtype=float)[:, None]
+        return padrao
+
+    if "classe_peso" in produtos:
+        frete_extra = tabela.frete_peso(produtos["classe_peso"].tolist())
+    else:
+        frete_extra = tabela.fretes_peso[:, -1]
+
+    preco_venda, _, _, _, _, _, lucro, recebe = tabela.precificar(
+        produtos["preco_custo"].to_numpy(dtype=float)[:, None],
+        coluna("nota_fiscal", nota_fiscal),
+        coluna("embalagem", embalagem),
+        coluna("margem_lucro", margem_lucro),
+        incluir_taxa_fixa,
+        frete_extra=frete_extra,
+    )
+    n, p = len(produtos), len(tabela)
+    preco_venda = np.broadcast_to(preco_venda, (n, p))
+    recebe = np.broadcast_to(recebe, (n, p))
+
+    # Preço zero indica percentuais inválidos: a plataforma vai para o fim do ranking
+    ordenacao = np.where(preco_venda > 0, preco_venda, np.inf)
+    ordem = np.argsort(ordenacao, axis=1, kind="stable")
+    posicoes = np.empty_like(ordem)
+    np.put_along_axis(posicoes, ordem, np.arange(1, p + 1)[None, :], axis=1)
+    melhor = ordem[:, 0]
+    linhas = np.arange(n)
+
+    resultado = {
+        'Melhor Plataforma': np.asarray(tabela.nomes, dtype=object)[melhor],
+        'Preço de Venda (R$)': preco_venda[linhas, melhor],
+        'Lucro (R$)': np.broadcast_to(lucro, (n, p))[linhas, melhor],
+        'Valor Líquido (R$)': recebe[linhas, melhor],
+    }
+    for j, nome in enumerate(tabela.nomes):
+        resultado[f'Preço {nome} (R$)'] = preco_venda[:, j]
+    for j, nome in enumerate(tabela.nomes):
+        resultado[f'Posição {nome}'] = posicoes[:, j]
+    return pd.concat([produtos.reset_index(drop=True), pd.DataFrame(resultado)], axis=1)
+
+
+def varrer_marketplaces(produtos: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                        nota_fiscal: float = 5.0,
+                        embalagem: float = 1.0,
+                        margem_lucro: float = 50.0,
+                        marketplaces: Optional[Mapping[str, Marketplace]] = None,
+                        categoria: Optional[str] = None,
+                        incluir_taxa_fixa: bool = True,
+                        tamanho_bloco: int = 50_000) -> Iterator[pd.DataFrame]:
+    """
+    Melhor marketplace de cada produto de um catálogo, em blocos.
+
+    Apenas um bloco de produtos x plataformas fica em memória por vez, então
+    catálogos de centenas de milhares de produtos podem ser processados e
+    gravados à medida que cada bloco é calculado.
+
+    Args:
+        produtos: DataFrame ou iterável de DataFrames (ex.: pd.read_csv com
+            chunksize) com as colunas de COLUNAS_PRODUTOS
+        tamanho_bloco: Produtos por bloco quando `produtos` é um DataFrame
+
+    Yields:
+        Um DataFrame por bloco, no formato de melhores_marketplaces
+    """
+    tabela = TabelaMarketplaces(marketplaces or carregar_marketplaces(), categoria)
+    for bloco in _em_blocos(produtos, tamanho_bloco):
+        yield melhores_marketplaces(tabela, bloco, nota_fiscal, embalagem, margem_lucro, incluir_taxa_fixa)
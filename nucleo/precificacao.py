@@ -0,0 +1,419 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Union
+import json
+import os
+from .armazenamento import anexar_registro, gravar_atomico, ler_registros, trava_arquivo
+from .dependencias import importar_preguicoso
+
+# Carregados só no primeiro uso: o cálculo unitário não depende deles
+np = importar_preguicoso("numpy")
+pd = importar_preguicoso("pandas")
+
+@dataclass(frozen=True, slots=True)
+class Filamento:
+    nome: str
+    marca: str
+    material: str
+    diametro: float
+    comprimento_total: int  # metros por kg
+    peso_total: float      # em kg
+    preco: float          # preço por kg
+    
+    # Valores derivados, calculados uma única vez na criação
+    peso_por_metro: float = field(init=False, repr=False, compare=False)
+    preco_por_metro: float = field(init=False, repr=False, compare=False)
+    preco_por_grama: float = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # A classe é imutável: os campos derivados são definidos via object.__setattr__
+        object.__setattr__(self, "peso_por_metro", (self.peso_total * 1000) / self.comprimento_total)
+        object.__setattr__(self, "preco_por_metro", self.preco / self.comprimento_total)
+        object.__setattr__(self, "preco_por_grama", self.preco / (self.peso_total * 1000))
+    
+    def calcular_peso_por_metro(self) -> float:
+        """Calcula o peso em gramas por metro de filamento."""
+        return self.peso_por_metro
+    
+    def calcular_preco_por_metro(self) -> float:
+        """Calcula o preço por metro de filamento."""
+        return self.preco_por_metro
+    
+    def calcular_preco_por_grama(self) -> float:
+        """Calcula o preço por grama de filamento."""
+        return self.preco_por_grama
+
+class CatalogoColunar:
+    """
+    Catálogo em formato de colunas (struct-of-arrays).
+    
+    Cada atributo numérico do Filamento vira um array NumPy indexado pelo id
+    do filamento (sua posição em `nomes`), o que permite calcular preços e
+    montar tabelas sem acessar objeto por objeto.
+    """
+    
+    __slots__ = ("nomes", "ids", "marca", "material", "diametro", "comprimento_total",
+                 "peso_total", "preco", "peso_por_metro", "preco_por_metro", "preco_por_grama")
+    
+    def __init__(self, catalogo: Mapping[str, Filamento]):
+        filamentos = list(catalogo.values())
+        self.nomes = np.array(list(catalogo.keys()), dtype=object)
+        self.ids = {nome: i for i, nome in enumerate(self.nomes)}
+        self.marca = np.array([f.marca for f in filamentos], dtype=object)
+        self.material = np.array([f.material for f in filamentos], dtype=object)
+        for atributo in ("diametro", "comprimento_total", "peso_total", "preco",
+                         "peso_por_metro", "preco_por_metro", "preco_por_grama"):
+            setattr(self, atributo, np.fromiter((getattr(f, atributo) for f in filamentos),
+                                                dtype=np.float64, count=len(filamentos)))
+    
+    def __len__(self) -> int:
+        return len(self.nomes)
+    
+    def indices(self, nomes) -> np.ndarray:
+        """
+        Converte uma sequência de nomes de filamento em ids.
+        
+        Raises:
+            KeyError: Se algum filamento não existir no catálogo
+        """
+        nomes = np.asarray(nomes, dtype=object).reshape(-1)
+        try:
+            return np.fromiter(map(self.ids.__getitem__, nomes), dtype=np.intp, count=len(nomes))
+        except KeyError:
+            faltando = sorted(set(map(str, nomes)) - self.ids.keys())
+            raise KeyError(f"Filamentos não encontrados no catálogo: {', '.join(faltando)}") from None
+    
+    def tabela(self) -> pd.DataFrame:
+        """Tabela do catálogo para exibição, montada direto das colunas."""
+        return pd.DataFrame({
+            'Nome': self.nomes,
+            'Marca': self.marca,
+            'Material': self.material,
+            'Diâmetro (mm)': self.diametro,
+            'Metros/kg': self.comprimento_total,
+            'Preço/kg (R$)': self.preco,
+            'Preço/m (R$)': np.round(self.preco_por_metro, 3),
+            'Preço/g (R$)': np.round(self.preco_por_grama, 3)
+        })
+
+# Catálogo de filamentos padrão
+DEFAULT_FILAMENTOS = {
+    "Creality Hyper PLA": Filamento("Hyper PLA", "Creality", "PLA", 1.75, 330, 1.0, 120.00),
+    "3D Lab PLA+": Filamento("PLA+", "3D Lab", "PLA+", 1.75, 330, 1.0, 130.00),
+    "3D Fila PETG": Filamento("PETG Premium", "3D Fila", "PETG", 1.75, 335, 1.0, 140.00),
+    "3DX ABS Premium": Filamento("ABS Premium", "3DX", "ABS", 1.75, 340, 1.0, 110.00),
+    "Flexível TPU": Filamento("TPU Flex", "3D Prime", "TPU", 1.75, 320, 1.0, 180.00)
+}
+
+# Alterações pontuais do catálogo (adicionar/remover filamento) são anexadas
+# a um log ao lado do JSON; quando o log passa deste número de registros ele
+# é incorporado ao JSON principal.
+LIMITE_LOG_CATALOGO = 200
+
+def _filamento_para_dict(f: Filamento) -> Dict:
+    return {
+        "nome": f.nome,
+        "marca": f.marca,
+        "material": f.material,
+        "diametro": f.diametro,
+        "comprimento_total": f.comprimento_total,
+        "peso_total": f.peso_total,
+        "preco": f.preco
+    }
+
+def _dict_para_filamento(dados: Dict) -> Filamento:
+    return Filamento(
+        nome=dados["nome"],
+        marca=dados["marca"],
+        material=dados["material"],
+        diametro=dados["diametro"],
+        comprimento_total=dados["comprimento_total"],
+        peso_total=dados["peso_total"],
+        preco=dados["preco"]
+    )
+
+def _arquivo_log(arquivo: str) -> str:
+    return arquivo + ".wal"
+
+def salvar_catalogo(catalogo: Dict[str, Filamento], arquivo: str = "catalogo_filamentos.json") -> None:
+    """Salva o catálogo completo de filamentos em um arquivo JSON (substituição atômica)."""
+    # Convertendo objetos Filamento para dicionários
+    catalogo_dict = {nome: _filamento_para_dict(f) for nome, f in catalogo.items()}
+    conteudo = json.dumps(catalogo_dict, ensure_ascii=False, indent=4)
+    
+    with trava_arquivo(arquivo):
+        gravar_atomico(arquivo, conteudo)
+        # O JSON já contém tudo: alterações pendentes no log são descartadas
+        if os.path.exists(_arquivo_log(arquivo)):
+            os.remove(_arquivo_log(arquivo))
+    
+    return True
+
+def _ler_catalogo(arquivo: str) -> Dict[str, Filamento]:
+    """Lê o JSON principal e aplica as alterações do log (sem travar)."""
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            catalogo_dict = json.load(f)
+        catalogo = {nome: _dict_para_filamento(dados) for nome, dados in catalogo_dict.items()}
+    except (FileNotFoundError, json.JSONDecodeError):
+        # Se o arquivo não existir ou estiver corrompido, parte do catálogo padrão
+        catalogo = dict(DEFAULT_FILAMENTOS)
+    
+    for registro in ler_registros(_arquivo_log(arquivo)):
+        if registro["op"] == "salvar":
+            catalogo[registro["nome"]] = _dict_para_filamento(registro["dados"])
+        elif registro["op"] == "remover":
+            catalogo.pop(registro["nome"], None)
+    return catalogo
+
+def carregar_catalogo(arquivo: str = "catalogo_filamentos.json") -> Dict[str, Filamento]:
+    """Carrega o catálogo de filamentos de um arquivo JSON."""
+    with trava_arquivo(arquivo, exclusiva=False):
+        return _ler_catalogo(arquivo)
+
+def _registrar_alteracao(registro: Dict, arquivo: str) -> bool:
+    """Anexa uma alteração ao log do catálogo, compactando-o quando necessário."""
+    with trava_arquivo(arquivo):
+        anexar_registro(_arquivo_log(arquivo), registro)
+        if len(ler_registros(_arquivo_log(arquivo))) > LIMITE_LOG_CATALOGO:
+            catalogo = _ler_catalogo(arquivo)
+            catalogo_dict = {nome: _filamento_para_dict(f) for nome, f in catalogo.items()}
+            gravar_atomico(arquivo, json.dumps(catalogo_dict, ensure_ascii=False, indent=4))
+            os.remove(_arquivo_log(arquivo))
+    return True
+
+def registrar_filamento(nome: str, filamento: Filamento,
+                        arquivo: str = "catalogo_filamentos.json") -> bool:
+    """Adiciona (ou substitui) um filamento no catálogo salvo, sem reescrever o arquivo inteiro."""
+    return _registrar_alteracao(
+        {"op": "salvar", "nome": nome, "dados": _filamento_para_dict(filamento)}, arquivo
+    )
+
+def remover_filamento(nome: str, arquivo: str = "catalogo_filamentos.json") -> bool:
+    """Remove um filamento do catálogo salvo, sem reescrever o arquivo inteiro."""
+    return _registrar_alteracao({"op": "remover", "nome": nome}, arquivo)
+
+def _calcular_custos(peso_por_metro, preco_por_metro, metros_usados, tempo_impressao,
+                     custo_energia_hora, custo_manutencao_hora, margem_lucro, custo_falha):
+    """
+    Fórmula de custo compartilhada entre o cálculo unitário e o cálculo em lote.
+    
+    Usa apenas operações aritméticas, então funciona tanto com floats quanto
+    com arrays NumPy (um valor por trabalho).
+    """
+    peso_usado = metros_usados * peso_por_metro
+    custo_material = metros_usados * preco_por_metro
+    tempo_impressao_horas = tempo_impressao / 60
+    custo_energia = tempo_impressao_horas * custo_energia_hora
+    custo_manutencao = tempo_impressao_horas * custo_manutencao_hora
+    
+    # Adicionar custo de falha como porcentagem do custo material
+    valor_custo_falha = custo_material * (custo_falha / 100)
+    
+    custo_total = custo_material + custo_energia + custo_manutencao + valor_custo_falha
+    preco_final = custo_total * (1 + (margem_lucro / 100))
+    
+    return {
+        'Peso Usado (g)': peso_usado,
+        'Metros Usados': metros_usados,
+        'Custo do Material': custo_material,
+        'Custo de Energia': custo_energia,
+        'Custo de Manutenção': custo_manutencao,
+        'Custo para Falhas': valor_custo_falha,
+        'Custo Total': custo_total,
+        'Preço Final': preco_final
+    }
+
+def calcular_preco_impressao(filamento: Filamento, 
+                             metros_usados: float, 
+                             tempo_impressao: float, 
+                             custo_energia_hora: float,
+                             custo_manutencao_hora: float, 
+                             margem_lucro: float,
+                             custo_falha: float = 0.0):
+    """
+    Calcula o preço de uma impressão 3D.
+    
+    Args:
+        filamento: Objeto Filamento usado na impressão
+        metros_usados: Quantidade de metros de filamento usados
+        tempo_impressao: Tempo de impressão em minutos
+        custo_energia_hora: Custo da energia elétrica por hora em R$
+        custo_manutencao_hora: Custo de manutenção por hora em R$
+        margem_lucro: Margem de lucro em porcentagem
+        custo_falha: Custo adicional para cobrir potenciais falhas (%)
+    
+    Returns:
+        Dict com os detalhes do cálculo
+    """
+    return _calcular_custos(
+        filamento.calcular_peso_por_metro(),
+        filamento.calcular_preco_por_metro(),
+        metros_usados,
+        tempo_impressao,
+        custo_energia_hora,
+        custo_manutencao_hora,
+        margem_lucro,
+        custo_falha
+    )
+
+# Colunas aceitas por calcular_precos_dataframe (mesmos nomes dos parâmetros)
+COLUNAS_LOTE = (
+    "filamento",
+    "metros_usados",
+    "tempo_impressao",
+    "custo_energia_hora",
+    "custo_manutencao_hora",
+    "margem_lucro",
+    "custo_falha",
+)
+
+def calcular_precos_lote(catalogo: Union[Mapping[str, Filamento], CatalogoColunar],
+                         filamentos,
+                         metros_usados,
+                         tempo_impressao,
+                         custo_energia_hora,
+                         custo_manutencao_hora,
+                         margem_lucro,
+                         custo_falha=0.0) -> Dict[str, np.ndarray]:
+    """
+    Calcula o preço de vários trabalhos de impressão de uma só vez.
+    
+    Todos os argumentos numéricos podem ser arrays (um valor por trabalho)
+    ou escalares (aplicados a todos os trabalhos). Os valores são idênticos
+    aos de calcular_preco_impressao chamada trabalho a trabalho.
+    
+    Args:
+        catalogo: Catálogo de filamentos (nome -> Filamento) ou sua visão
+            CatalogoColunar, que pode ser reaproveitada entre chamadas
+        filamentos: Sequência com o nome do filamento de cada trabalho
+        metros_usados: Metros de filamento de cada trabalho
+        tempo_impressao: Tempo de impressão de cada trabalho em minutos
+        custo_energia_hora: Custo da energia elétrica por hora em R$
+        custo_manutencao_hora: Custo de manutenção por hora em R$
+        margem_lucro: Margem de lucro em porcentagem
+        custo_falha: Custo adicional para cobrir potenciais falhas (%)
+    
+    Returns:
+        Dict com as mesmas chaves de calcular_preco_impressao, cada uma
+        com um array NumPy
+    
+    Raises:
+        KeyError: Se algum filamento não existir no catálogo
+    """
+    if not isinstance(catalogo, CatalogoColunar):
+        catalogo = CatalogoColunar(catalogo)
+    ids = catalogo.indices(filamentos)
+    
+    return _calcular_custos(
+        catalogo.peso_por_metro[ids],
+        catalogo.preco_por_metro[ids],
+        np.asarray(metros_usados, dtype=float),
+        np.asarray(tempo_impressao, dtype=float),
+        np.asarray(custo_energia_hora, dtype=float),
+        np.asarray(custo_manutencao_hora, dtype=float),
+        np.asarray(margem_lucro, dtype=float),
+        np.asarray(custo_falha, dtype=float)
+    )
+
+def calcular_precos_dataframe(catalogo: Union[Mapping[str, Filamento], CatalogoColunar],
+                              trabalhos: pd.DataFrame,
+                              **padroes) -> pd.DataFrame:
+    """
+    Calcula o preço de um DataFrame de trabalhos (colunas em COLUNAS_LOTE).
+    
+    Colunas ausentes são preenchidas com os valores passados em `padroes`
+    (por exemplo custo_energia_hora=0.5). Retorna um DataFrame com as
+    colunas de entrada seguidas das colunas de custo.
+    """
+    argumentos = {}
+    for coluna in COLUNAS_LOTE:
+        if coluna in trabalhos.columns:
+            argumentos[coluna] = trabalhos[coluna].to_numpy()
+        elif coluna in padroes:
+            argumentos[coluna] = padroes[coluna]
+        elif coluna == "custo_falha":
+            argumentos[coluna] = 0.0
+        else:
+            raise KeyError(f"Coluna obrigatória ausente: {coluna}")
+    
+    resultados = calcular_precos_lote(
+        catalogo,
+        argumentos.pop("filamento"),
+        **argumentos
+    )
+    
+    n = len(trabalhos)
+    colunas = {nome: np.broadcast_to(valores, (n,)) for nome, valores in resultados.items()}
+    return pd.concat([trabalhos.reset_index(drop=True), pd.DataFrame(colunas)], axis=1)
+
+# Soluções inversas: a partir de um preço final desejado (ex.: preço de
+# prateleira de um concorrente), cada uma isola um termo de _calcular_custos.
+# Aceitam arrays (por exemplo milhares de preços alvo) com broadcasting.
+
+def _custos_fixos_hora(tempo_impressao, custo_energia_hora, custo_manutencao_hora):
+    return np.asarray(tempo_impressao, dtype=float) / 60 * (np.asarray(custo_energia_hora, dtype=float)
+                                                            + np.asarray(custo_manutencao_hora, dtype=float))
+
+def margem_para_preco(filamento: Filamento,
+                      preco_alvo,
+                      metros_usados,
+                      tempo_impressao,
+                      custo_energia_hora,
+                      custo_manutencao_hora,
+                      custo_falha=0.0):
+    """
+    Margem de lucro (%) que leva calcular_preco_impressao ao preço alvo.
+    
+    Returns:
+        Margem em porcentagem (negativa se o preço alvo não cobre o custo)
+    """
+    custo_total = (np.asarray(metros_usados, dtype=float) * filamento.calcular_preco_por_metro()
+                   * (1 + np.asarray(custo_falha, dtype=float) / 100)
+                   + _custos_fixos_hora(tempo_impressao, custo_energia_hora, custo_manutencao_hora))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margem = (np.asarray(preco_alvo, dtype=float) / custo_total - 1) * 100
+    return margem[()] if np.ndim(margem) == 0 else margem
+
+def metros_maximos_para_preco(filamento: Filamento,
+                              preco_alvo,
+                              tempo_impressao,
+                              custo_energia_hora,
+                              custo_manutencao_hora,
+                              margem_lucro,
+                              custo_falha=0.0):
+    """
+    Maior quantidade de filamento (m) que ainda cabe no preço alvo com a margem dada.
+    
+    Returns:
+        Metros (0 quando nem o tempo de máquina cabe no preço)
+    """
+    custo_permitido = np.asarray(preco_alvo, dtype=float) / (1 + np.asarray(margem_lucro, dtype=float) / 100)
+    custo_por_metro = filamento.calcular_preco_por_metro() * (1 + np.asarray(custo_falha, dtype=float) / 100)
+    sobra = custo_permitido - _custos_fixos_hora(tempo_impressao, custo_energia_hora, custo_manutencao_hora)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        metros = np.maximum(sobra / custo_por_metro, 0.0)
+    return metros[()] if np.ndim(metros) == 0 else metros
+
+def tempo_maximo_para_preco(filamento: Filamento,
+                            preco_alvo,
+                            metros_usados,
+                            custo_energia_hora,
+                            custo_manutencao_hora,
+                            margem_lucro,
+                            custo_falha=0.0):
+    """
+    Maior tempo de impressão (min) que ainda cabe no preço alvo com a margem dada.
+    
+    Returns:
+        Minutos (0 quando nem o material cabe no preço; infinito se os
+        custos por hora forem zero)
+    """
+    custo_permitido = np.asarray(preco_alvo, dtype=float) / (1 + np.asarray(margem_lucro, dtype=float) / 100)
+    custo_material = (np.asarray(metros_usados, dtype=float) * filamento.calcular_preco_por_metro()
+                      * (1 + np.asarray(custo_falha, dtype=float) / 100))
+    custo_minuto = (np.asarray(custo_energia_hora, dtype=float) + np.asarray(custo_manutencao_hora, dtype=float)) / 60
+    with np.errstate(divide="ignore", invalid="ignore"):
+        minutos = np.maximum((custo_permitido - custo_material) / custo_minuto, 0.0)
+    return minutos[()] if np.ndim(minutos) == 0 else minutos
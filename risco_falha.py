@@ -0,0 +1,204 @@
+"""
+Modelo de risco de falha por simulação de Monte Carlo.
+
+O custo_falha de calcular_preco_impressao é um percentual fixo sobre o
+material. Aqui cada tentativa de impressão pode falhar a qualquer momento,
+com uma taxa de falha por hora que depende do material (TPU e ABS falham
+mais que PLA). Uma falha desperdiça o material, o tempo e a energia gastos
+até aquele ponto, e o trabalho é reimpresso do zero.
+
+Os sorteios são feitos em lote com NumPy (trabalhos x simulações), em blocos
+de trabalhos com sementes derivadas de uma única semente, de modo que o
+resultado é reproduzível e não depende do número de processos usados.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from nucleo.precificacao import CatalogoColunar, Filamento
+
+# Falhas esperadas por hora de impressão, por material
+TAXAS_FALHA_HORA = {
+    "PLA": 0.010,
+    "PLA+": 0.010,
+    "PETG": 0.015,
+    "ASA": 0.025,
+    "ABS": 0.030,
+    "TPU": 0.040,
+}
+TAXA_FALHA_PADRAO = 0.020
+
+SIMULACOES = 2000
+MAX_TENTATIVAS = 5
+TRABALHOS_POR_BLOCO = 512
+PERCENTIS = (50, 95)
+
+
+def taxa_falha_hora(material: str, taxas: Optional[Mapping[str, float]] = None) -> float:
+    """Taxa de falha por hora do material (sem diferenciar maiúsculas)."""
+    taxas = TAXAS_FALHA_HORA if taxas is None else taxas
+    por_nome = {m.upper(): t for m, t in taxas.items()}
+    return por_nome.get(str(material).upper(), TAXA_FALHA_PADRAO)
+
+
+def _simular_bloco(argumentos) -> Dict[str, np.ndarray]:
+    """
+    Simula um bloco de trabalhos (executado também nos processos auxiliares).
+
+    Cada tentativa falha no instante sorteado de uma exponencial com a taxa
+    do material; se esse instante for anterior ao fim da impressão, a fração
+    já impressa é perdida e uma nova tentativa começa.
+    """
+    custo_material, horas, custo_hora, taxa, simulacoes, max_tentativas, semente = argumentos
+    rng = np.random.default_rng(semente)
+    n = len(horas)
+
+    custo_material = custo_material[:, None]
+    horas = horas[:, None]
+    custo_hora = custo_hora[:, None]
+    custo_tentativa = custo_material + horas * custo_hora
+
+    custo = np.zeros((n, simulacoes))
+    tentativas = np.zeros((n, simulacoes))
+    pendente = np.ones((n, simulacoes), dtype=bool)
+    for _ in range(max_tentativas):
+        # Taxa zero (material sem risco): a tentativa nunca falha
+        instante_falha = np.divide(rng.exponential(1.0, size=(n, simulacoes)), taxa[:, None],
+                                   out=np.full((n, simulacoes), np.inf), where=taxa[:, None] > 0)
+        falhou = instante_falha < horas
+        # Fração da impressão concluída até a falha (1 quando a tentativa termina)
+        fracao = np.where(falhou, instante_falha / np.where(horas > 0, horas, 1.0), 1.0)
+        custo += np.where(pendente, custo_tentativa * fracao, 0.0)
+        tentativas += pendente
+        pendente &= falhou
+        if not pendente.any():
+            break
+
+    custo_base = custo_tentativa[:, 0]
+    return {
+        'Custo Esperado': custo.mean(axis=1),
+        **{f'Custo P{p}': v for p, v in zip(PERCENTIS, np.percentile(custo, PERCENTIS, axis=1))},
+        'Custo Base': custo_base,
+        'Custo Esperado de Falhas': custo.mean(axis=1) - custo_base,
+        'Probabilidade de Falha': (tentativas > 1).mean(axis=1),
+        'Tentativas Médias': tentativas.mean(axis=1),
+        'Probabilidade de Perda': pendente.mean(axis=1),
+    }
+
+
+def simular_falhas_lote(catalogo: Union[Mapping[str, Filamento], CatalogoColunar],
+                        filamentos,
+                        metros_usados,
+                        tempo_impressao,
+                        custo_energia_hora,
+                        custo_manutencao_hora,
+                        taxas: Optional[Mapping[str, float]] = None,
+                        simulacoes: int = SIMULACOES,
+                        max_tentativas: int = MAX_TENTATIVAS,
+                        semente: int = 0,
+                        processos: Optional[int] = 1) -> Dict[str, np.ndarray]:
+    """
+    Simula falhas e reimpressões de vários trabalhos.
+
+    Args:
+        catalogo: Catálogo de filamentos ou sua visão CatalogoColunar
+        filamentos: Nome do filamento de cada trabalho
+        metros_usados / tempo_impressao: Por trabalho (tempo em minutos)
+        custo_energia_hora / custo_manutencao_hora: R$ por hora
+        taxas: Falhas por hora por material (padrão: TAXAS_FALHA_HORA)
+        simulacoes: Sorteios por trabalho
+        max_tentativas: Tentativas antes de desistir do trabalho
+        semente: Semente do gerador (inteiro ou sequência de inteiros); o
+            mesmo valor reproduz o resultado
+        processos: Processos para os blocos (1 = no processo atual;
+            None = número de CPUs)
+
+    Returns:
+        Dict de arrays (um valor por trabalho): custo esperado, percentis
+        P50/P95, custo base (sem falhas), custo esperado de falhas,
+        probabilidade de falha, tentativas médias e probabilidade de perda
+        (todas as tentativas falharam)
+    """
+    if not isinstance(catalogo, CatalogoColunar):
+        catalogo = CatalogoColunar(catalogo)
+    ids = catalogo.indices(filamentos)
+    n = len(ids)
+
+    taxas_material = {m: taxa_falha_hora(m, taxas) for m in set(catalogo.material)}
+    taxa = np.fromiter((taxas_material[m] for m in catalogo.material), dtype=float,
+                       count=len(catalogo))[ids]
+    metros = np.broadcast_to(np.asarray(metros_usados, dtype=float), (n,))
+    horas = np.broadcast_to(np.asarray(tempo_impressao, dtype=float), (n,)) / 60
+    custo_hora = np.broadcast_to(np.asarray(custo_energia_hora, dtype=float)
+                                 + np.asarray(custo_manutencao_hora, dtype=float), (n,))
+    custo_material = metros * catalogo.preco_por_metro[ids]
+
+    inicios = range(0, n, TRABALHOS_POR_BLOCO)
+    sementes = np.random.SeedSequence(semente).spawn(len(inicios))
+    blocos = [
+        (custo_material[i:i + TRABALHOS_POR_BLOCO], horas[i:i + TRABALHOS_POR_BLOCO],
+         custo_hora[i:i + TRABALHOS_POR_BLOCO], taxa[i:i + TRABALHOS_POR_BLOCO],
+         simulacoes, max_tentativas, s)
+        for i, s in zip(inicios, sementes)
+    ]
+    if processos == 1 or len(blocos) <= 1:
+        resultados = [_simular_bloco(b) for b in blocos]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            resultados = list(executor.map(_simular_bloco, blocos))
+
+    if not resultados:
+        return {}
+    return {chave: np.concatenate([r[chave] for r in resultados]) for chave in resultados[0]}
+
+
+def simular_falhas(filamento: Filamento,
+                   metros_usados: float,
+                   tempo_impressao: float,
+                   custo_energia_hora: float,
+                   custo_manutencao_hora: float,
+                   **opcoes) -> Dict[str, float]:
+    """Simulação de um único trabalho (mesmas opções de simular_falhas_lote)."""
+    resultado = simular_falhas_lote(
+        {filamento.nome: filamento}, [filamento.nome], metros_usados, tempo_impressao,
+        custo_energia_hora, custo_manutencao_hora, **opcoes
+    )
+    return {chave: float(valores[0]) for chave, valores in resultado.items()}
+
+
+def custo_falha_equivalente(resultado: Dict, custo_material) -> Union[float, np.ndarray]:
+    """
+    Percentual sobre o material que reproduz o custo esperado de falhas, para
+    usar como custo_falha em calcular_preco_impressao.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.asarray(resultado['Custo Esperado de Falhas']) / custo_material * 100
+
+
+def simular_falhas_dataframe(catalogo: Union[Mapping[str, Filamento], CatalogoColunar],
+                             trabalhos: pd.DataFrame,
+                             custo_energia_hora: float = 0.0,
+                             custo_manutencao_hora: float = 0.0,
+                             **opcoes) -> pd.DataFrame:
+    """
+    Simula um DataFrame de trabalhos (colunas filamento, metros_usados,
+    tempo_impressao e, opcionalmente, custo_energia_hora e
+    custo_manutencao_hora, que têm precedência sobre os argumentos).
+
+    Retorna as colunas de entrada seguidas dos resultados da simulação.
+    """
+    def coluna(nome, padrao):
+        return trabalhos[nome].to_numpy() if nome in trabalhos.columns else padrao
+
+    resultado = simular_falhas_lote(
+        catalogo,
+        trabalhos['filamento'].to_numpy(),
+        trabalhos['metros_usados'].to_numpy(),
+        trabalhos['tempo_impressao'].to_numpy(),
+        coluna('custo_energia_hora', custo_energia_hora),
+        coluna('custo_manutencao_hora', custo_manutencao_hora),
+        **opcoes
+    )
+    return pd.concat([trabalhos.reset_index(drop=True), pd.DataFrame(resultado)], axis=1)
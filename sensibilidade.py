@@ -0,0 +1,155 @@
+"""
+Superfícies de sensibilidade de preço calculadas de uma só vez.
+
+Em vez de recalcular o preço a cada mudança de margem, metros ou tempo, a
+superfície inteira (margem x metros x minutos, ou custo x margem por
+marketplace) é calculada em um único lote vetorizado. Consultar um ponto
+passa a ser uma interpolação na grade já calculada: exata para o preço de
+impressão, que é multilinear nesses eixos, e aproximada apenas perto dos
+saltos de faixa de taxa fixa dos marketplaces.
+"""
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from nucleo.marketplace import Marketplace, TabelaMarketplaces, carregar_marketplaces
+from nucleo.precificacao import Filamento, _calcular_custos
+
+
+@dataclass(frozen=True)
+class Superficie:
+    """
+    Valores calculados sobre uma grade regular de parâmetros.
+
+    Cada array de `valores` tem um eixo por item de `eixos` e, opcionalmente,
+    eixos extras no fim (por exemplo, um valor por plataforma).
+    """
+    nomes_eixos: Tuple[str, ...]
+    eixos: Tuple[np.ndarray, ...]
+    valores: Dict[str, np.ndarray]
+    rotulos: Tuple[str, ...] = ()   # nomes dos itens do eixo extra, se houver
+
+    def consultar(self, *ponto: float) -> Dict[str, np.ndarray]:
+        """
+        Valores em um ponto qualquer da grade, por interpolação multilinear.
+
+        Pontos fora da grade usam o valor da borda mais próxima.
+        """
+        indices, pesos = [], []
+        for eixo, valor in zip(self.eixos, ponto):
+            i = int(np.clip(np.searchsorted(eixo, valor) - 1, 0, len(eixo) - 2)) if len(eixo) > 1 else 0
+            t = float(np.clip((valor - eixo[i]) / (eixo[i + 1] - eixo[i]), 0.0, 1.0)) if len(eixo) > 1 else 0.0
+            indices.append(i)
+            pesos.append(t)
+
+        resultado = {}
+        for nome, valores in self.valores.items():
+            total = 0.0
+            for cantos in product((0, 1), repeat=len(self.eixos)):
+                peso = 1.0
+                posicao = []
+                for canto, i, t, eixo in zip(cantos, indices, pesos, self.eixos):
+                    peso *= t if canto else 1 - t
+                    posicao.append(min(i + canto, len(eixo) - 1))
+                if peso:
+                    total = total + peso * valores[tuple(posicao)]
+            resultado[nome] = total
+        return resultado
+
+    def fatia(self, valor: str, **fixos: float) -> pd.DataFrame:
+        """
+        Tabela 2D de `valor` (linhas x colunas = os dois eixos livres),
+        fixando os demais eixos no ponto da grade mais próximo.
+
+        Para superfícies com eixo extra (plataformas), fixe um eixo e use
+        as plataformas como colunas.
+        """
+        selecao, livres = [], []
+        for nome, eixo in zip(self.nomes_eixos, self.eixos):
+            if nome in fixos:
+                selecao.append(int(np.abs(eixo - fixos[nome]).argmin()))
+            else:
+                selecao.append(slice(None))
+                livres.append((nome, eixo))
+        dados = self.valores[valor][tuple(selecao)]
+        if len(livres) == 1:
+            (nome, eixo), = livres
+            return pd.DataFrame(dados, index=pd.Index(eixo, name=nome), columns=list(self.rotulos) or [valor])
+        (nome_linhas, linhas), (nome_colunas, colunas) = livres
+        return pd.DataFrame(dados, index=pd.Index(linhas, name=nome_linhas),
+                            columns=pd.Index(colunas, name=nome_colunas))
+
+
+def superficie_impressao(filamento: Filamento,
+                         metros: Sequence[float],
+                         minutos: Sequence[float],
+                         margens: Sequence[float] = tuple(range(0, 201, 5)),
+                         custo_energia_hora: float = 0.5,
+                         custo_manutencao_hora: float = 2.0,
+                         custo_falha: float = 0.0) -> Superficie:
+    """
+    Preço, custo e lucro de calcular_preco_impressao para toda a grade
+    margem x metros x minutos, em uma única chamada vetorizada.
+
+    Args:
+        metros / minutos / margens: Pontos de cada eixo, em ordem crescente
+    """
+    m, me, mi = (np.asarray(e, dtype=float) for e in (margens, metros, minutos))
+    custos = _calcular_custos(
+        filamento.calcular_peso_por_metro(),
+        filamento.calcular_preco_por_metro(),
+        me[None, :, None],
+        mi[None, None, :],
+        custo_energia_hora,
+        custo_manutencao_hora,
+        m[:, None, None],
+        custo_falha,
+    )
+    forma = (len(m), len(me), len(mi))
+    preco = np.broadcast_to(custos['Preço Final'], forma)
+    custo = np.broadcast_to(custos['Custo Total'], forma)
+    return Superficie(
+        nomes_eixos=("Margem (%)", "Metros", "Minutos"),
+        eixos=(m, me, mi),
+        valores={'Preço Final': preco, 'Custo Total': custo, 'Lucro': preco - custo},
+    )
+
+
+def superficie_marketplaces(custos: Sequence[float],
+                            margens: Sequence[float] = tuple(range(0, 101, 5)),
+                            nota_fiscal: float = 5.0,
+                            embalagem: float = 1.0,
+                            marketplaces: Optional[Mapping[str, Marketplace]] = None,
+                            categoria: Optional[str] = None,
+                            incluir_taxa_fixa: bool = True) -> Superficie:
+    """
+    Preço de venda e valor líquido de cada plataforma para toda a grade
+    custo x margem, em uma única chamada vetorizada.
+
+    Os valores têm forma (custos, margens, plataformas).
+    """
+    tabela = TabelaMarketplaces(marketplaces or carregar_marketplaces(), categoria)
+    c, m = (np.asarray(e, dtype=float) for e in (custos, margens))
+    preco_venda, comissao, taxa_fixa, nota, _, outras, lucro, recebe = tabela.precificar(
+        c[:, None, None], nota_fiscal, embalagem, m[None, :, None], incluir_taxa_fixa
+    )
+    forma = (len(c), len(m), len(tabela))
+    return Superficie(
+        nomes_eixos=("Custo (R$)", "Margem (%)"),
+        eixos=(c, m),
+        valores={
+            'Preço de Venda': np.broadcast_to(preco_venda, forma),
+            'Taxas': np.broadcast_to(comissao + taxa_fixa + nota + outras, forma),
+            'Lucro': np.broadcast_to(lucro, forma),
+            'Valor Líquido': np.broadcast_to(recebe, forma),
+        },
+        rotulos=tuple(tabela.nomes),
+    )
+
+
+def tabela_longa(tabela: pd.DataFrame, valor: str) -> pd.DataFrame:
+    """Converte uma fatia 2D em formato longo (linha, coluna, valor), para mapas de calor."""
+    return tabela.stack().rename(valor).reset_index()
@@ -0,0 +1,328 @@
+"""
+Serviço HTTP de cotações para a loja virtual e o ERP (asyncio, sem dependências externas).
+
+Endpoints (JSON):
+    GET  /saude                      estado e contadores do serviço
+    GET  /filamentos                 catálogo de filamentos
+    GET  /filamentos/<nome>          um filamento
+    POST /cotacao/impressao          calcular_preco_impressao
+    POST /cotacao/impressao/lote     {"trabalhos": [...], <padrões>} -> calcular_precos_lote
+    POST /cotacao/venda              calcular_preco_venda
+    POST /cotacao/venda/lote         {"produtos": [...], <padrões>} -> calcular_preco_venda vetorizado
+
+O catálogo é o cache compartilhado do processo (cache_catalogo), recarregado
+só quando o arquivo muda, e as cotações unitárias passam pela memorização
+compartilhada (memo_cotacao), cujos contadores aparecem em /saude. Requisições idênticas (mesma rota e mesmo corpo)
+que chegam enquanto uma igual está em andamento aguardam o mesmo resultado
+em vez de recalcular, e o número de cálculos simultâneos é limitado por um
+semáforo. Lotes grandes rodam em uma thread para não bloquear o loop.
+
+Uso:
+    python -m cli servir --porta 8765
+"""
+import asyncio
+import json
+import sys
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from cache_catalogo import ARQUIVO_CATALOGO, CACHE, CacheCatalogo
+from memo_cotacao import MEMO, MemoCotacao
+from nucleo.dependencias import importar_preguicoso
+from nucleo.marketplace import calcular_preco_venda
+from nucleo.precificacao import COLUNAS_LOTE, calcular_preco_impressao, calcular_precos_lote
+
+np = importar_preguicoso("numpy")
+
+PORTA_PADRAO = 8765
+MAX_CONCORRENCIA = 64
+TAMANHO_MAXIMO_CORPO = 32 * 1024 * 1024   # bytes
+LOTE_EM_THREAD = 1_000                    # itens a partir dos quais o lote roda fora do loop
+
+CAMPOS_IMPRESSAO = COLUNAS_LOTE
+CAMPOS_VENDA = ("preco_custo", "comissao", "taxa_fixa", "nota_fiscal", "embalagem", "margem_lucro", "outras_taxas")
+OPCIONAIS = {"custo_falha": 0.0, "outras_taxas": 0.0}
+# Valores de calcular_preco_venda, na ordem da tupla retornada
+CHAVES_VENDA = (
+    'Preço de Venda (R$)', 'Comissão (R$)', 'Taxa Fixa (R$)', 'Nota Fiscal (R$)',
+    'Embalagem (R$)', 'Taxas Adicionais (R$)', 'Lucro (R$)', 'Valor Líquido (R$)',
+)
+
+_MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class ErroRequisicao(Exception):
+    """Erro do cliente, respondido com o status HTTP indicado."""
+
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def _json(dados) -> bytes:
+    return json.dumps(dados, ensure_ascii=False).encode("utf-8")
+
+
+def _ler_json(corpo: bytes) -> Dict:
+    try:
+        dados = json.loads(corpo)
+    except (json.JSONDecodeError, UnicodeDecodeError) as erro:
+        raise ErroRequisicao(400, f"JSON inválido: {erro}") from None
+    if not isinstance(dados, dict):
+        raise ErroRequisicao(400, "O corpo deve ser um objeto JSON")
+    return dados
+
+
+def _argumentos(dados: Dict, campos, padroes: Dict = None) -> Dict:
+    """Campos numéricos da requisição (ou dos padrões), com erro 400 se faltar algum."""
+    argumentos = {}
+    for campo in campos:
+        if campo in dados:
+            argumentos[campo] = dados[campo]
+        elif padroes and campo in padroes:
+            argumentos[campo] = padroes[campo]
+        elif campo in OPCIONAIS:
+            argumentos[campo] = OPCIONAIS[campo]
+        else:
+            raise ErroRequisicao(400, f"Campo obrigatório ausente: {campo}")
+    return argumentos
+
+
+def _colunas(itens: List[Dict], campos, padroes: Dict) -> Dict:
+    """Converte uma lista de objetos em colunas (arrays), usando os padrões do lote."""
+    if not isinstance(itens, list) or not all(isinstance(i, dict) for i in itens):
+        raise ErroRequisicao(400, "O lote deve ser uma lista de objetos")
+    colunas = {}
+    for campo in campos:
+        if all(campo in item for item in itens):
+            colunas[campo] = [item[campo] for item in itens]
+        else:
+            valor = _argumentos(padroes, (campo,))[campo]
+            colunas[campo] = [item.get(campo, valor) for item in itens]
+    return colunas
+
+
+def _linhas(colunas: Dict) -> List[Dict]:
+    """Colunas (arrays) -> lista de objetos, um por item do lote."""
+    chaves = list(colunas)
+    return [dict(zip(chaves, linha)) for linha in zip(*(np.asarray(v).tolist() for v in colunas.values()))]
+
+
+class ServicoCotacao:
+    """Rotas e estado compartilhado do serviço (catálogo, requisições em andamento, limites)."""
+
+    def __init__(self,
+                 arquivo_catalogo: str = ARQUIVO_CATALOGO,
+                 max_concorrencia: int = MAX_CONCORRENCIA,
+                 cache: CacheCatalogo = CACHE,
+                 memo: MemoCotacao = MEMO):
+        self.arquivo_catalogo = arquivo_catalogo
+        self.cache = cache
+        self.memo = memo
+        self.max_concorrencia = max_concorrencia
+        self._semaforo = asyncio.Semaphore(max_concorrencia)
+        self._em_andamento: Dict[Tuple[str, bytes], asyncio.Future] = {}
+        self.contadores = {"requisicoes": 0, "calculos": 0, "agrupadas": 0, "erros": 0}
+        self._rotas: Dict[str, Callable[[bytes], Tuple[bytes, int]]] = {
+            "/cotacao/impressao": self._cotar_impressao,
+            "/cotacao/impressao/lote": self._cotar_impressao_lote,
+            "/cotacao/venda": self._cotar_venda,
+            "/cotacao/venda/lote": self._cotar_venda_lote,
+        }
+
+    # Cálculos (síncronos): recebem o corpo e devolvem (JSON, número de itens)
+
+    def _cotar_impressao(self, corpo: bytes) -> Tuple[bytes, int]:
+        dados = _ler_json(corpo)
+        argumentos = _argumentos(dados, CAMPOS_IMPRESSAO)
+        nome = argumentos.pop("filamento")
+        catalogo = self.cache.obter(self.arquivo_catalogo)
+        if nome not in catalogo:
+            raise ErroRequisicao(404, f"Filamento não encontrado no catálogo: {nome}")
+        try:
+            resultado = calcular_preco_impressao(catalogo[nome], **{c: float(v) for c, v in argumentos.items()})
+        except (TypeError, ValueError):
+            raise ErroRequisicao(400, "Os campos numéricos devem ser números") from None
+        return _json({"filamento": nome, **resultado}), 1
+
+    def _cotar_impressao_lote(self, corpo: bytes) -> Tuple[bytes, int]:
+        dados = _ler_json(corpo)
+        colunas = _colunas(dados.get("trabalhos"), CAMPOS_IMPRESSAO, dados)
+        try:
+            resultados = calcular_precos_lote(
+                self.cache.obter_colunar(self.arquivo_catalogo),
+                colunas.pop("filamento"),
+                **{c: np.asarray(v, dtype=float) for c, v in colunas.items()}
+            )
+        except KeyError as erro:
+            raise ErroRequisicao(404, erro.args[0]) from None
+        except (TypeError, ValueError):
+            raise ErroRequisicao(400, "Os campos numéricos devem ser números") from None
+        n = len(dados["trabalhos"])
+        return _json({"resultados": _linhas({c: np.broadcast_to(v, (n,)) for c, v in resultados.items()})}), n
+
+    def _cotar_venda(self, corpo: bytes) -> Tuple[bytes, int]:
+        dados = _ler_json(corpo)
+        try:
+            argumentos = {c: float(v) for c, v in _argumentos(dados, CAMPOS_VENDA).items()}
+        except (TypeError, ValueError):
+            raise ErroRequisicao(400, "Os campos numéricos devem ser números") from None
+        return _json(dict(zip(CHAVES_VENDA, calcular_preco_venda(**argumentos)))), 1
+
+    def _cotar_venda_lote(self, corpo: bytes) -> Tuple[bytes, int]:
+        dados = _ler_json(corpo)
+        colunas = _colunas(dados.get("produtos"), CAMPOS_VENDA, dados)
+        try:
+            resultado = calcular_preco_venda(**{c: np.asarray(v, dtype=float) for c, v in colunas.items()})
+        except (TypeError, ValueError):
+            raise ErroRequisicao(400, "Os campos numéricos devem ser números") from None
+        n = len(dados["produtos"])
+        return _json({"resultados": _linhas({c: np.broadcast_to(v, (n,)) for c, v in zip(CHAVES_VENDA, resultado)})}), n
+
+    def _filamentos(self, nome: str = None) -> bytes:
+        catalogo = self.cache.obter(self.arquivo_catalogo)
+
+        def descrever(chave, f):
+            return {"nome": chave, "marca": f.marca, "material": f.material, "diametro": f.diametro,
+                    "comprimento_total": f.comprimento_total, "peso_total": f.peso_total, "preco": f.preco,
+                    "preco_por_metro": f.preco_por_metro, "peso_por_metro": f.peso_por_metro}
+
+        if nome is None:
+            return _json({"filamentos": [descrever(chave, f) for chave, f in catalogo.items()]})
+        if nome not in catalogo:
+            raise ErroRequisicao(404, f"Filamento não encontrado no catálogo: {nome}")
+        return _json(descrever(nome, catalogo[nome]))
+
+    # Concorrência
+
+    async def _calcular(self, rota: str, corpo: bytes) -> bytes:
+        """Executa o cálculo da rota, agrupando requisições idênticas em andamento."""
+        chave = (rota, corpo)
+        futuro = self._em_andamento.get(chave)
+        if futuro is not None:
+            self.contadores["agrupadas"] += 1
+            return await asyncio.shield(futuro)
+
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._em_andamento[chave] = futuro
+        try:
+            async with self._semaforo:
+                self.contadores["calculos"] += 1
+                funcao = self._rotas[rota]
+                if not rota.endswith("/lote"):
+                    # Cotações unitárias: a mesma requisição volta da memória até o catálogo mudar
+                    resposta, _ = self.memo.chamar(funcao, corpo, dependencias=(self.arquivo_catalogo,))
+                elif corpo.count(b"{") > LOTE_EM_THREAD:
+                    resposta, _ = await loop.run_in_executor(None, funcao, corpo)
+                else:
+                    resposta, _ = funcao(corpo)
+            futuro.set_result(resposta)
+            return resposta
+        except BaseException as erro:
+            futuro.set_exception(erro)
+            futuro.exception()   # marca como consumida, mesmo sem requisições agrupadas
+            raise
+        finally:
+            del self._em_andamento[chave]
+
+    async def tratar(self, metodo: str, alvo: str, corpo: bytes) -> Tuple[int, bytes]:
+        """Responde a uma requisição: (status HTTP, corpo JSON)."""
+        self.contadores["requisicoes"] += 1
+        caminho = unquote(urlsplit(alvo).path).rstrip("/") or "/"
+        try:
+            if caminho in self._rotas:
+                if metodo != "POST":
+                    raise ErroRequisicao(405, "Use POST")
+                return 200, await self._calcular(caminho, corpo)
+            if metodo != "GET":
+                if caminho == "/saude" or caminho == "/filamentos" or caminho.startswith("/filamentos/"):
+                    raise ErroRequisicao(405, "Use GET")
+                raise ErroRequisicao(404, "Rota não encontrada")
+            if caminho == "/saude":
+                return 200, _json({"status": "ok", "max_concorrencia": self.max_concorrencia,
+                                   "em_andamento": len(self._em_andamento), **self.contadores,
+                                   "memo": self.memo.estatisticas()})
+            if caminho == "/filamentos":
+                return 200, self._filamentos()
+            if caminho.startswith("/filamentos/"):
+                return 200, self._filamentos(caminho[len("/filamentos/"):])
+            raise ErroRequisicao(404, "Rota não encontrada")
+        except ErroRequisicao as erro:
+            self.contadores["erros"] += 1
+            return erro.status, _json({"erro": str(erro)})
+        except Exception as erro:
+            self.contadores["erros"] += 1
+            print(f"Erro em {metodo} {alvo}: {erro!r}", file=sys.stderr)
+            return 500, _json({"erro": "Erro interno"})
+
+    # HTTP/1.1 mínimo, com conexões persistentes (keep-alive)
+
+    async def atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        """Atende uma conexão: lê requisições até o cliente fechar ou pedir Connection: close."""
+        try:
+            while True:
+                try:
+                    cabecalho = await leitor.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    escritor.write(_resposta_http(431, _json({"erro": "Cabeçalho muito grande"}), False))
+                    break
+
+                linhas = cabecalho.decode("latin-1").split("\r\n")
+                try:
+                    metodo, alvo, versao = linhas[0].split(" ", 2)
+                    cabecalhos = {nome.strip().lower(): valor.strip()
+                                  for nome, valor in (linha.split(":", 1) for linha in linhas[1:] if linha)}
+                    tamanho = int(cabecalhos.get("content-length", 0))
+                except ValueError:
+                    escritor.write(_resposta_http(400, _json({"erro": "Requisição HTTP inválida"}), False))
+                    break
+                if tamanho > TAMANHO_MAXIMO_CORPO:
+                    escritor.write(_resposta_http(413, _json({"erro": "Corpo muito grande"}), False))
+                    break
+                try:
+                    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                status, resposta = await self.tratar(metodo, alvo, corpo)
+                conexao = cabecalhos.get("connection", "").lower()
+                manter = conexao == "keep-alive" or (versao == "HTTP/1.1" and conexao != "close")
+                escritor.write(_resposta_http(status, resposta, manter))
+                await escritor.drain()
+                if not manter:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+
+def _resposta_http(status: int, corpo: bytes, manter: bool) -> bytes:
+    return (f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(corpo)}\r\n"
+            f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n").encode("latin-1") + corpo
+
+
+async def servir(host: str = "127.0.0.1",
+                 porta: int = PORTA_PADRAO,
+                 arquivo_catalogo: str = ARQUIVO_CATALOGO,
+                 max_concorrencia: int = MAX_CONCORRENCIA,
+                 arquivo_cache: Optional[str] = None) -> None:
+    """Inicia o serviço e atende até ser interrompido (arquivo_cache: nível em disco da memorização)."""
+    if arquivo_cache:
+        MEMO.usar_disco(arquivo_cache)
+    servico = ServicoCotacao(arquivo_catalogo, max_concorrencia)
+    # Carrega o catálogo e o NumPy antes da primeira requisição (lotes grandes
+    # rodam em threads, que não devem disputar a importação preguiçosa)
+    servico.cache.obter(arquivo_catalogo)
+    np.asarray(0.0)
+    servidor = await asyncio.start_server(servico.atender, host, porta, backlog=1024)
+    enderecos = ", ".join(f"http://{s.getsockname()[0]}:{s.getsockname()[1]}" for s in servidor.sockets)
+    print(f"Serviço de cotações em {enderecos}", file=sys.stderr)
+    async with servidor:
+        await servidor.serve_forever()
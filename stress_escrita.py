@@ -0,0 +1,94 @@
+"""
+Teste de estresse das gravações concorrentes de catálogo e histórico.
+
+Vários processos adicionam filamentos ao catálogo e salvam orçamentos ao
+mesmo tempo, enquanto um leitor carrega o catálogo continuamente. Ao final
+verifica que nenhuma gravação se perdeu e que o catálogo nunca foi lido
+corrompido (o que faria carregar_catalogo voltar ao catálogo padrão).
+
+Uso:
+    python stress_escrita.py --processos 16 --operacoes 50
+"""
+import argparse
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+from nucleo.historico import contar_historico, salvar_orcamento
+from nucleo.precificacao import (
+    DEFAULT_FILAMENTOS,
+    Filamento,
+    carregar_catalogo,
+    registrar_filamento,
+    salvar_catalogo,
+)
+
+
+def escritor(indice: int, operacoes: int, arquivo_catalogo: str, arquivo_banco: str) -> None:
+    for i in range(operacoes):
+        nome = f"Stress {indice}-{i}"
+        registrar_filamento(nome, Filamento(nome, "Stress", "PLA", 1.75, 330, 1.0, 100.0 + i), arquivo_catalogo)
+        salvar_orcamento({'Filamento': nome, 'Preço Final': float(i)}, f"Projeto {indice}", arquivo_banco)
+
+
+def leitor(arquivo_catalogo: str, parar, falhas) -> None:
+    """Carrega o catálogo sem parar; o tamanho nunca pode diminuir."""
+    anterior = 0
+    while not parar.is_set():
+        tamanho = len(carregar_catalogo(arquivo_catalogo))
+        if tamanho < anterior:
+            falhas.value += 1
+        anterior = tamanho
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processos", type=int, default=16)
+    parser.add_argument("--operacoes", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo_catalogo = os.path.join(diretorio, "catalogo_filamentos.json")
+        arquivo_banco = os.path.join(diretorio, "historico_orcamentos.db")
+        salvar_catalogo(DEFAULT_FILAMENTOS, arquivo_catalogo)
+
+        parar = mp.Event()
+        falhas = mp.Value("i", 0)
+        processo_leitor = mp.Process(target=leitor, args=(arquivo_catalogo, parar, falhas))
+        processo_leitor.start()
+
+        inicio = time.perf_counter()
+        escritores = [
+            mp.Process(target=escritor, args=(i, args.operacoes, arquivo_catalogo, arquivo_banco))
+            for i in range(args.processos)
+        ]
+        for p in escritores:
+            p.start()
+        for p in escritores:
+            p.join()
+        duracao = time.perf_counter() - inicio
+
+        parar.set()
+        processo_leitor.join()
+
+        esperado = args.processos * args.operacoes
+        catalogo = carregar_catalogo(arquivo_catalogo)
+        filamentos_stress = sum(1 for nome in catalogo if nome.startswith("Stress "))
+        orcamentos = contar_historico(arquivo=arquivo_banco)
+
+        print(f"{args.processos} processos x {args.operacoes} operações em {duracao:.2f}s "
+              f"({2 * esperado / duracao:,.0f} gravações/s)")
+        print(f"Filamentos: {filamentos_stress}/{esperado} | Orçamentos: {orcamentos}/{esperado} | "
+              f"Leituras inconsistentes: {falhas.value}")
+
+        ok = (filamentos_stress == esperado and orcamentos == esperado and falhas.value == 0
+              and all(nome in catalogo for nome in DEFAULT_FILAMENTOS)
+              and all(p.exitcode == 0 for p in escritores))
+        print("OK" if ok else "FALHOU")
+        return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
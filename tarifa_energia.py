@@ -0,0 +1,202 @@
+"""
+Custo de energia com tarifa por horário (postos tarifários e bandeiras).
+
+Em vez de um custo_energia_hora fixo, a tarifa é descrita por janelas da
+semana (ponta, intermediário, fora de ponta) mais o adicional da bandeira
+vigente. O preço de cada minuto da semana é acumulado uma única vez; o
+custo de qualquer intervalo passa a ser uma diferença de duas posições do
+acumulado, o que permite calcular milhares de trabalhos (ou de horários de
+início candidatos) de uma vez com NumPy.
+"""
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Sequence, Tuple, Union
+
+import numpy as np
+
+ARQUIVO_TARIFAS = "tarifas.json"
+MINUTOS_SEMANA = 7 * 24 * 60
+_SEGUNDA_FEIRA = np.datetime64("1970-01-05T00:00", "m")   # referência para o minuto da semana
+
+# Adicional por kWh de cada bandeira tarifária (R$)
+BANDEIRAS = {
+    "verde": 0.0,
+    "amarela": 0.01885,
+    "vermelha 1": 0.04463,
+    "vermelha 2": 0.07877,
+}
+
+DIAS_UTEIS = (0, 1, 2, 3, 4)   # segunda a sexta (0 = segunda)
+
+# (minutos desde o início da impressão, potência em kW); a última fase vai até o fim
+PerfilPotencia = Union[float, Sequence[Tuple[float, float]]]
+
+
+def _minutos(horario: str) -> int:
+    horas, minutos = horario.split(":")
+    return int(horas) * 60 + int(minutos)
+
+
+@dataclass(frozen=True)
+class JanelaTarifa:
+    """Preço (R$/kWh) em um horário de certos dias da semana."""
+    inicio: str                 # "HH:MM"
+    fim: str                    # "HH:MM" (exclusivo; "24:00" para o fim do dia)
+    preco_kwh: float
+    dias: Tuple[int, ...] = DIAS_UTEIS
+
+
+@dataclass(frozen=True)
+class Tarifa:
+    """Tarifa por horário: preço padrão, janelas com preço próprio e bandeira."""
+    nome: str
+    preco_kwh: float                                 # preço fora das janelas (fora de ponta)
+    janelas: Tuple[JanelaTarifa, ...] = ()
+    bandeira: str = "verde"
+
+    # Custo acumulado (R$ por kW) do início da semana até cada minuto, calculado na criação
+    acumulado: np.ndarray = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        precos = np.full((7, 24 * 60), self.preco_kwh)
+        for janela in self.janelas:
+            precos[list(janela.dias), _minutos(janela.inicio):_minutos(janela.fim)] = janela.preco_kwh
+        precos = precos.reshape(-1) + BANDEIRAS[self.bandeira]
+        # Cada minuto a 1 kW consome 1/60 kWh
+        object.__setattr__(self, "acumulado", np.concatenate([[0.0], np.cumsum(precos / 60)]))
+
+    def com_bandeira(self, bandeira: str) -> "Tarifa":
+        return Tarifa(self.nome, self.preco_kwh, self.janelas, bandeira)
+
+    def _integral(self, minuto: np.ndarray) -> np.ndarray:
+        """Custo (R$ por kW) de _SEGUNDA_FEIRA até `minuto`."""
+        semanas, resto = np.divmod(minuto, MINUTOS_SEMANA)
+        indices = np.arange(MINUTOS_SEMANA + 1)
+        return semanas * self.acumulado[-1] + np.interp(resto, indices, self.acumulado)
+
+    def custo_intervalo(self, inicio_min, fim_min, potencia_kw=1.0) -> np.ndarray:
+        """Custo (R$) entre dois instantes em minutos desde _SEGUNDA_FEIRA, a potência constante."""
+        return np.asarray(potencia_kw, dtype=float) * (
+            self._integral(np.asarray(fim_min, dtype=float)) - self._integral(np.asarray(inicio_min, dtype=float))
+        )
+
+
+# Tarifa branca (valores de referência; ajuste conforme a distribuidora)
+TARIFA_BRANCA = Tarifa(
+    "Tarifa Branca",
+    preco_kwh=0.62,
+    janelas=(
+        JanelaTarifa("17:00", "18:00", 0.88),
+        JanelaTarifa("18:00", "21:00", 1.38),
+        JanelaTarifa("21:00", "22:00", 0.88),
+    ),
+)
+TARIFA_CONVENCIONAL = Tarifa("Convencional", preco_kwh=0.75)
+
+DEFAULT_TARIFAS = {t.nome: t for t in (TARIFA_BRANCA, TARIFA_CONVENCIONAL)}
+
+
+def carregar_tarifas(arquivo: str = ARQUIVO_TARIFAS) -> Dict[str, Tarifa]:
+    """
+    Carrega tarifas de um JSON no formato
+    {"nome": {"preco_kwh": 0.62, "bandeira": "verde",
+              "janelas": [{"inicio": "18:00", "fim": "21:00", "preco_kwh": 1.38, "dias": [0, 1, 2, 3, 4]}]}}
+    """
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            dados = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        # Se o arquivo não existir ou estiver corrompido, retorna as tarifas padrão
+        return dict(DEFAULT_TARIFAS)
+    return {
+        nome: Tarifa(
+            nome,
+            float(regras["preco_kwh"]),
+            tuple(JanelaTarifa(j["inicio"], j["fim"], float(j["preco_kwh"]), tuple(j.get("dias", DIAS_UTEIS)))
+                  for j in regras.get("janelas", [])),
+            regras.get("bandeira", "verde"),
+        )
+        for nome, regras in dados.items()
+    }
+
+
+def _minuto_semana(inicio) -> np.ndarray:
+    """Minutos (float) desde _SEGUNDA_FEIRA para datetimes, strings ISO ou datetime64."""
+    inicio = np.asarray(inicio, dtype="datetime64[s]")
+    # Reduzido à semana atual: mantém os valores pequenos e a soma precisa
+    return np.mod((inicio - _SEGUNDA_FEIRA) / np.timedelta64(1, "m"), MINUTOS_SEMANA)
+
+
+def _fases(perfil: PerfilPotencia) -> Tuple[np.ndarray, Sequence]:
+    if isinstance(perfil, np.ndarray) or np.ndim(perfil) == 0:
+        # Potência constante (um valor, ou um por trabalho)
+        return np.array([0.0]), [np.asarray(perfil, dtype=float)]
+    inicios, potencias = zip(*perfil)
+    return np.asarray(inicios, dtype=float), np.asarray(potencias, dtype=float)
+
+
+def custo_energia_tarifa(inicio, duracao_min, potencia: PerfilPotencia, tarifa: Tarifa = TARIFA_BRANCA):
+    """
+    Custo de energia (R$) de trabalhos que começam em `inicio` e duram `duracao_min`.
+
+    Args:
+        inicio: Data/hora de início (datetime, string ISO ou array datetime64)
+        duracao_min: Duração em minutos (escalar ou array)
+        potencia: Potência constante em kW (escalar ou array NumPy, um valor
+            por trabalho) ou perfil [(minuto, kW), ...] com as fases da
+            impressão (ex.: aquecimento e regime)
+        tarifa: Tarifa por horário
+
+    Returns:
+        Custo em R$ (escalar ou array, com broadcasting entre os argumentos)
+    """
+    t0 = _minuto_semana(inicio)
+    duracao = np.asarray(duracao_min, dtype=float)
+    inicios, potencias = _fases(potencia)
+    fins = np.append(inicios[1:], np.inf)
+
+    custo = 0.0
+    for comeco, fim, kw in zip(inicios, fins, potencias):
+        a = np.minimum(comeco, duracao)
+        b = np.minimum(fim, duracao)
+        custo = custo + tarifa.custo_intervalo(t0 + a, t0 + b, kw)
+    return custo[()] if np.ndim(custo) == 0 else custo
+
+
+def custo_energia_hora_equivalente(inicio, duracao_min, potencia: PerfilPotencia,
+                                   tarifa: Tarifa = TARIFA_BRANCA):
+    """
+    Custo de energia por hora que, usado como custo_energia_hora em
+    calcular_preco_impressao, reproduz o custo pela tarifa por horário.
+    """
+    custo = custo_energia_tarifa(inicio, duracao_min, potencia, tarifa)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        horas = np.asarray(duracao_min, dtype=float) / 60
+        equivalente = np.where(horas > 0, custo / np.where(horas > 0, horas, 1.0), 0.0)
+    return equivalente[()] if np.ndim(equivalente) == 0 else equivalente
+
+
+def melhor_horario(duracao_min: float,
+                   potencia: PerfilPotencia,
+                   janela_inicio,
+                   janela_fim,
+                   tarifa: Tarifa = TARIFA_BRANCA,
+                   passo_min: int = 15) -> Tuple[np.datetime64, float]:
+    """
+    Horário de início mais barato para um trabalho dentro de uma janela.
+
+    Todos os inícios candidatos (a cada `passo_min` minutos, terminando até
+    `janela_fim`) são avaliados de uma vez.
+
+    Returns:
+        Tupla (início mais barato, custo em R$); (None, nan) se o trabalho
+        não couber na janela
+    """
+    primeiro = np.datetime64(janela_inicio, "m")
+    ultimo = np.datetime64(janela_fim, "m") - np.timedelta64(int(np.ceil(duracao_min)), "m")
+    if ultimo < primeiro:
+        return None, float("nan")
+    candidatos = np.arange(primeiro, ultimo + np.timedelta64(1, "m"), np.timedelta64(passo_min, "m"))
+    custos = custo_energia_tarifa(candidatos, duracao_min, potencia, tarifa)
+    melhor = int(np.argmin(custos))
+    return candidatos[melhor], float(custos[melhor])
@@ -0,0 +1,79 @@
+import multiprocessing as mp
+import os
+
+from nucleo import precificacao
+from nucleo.armazenamento import anexar_registro, ler_registros
+from nucleo.historico import contar_historico, salvar_orcamento
+from nucleo.precificacao import (
+    DEFAULT_FILAMENTOS,
+    Filamento,
+    carregar_catalogo,
+    registrar_filamento,
+    remover_filamento,
+    salvar_catalogo,
+)
+
+PROCESSOS = 4
+OPERACOES = 75   # 4 x 75 registros + remoções passam de LIMITE_LOG_CATALOGO: há compactação
+
+
+def _filamento(nome, preco=100.0):
+    return Filamento(nome, "Teste", "PLA", 1.75, 330, 1.0, preco)
+
+
+def _escritor(indice, arquivo_catalogo, arquivo_banco):
+    for i in range(OPERACOES):
+        nome = f"Proc {indice}-{i}"
+        registrar_filamento(nome, _filamento(nome, 100.0 + i), arquivo_catalogo)
+        if i % 5 == 0:
+            remover_filamento(nome, arquivo_catalogo)
+        if i % 3 == 0:
+            salvar_orcamento({'Filamento': nome, 'Preço Final': float(i)}, f"Projeto {indice}", arquivo_banco)
+
+
+def test_escritores_concorrentes_nao_perdem_alteracoes(tmp_path):
+    arquivo_catalogo = str(tmp_path / "catalogo_filamentos.json")
+    arquivo_banco = str(tmp_path / "historico_orcamentos.db")
+    salvar_catalogo(DEFAULT_FILAMENTOS, arquivo_catalogo)
+
+    contexto = mp.get_context("fork")
+    processos = [contexto.Process(target=_escritor, args=(i, arquivo_catalogo, arquivo_banco))
+                 for i in range(PROCESSOS)]
+    for p in processos:
+        p.start()
+    for p in processos:
+        p.join()
+    assert [p.exitcode for p in processos] == [0] * PROCESSOS
+
+    esperados = {f"Proc {p}-{i}" for p in range(PROCESSOS) for i in range(OPERACOES) if i % 5}
+    catalogo = carregar_catalogo(arquivo_catalogo)
+    assert set(catalogo) == set(DEFAULT_FILAMENTOS) | esperados
+    assert catalogo["Proc 2-7"].preco == 107.0
+    # O log foi compactado no JSON ao menos uma vez durante a carga
+    assert len(ler_registros(arquivo_catalogo + ".wal")) < PROCESSOS * OPERACOES
+    assert contar_historico(arquivo=arquivo_banco) == PROCESSOS * len(range(0, OPERACOES, 3))
+
+
+def test_log_reaplicado_depois_da_compactacao(tmp_path, monkeypatch):
+    arquivo = str(tmp_path / "catalogo_filamentos.json")
+    log = arquivo + ".wal"
+    salvar_catalogo({}, arquivo)
+    monkeypatch.setattr(precificacao, "LIMITE_LOG_CATALOGO", 3)
+
+    for i in range(4):
+        registrar_filamento(f"F{i}", _filamento(f"F{i}"), arquivo)
+    # O quarto registro passou do limite: tudo foi para o JSON e o log sumiu
+    assert not os.path.exists(log)
+
+    registrar_filamento("F4", _filamento("F4"), arquivo)
+    remover_filamento("F0", arquivo)
+    registrar_filamento("F1", _filamento("F1", 150.0), arquivo)
+    assert len(ler_registros(log)) == 3
+    # Gravação interrompida no meio: a última linha incompleta é ignorada
+    anexar_registro(log, {"op": "remover", "nome": "F2"})
+    with open(log, "rb+") as f:
+        f.truncate(os.path.getsize(log) - 5)
+
+    catalogo = carregar_catalogo(arquivo)
+    assert sorted(catalogo) == ["F1", "F2", "F3", "F4"]
+    assert catalogo["F1"].preco == 150.0
@@ -0,0 +1,25 @@
+import pytest
+
+from cli import main
+
+
+@pytest.mark.parametrize("conteudo, mensagem", [
+    ("filamento,metros_usados,tempo_impressao\nInexistente,10,60\n", "Filamentos não encontrados no catálogo: Inexistente"),
+    ("filamento,metros_usados\nInexistente,10\n", "Coluna obrigatória ausente: tempo_impressao"),
+])
+def test_quote_erro_de_uso_em_uma_linha(tmp_path, capsys, conteudo, mensagem):
+    entrada = tmp_path / "trabalhos.csv"
+    entrada.write_text(conteudo, encoding="utf-8")
+
+    codigo = main(["quote", "--input", str(entrada), "--output", str(tmp_path / "saida.csv"),
+                   "--catalogo", str(tmp_path / "catalogo.json")])
+
+    assert codigo == 1
+    assert capsys.readouterr().err.strip().splitlines() == [f"erro: {mensagem}"]
+
+
+def test_quote_arquivo_inexistente(tmp_path, capsys):
+    codigo = main(["quote", "--input", str(tmp_path / "nada.csv"), "--output", str(tmp_path / "saida.csv")])
+
+    assert codigo == 1
+    assert "nada.csv" in capsys.readouterr().err
@@ -0,0 +1,61 @@
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+from nucleo.historico import (
+    COLUNAS,
+    DIMENSOES_RESUMO,
+    conectar,
+    consultar_resumo,
+    contar_historico,
+    reconstruir_resumos,
+    salvar_orcamento,
+)
+
+
+def _csv_legado(caminho, n):
+    pd.DataFrame({
+        'Data': ["2024-01-%02d" % (i % 28 + 1) for i in range(n)],
+        'Projeto': [f"Projeto {i % 50}" for i in range(n)],
+        'Filamento': ["PLA" if i % 2 else "PETG" for i in range(n)],
+        'Metros': 10.0, 'Tempo (min)': 60.0, 'Custo Total': 5.0, 'Preço Final': 10.0,
+    }).reindex(columns=list(COLUNAS)).to_csv(caminho, index=False)
+
+
+def test_migracao_csv_concorrente(tmp_path):
+    banco = str(tmp_path / "historico.db")
+    _csv_legado(tmp_path / "historico.csv", 20_000)
+
+    barreira = threading.Barrier(4)
+    erros = []
+
+    def abrir():
+        barreira.wait()
+        try:
+            conectar(banco).close()
+        except Exception as erro:  # noqa: BLE001 - registrado para a asserção
+            erros.append(erro)
+
+    threads = [threading.Thread(target=abrir) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert erros == []
+    assert contar_historico(arquivo=banco) == 20_000
+    assert consultar_resumo('mes', arquivo=banco)['Orçamentos'].sum() == 20_000
+
+
+def test_resumos_incrementais_iguais_a_reconstrucao(tmp_path):
+    banco = str(tmp_path / "historico.db")
+    for i in range(30):
+        salvar_orcamento({'Filamento': 'PLA' if i % 3 else 'PETG', 'Metros Usados': 1.0 + i,
+                          'Custo Total': 4.0, 'Preço Final': 9.5}, "caixa" if i % 2 else "Caixa", banco)
+    incrementais = {d: consultar_resumo(d, arquivo=banco) for d in DIMENSOES_RESUMO}
+    assert reconstruir_resumos(banco) == 30
+    for dimensao, resumo in incrementais.items():
+        pd.testing.assert_frame_equal(resumo, consultar_resumo(dimensao, arquivo=banco))
+    with closing(conectar(banco)) as conexao:
+        assert conexao.execute("SELECT COUNT(*) FROM resumo_projeto").fetchone()[0] == 1
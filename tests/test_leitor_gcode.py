@@ -0,0 +1,35 @@
+import io
+
+import pytest
+
+from leitor_gcode import analisar_gcode
+
+
+def _analisar(texto, tamanho_bloco=1 << 20):
+    return analisar_gcode(io.BytesIO(texto.encode("ascii")), tamanho_bloco)
+
+
+def test_relativo_depois_absoluto_sem_g92():
+    # O firmware mantém E=10 ao voltar para M82: o G1 E12 avança só 2 mm
+    resultado = _analisar("M83\nG1 X1 E5\nG1 X2 E5\nM82\nG1 X3 E12\n")
+    assert resultado.metros_por_ferramenta == {0: pytest.approx(0.012)}
+
+
+def test_absoluto_depois_relativo_com_retracoes():
+    resultado = _analisar("M82\nG92 E0\nG1 E10\nG1 E8\nG1 E10\nM83\nG1 E3\nG1 E-1\nG1 E1\nM82\nG1 E15\n")
+    assert resultado.metros_por_ferramenta == {0: pytest.approx(0.015)}
+
+
+@pytest.mark.parametrize("tamanho_bloco", [16, 1 << 20])
+def test_ferramentas_misturadas(tamanho_bloco):
+    texto = (
+        ";FLAVOR:Marlin\n;TIME:600\n"
+        "M82\nG92 E0\nT0\nG1 X1 E20\nG1 X2 E18\nG1 X3 E20\n"   # T0: 20 mm
+        "T1\nG92 E0\nG1 X4 E30\n"                              # T1: 30 mm
+        "M83\nG1 X5 E2.5\nG1 X6 E2.5\n"                        # T1: +5 mm relativos
+        "T0\nG1 X7 E4\nM82\nG92 E0\nG1 X8 E6\n"                # T0: +4 +6 mm
+    )
+    resultado = _analisar(texto, tamanho_bloco)
+    assert resultado.metros_por_ferramenta == {0: pytest.approx(0.030), 1: pytest.approx(0.035)}
+    assert resultado.metros_usados == pytest.approx(0.065)
+    assert resultado.tempo_impressao == pytest.approx(10.0)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from malha import _DTYPE_STL, _blocos_stl_ascii, analisar_malha, carregar_stl
+
+
+def _cubos(n):
+    """n cubos de 10 mm deslocados em x, como triângulos (12n, 3, 3)."""
+    v = np.array([[0, 0, 0], [10, 0, 0], [10, 10, 0], [0, 10, 0],
+                  [0, 0, 10], [10, 0, 10], [10, 10, 10], [0, 10, 10]], dtype=float)
+    faces = [(0, 2, 1), (0, 3, 2), (4, 5, 6), (4, 6, 7), (0, 1, 5), (0, 5, 4),
+             (1, 2, 6), (1, 6, 5), (2, 3, 7), (2, 7, 6), (3, 0, 4), (3, 4, 7)]
+    cubo = v[np.array(faces)]
+    return np.concatenate([cubo + [20 * i, 0, 0] for i in range(n)])
+
+
+def _gravar_ascii(caminho, triangulos):
+    with open(caminho, "w") as f:
+        f.write("solid teste\n")
+        for t in triangulos:
+            f.write("  facet normal 0 0 0\n    outer loop\n")
+            for x, y, z in t:
+                f.write(f"      vertex {x:e} {y:e} {z:e}\n")
+            f.write("    endloop\n  endfacet\n")
+        f.write("endsolid teste\n")
+
+
+def _gravar_binario(caminho, triangulos):
+    registros = np.zeros(len(triangulos), dtype=_DTYPE_STL)
+    registros["vertices"] = triangulos
+    with open(caminho, "wb") as f:
+        f.write(b"\0" * 80 + np.uint32(len(triangulos)).tobytes() + registros.tobytes())
+
+
+def test_stl_ascii_igual_ao_binario(tmp_path):
+    triangulos = _cubos(50)
+    _gravar_ascii(tmp_path / "a.stl", triangulos)
+    _gravar_binario(tmp_path / "b.stl", triangulos)
+
+    ascii_ = analisar_malha(str(tmp_path / "a.stl"), triangulos_por_bloco=7)
+    binario = analisar_malha(str(tmp_path / "b.stl"), triangulos_por_bloco=7)
+
+    assert ascii_.triangulos == binario.triangulos == 600
+    assert ascii_.volume_mm3 == pytest.approx(50 * 1000)
+    assert ascii_.area_mm2 == pytest.approx(binario.area_mm2)
+    assert ascii_.minimo == binario.minimo and ascii_.maximo == binario.maximo
+    np.testing.assert_allclose(carregar_stl(str(tmp_path / "a.stl")), triangulos)
+
+
+def test_stl_ascii_lido_em_pedacos(tmp_path):
+    triangulos = _cubos(50)
+    _gravar_ascii(tmp_path / "a.stl", triangulos)
+
+    # Pedaços pequenos: triângulos e blocos atravessam as bordas de leitura
+    blocos = list(_blocos_stl_ascii(str(tmp_path / "a.stl"), triangulos_por_bloco=7, tamanho_bloco=1000))
+
+    assert len(blocos) > 1
+    np.testing.assert_allclose(np.concatenate(blocos), triangulos)
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from nucleo.marketplace import (
+    Marketplace,
+    TabelaMarketplaces,
+    calcular_preco_venda,
+    calcular_preco_venda_faixas,
+    carregar_marketplaces,
+    melhores_marketplaces,
+)
+
+PLATAFORMAS = {
+    "A": Marketplace("A", 20.0, faixas_taxa_fixa=((79.99, 6.0), (float("inf"), 0.0))),
+    "B": Marketplace("B", 12.0, faixas_taxa_fixa=((float("inf"), 5.0),), adicionais={"Anúncio": 2.0}),
+}
+
+
+def test_sem_taxa_fixa_mantem_frete_extra():
+    tabela = TabelaMarketplaces(PLATAFORMAS)
+    frete = np.array([3.0, 7.5])
+
+    preco, _, taxa, _, _, _, lucro, recebe = tabela.precificar(
+        50.0, 5.0, 1.0, 40.0, incluir_taxa_fixa=False, frete_extra=frete)
+
+    np.testing.assert_allclose(taxa, frete)
+    for i, m in enumerate(PLATAFORMAS.values()):
+        esperado = calcular_preco_venda(50.0, m.comissao, float(frete[i]), 5.0, 1.0, 40.0, m.total_adicionais)
+        assert preco[i] == pytest.approx(esperado[0])
+        assert recebe[i] == pytest.approx(esperado[7])
+    np.testing.assert_allclose(lucro, 50.0 * 0.4)
+
+
+@pytest.mark.parametrize("faixas, mensagem", [
+    ([{"ate": 79.99, "valor": 6.0}, {"ate": 50.0, "valor": 3.0}, {"valor": 0.0}], "estritamente crescentes"),
+    ([{"ate": 79.99, "valor": 6.0}, {"ate": 79.99, "valor": 3.0}, {"valor": 0.0}], "estritamente crescentes"),
+    ([{"ate": 29.99, "valor": 6.0}, {"ate": 79.99, "valor": 3.0}], "última faixa"),
+    ([], "ao menos uma faixa"),
+])
+def test_faixas_invalidas_recusadas_no_carregamento(tmp_path, faixas, mensagem):
+    arquivo = tmp_path / "marketplaces.json"
+    arquivo.write_text(json.dumps({"Loja": {"comissao": 10.0, "taxa_fixa": faixas}}), encoding="utf-8")
+
+    with pytest.raises(ValueError, match=f"Loja: .*{mensagem}"):
+        carregar_marketplaces(str(arquivo))
+
+
+def test_faixas_validas_carregadas(tmp_path):
+    arquivo = tmp_path / "marketplaces.json"
+    arquivo.write_text(json.dumps({"Loja": {"comissao": 10.0, "taxa_fixa": [
+        {"ate": 29.99, "valor": 6.0}, {"ate": 79.99, "valor": 3.0}, {"ate": None, "valor": 0.0}]}}), encoding="utf-8")
+
+    loja = carregar_marketplaces(str(arquivo))["Loja"]
+    assert loja.faixas_taxa_fixa == ((29.99, 6.0), (79.99, 3.0), (float("inf"), 0.0))
+
+
+def test_preco_venda_vetorizado_igual_ao_escalar():
+    rng = np.random.default_rng(11)
+    n = 300
+    custo = rng.uniform(0, 500, n)
+    comissao = rng.uniform(0, 60, n)
+    taxa = rng.uniform(0, 10, n)
+    nota = rng.uniform(0, 30, n)
+    embalagem = rng.uniform(0, 5, n)
+    margem = rng.uniform(0, 150, n)
+    outras = rng.uniform(0, 20, n)
+    comissao[:10] = 95.0   # soma dos percentuais >= 100: tudo zero
+
+    vetorizado = calcular_preco_venda(custo, comissao, taxa, nota, embalagem, margem, outras)
+    for i in range(n):
+        escalar = calcular_preco_venda(float(custo[i]), float(comissao[i]), float(taxa[i]), float(nota[i]),
+                                       float(embalagem[i]), float(margem[i]), float(outras[i]))
+        np.testing.assert_allclose([v[i] for v in vetorizado], escalar, rtol=1e-12, atol=1e-12)
+    assert not np.any(vetorizado[0][:10])
+
+
+def test_tabela_igual_ao_calculo_por_plataforma():
+    plataformas = {
+        "Faixas": Marketplace("Faixas", 14.0, faixas_taxa_fixa=((29.99, 6.25), (78.99, 6.5), (float("inf"), 0.0))),
+        "Fixa": Marketplace("Fixa", 20.0, faixas_taxa_fixa=((float("inf"), 4.0),), adicionais={"Anúncio": 2.0}),
+    }
+    tabela = TabelaMarketplaces(plataformas)
+    custos = np.linspace(1, 300, 120)
+
+    resultado = tabela.precificar(custos[:, None], 5.0, 1.0, 40.0)
+    for j, m in enumerate(plataformas.values()):
+        esperado = calcular_preco_venda_faixas(custos, m.comissao, m.faixas_taxa_fixa, 5.0, 1.0, 40.0,
+                                               m.total_adicionais)
+        for obtido, valor in zip(resultado, esperado):
+            np.testing.assert_allclose(obtido[:, j], valor, rtol=1e-12)
+        # Com taxa fixa única, a faixa coincide com a fórmula fechada escalar
+        if len(m.faixas_taxa_fixa) == 1:
+            for i in (0, 60, 119):
+                escalar = calcular_preco_venda(float(custos[i]), m.comissao, m.taxa_fixa(), 5.0, 1.0, 40.0,
+                                               m.total_adicionais)
+                assert resultado[0][i, j] == pytest.approx(escalar[0])
+
+
+def test_melhores_marketplaces_exige_preco_custo():
+    produtos = pd.DataFrame({"custo": [10.0]})
+    with pytest.raises(KeyError, match="preco_custo"):
+        melhores_marketplaces(TabelaMarketplaces(PLATAFORMAS), produtos)
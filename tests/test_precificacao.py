@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from nucleo.precificacao import (
+    DEFAULT_FILAMENTOS,
+    CatalogoColunar,
+    calcular_preco_impressao,
+    calcular_precos_dataframe,
+    calcular_precos_lote,
+)
+
+
+@pytest.fixture
+def trabalhos():
+    rng = np.random.default_rng(7)
+    n = 200
+    return {
+        "filamentos": rng.choice(sorted(DEFAULT_FILAMENTOS), n).tolist(),
+        "metros_usados": rng.uniform(0.1, 500, n),
+        "tempo_impressao": rng.uniform(1, 3000, n),
+        "custo_energia_hora": rng.uniform(0.1, 2, n),
+        "custo_manutencao_hora": rng.uniform(0, 5, n),
+        "margem_lucro": rng.uniform(0, 200, n),
+        "custo_falha": rng.uniform(0, 20, n),
+    }
+
+
+@pytest.mark.parametrize("colunar", [False, True])
+def test_lote_igual_ao_calculo_individual(trabalhos, colunar):
+    catalogo = CatalogoColunar(DEFAULT_FILAMENTOS) if colunar else DEFAULT_FILAMENTOS
+    lote = calcular_precos_lote(catalogo, **trabalhos)
+
+    for i, nome in enumerate(trabalhos["filamentos"]):
+        individual = calcular_preco_impressao(
+            DEFAULT_FILAMENTOS[nome],
+            *(float(trabalhos[c][i]) for c in ("metros_usados", "tempo_impressao", "custo_energia_hora",
+                                               "custo_manutencao_hora", "margem_lucro", "custo_falha")))
+        assert set(individual) == set(lote)
+        for chave, valor in individual.items():
+            assert lote[chave][i] == pytest.approx(valor, rel=1e-12), chave
+
+
+def test_lote_com_escalares_e_dataframe(trabalhos):
+    lote = calcular_precos_lote(DEFAULT_FILAMENTOS, trabalhos["filamentos"], trabalhos["metros_usados"],
+                                90, 0.5, 2.0, 100, 5)
+    individual = calcular_preco_impressao(DEFAULT_FILAMENTOS[trabalhos["filamentos"][0]],
+                                          float(trabalhos["metros_usados"][0]), 90, 0.5, 2.0, 100, 5)
+    assert lote["Preço Final"][0] == pytest.approx(individual["Preço Final"])
+
+    df = calcular_precos_dataframe(DEFAULT_FILAMENTOS, pd.DataFrame({
+        "filamento": trabalhos["filamentos"], "metros_usados": trabalhos["metros_usados"], "tempo_impressao": 90}),
+        custo_energia_hora=0.5, custo_manutencao_hora=2.0, margem_lucro=100, custo_falha=5)
+    np.testing.assert_allclose(df["Preço Final"], lote["Preço Final"])
+
+
+def test_lote_filamento_desconhecido():
+    with pytest.raises(KeyError):
+        calcular_precos_lote(DEFAULT_FILAMENTOS, ["Inexistente"], 10, 60, 0.5, 2.0, 100)
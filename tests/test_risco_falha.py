@@ -0,0 +1,28 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from nucleo.precificacao import DEFAULT_FILAMENTOS
+from risco_falha import simular_falhas_lote
+
+
+def test_taxa_zero_nunca_falha_sem_avisos():
+    nomes = ["Creality Hyper PLA", "Flexível TPU"]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        resultado = simular_falhas_lote(DEFAULT_FILAMENTOS, nomes, [10.0, 10.0], [600, 600], 0.5, 2.0,
+                                        taxas={"PLA": 0.0, "TPU": 0.5}, simulacoes=500)
+
+    assert resultado["Probabilidade de Falha"][0] == 0.0
+    assert resultado["Tentativas Médias"][0] == 1.0
+    assert resultado["Custo Esperado"][0] == pytest.approx(resultado["Custo Base"][0])
+    assert resultado["Probabilidade de Falha"][1] > 0.9
+
+
+def test_mesma_semente_mesmo_resultado():
+    argumentos = (DEFAULT_FILAMENTOS, ["3D Fila PETG"] * 3, [5.0, 50.0, 200.0], [60, 600, 2400], 0.5, 2.0)
+    a = simular_falhas_lote(*argumentos, semente=3, simulacoes=300)
+    b = simular_falhas_lote(*argumentos, semente=3, simulacoes=300)
+    for chave in a:
+        np.testing.assert_array_equal(a[chave], b[chave])